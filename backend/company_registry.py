@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from typing import List, Optional
+
+
+# 한글 초성 (유니코드 음절 순서)
+CHOSEONG = (
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+)
+CHOSEONG_SET = frozenset(CHOSEONG)
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+SYLLABLES_PER_CHOSEONG = 21 * 28
+
+# 회사 데이터 변경 확인 주기 (초)
+RELOAD_CHECK_INTERVAL = 5.0
+
+
+def to_choseong(text: str) -> str:
+    """한글 음절을 초성으로 변환 (그 외 문자는 소문자로 유지)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            chars.append(CHOSEONG[(code - HANGUL_BASE) // SYLLABLES_PER_CHOSEONG])
+        else:
+            chars.append(ch.lower())
+    return ''.join(chars)
+
+
+def is_choseong_query(query: str) -> bool:
+    """검색어가 초성으로만 이루어졌는지 확인 (예: ㅅㅅㅈㅈ)"""
+    return bool(query) and all(ch in CHOSEONG_SET for ch in query)
+
+
+class CompanyIndex:
+    """상장회사 검색용 읽기 전용 스냅샷
+
+    회사명 소문자 기준으로 정렬된 병렬 튜플을 보관하며, 생성 후에는 변경하지 않습니다.
+    """
+
+    __slots__ = (
+        'corp_codes', 'corp_names', 'stock_codes', 'modify_dates',
+        'names_lower', 'choseongs', 'choseong_sorted', 'choseong_order',
+        'positions', 'loaded_at'
+    )
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: (row[1].lower(), row[0]))
+        self.corp_codes = tuple(row[0] for row in rows)
+        self.corp_names = tuple(row[1] for row in rows)
+        self.stock_codes = tuple(row[2] for row in rows)
+        self.modify_dates = tuple(row[3] for row in rows)
+        self.names_lower = tuple(name.lower() for name in self.corp_names)
+        self.choseongs = tuple(to_choseong(name) for name in self.corp_names)
+        # 초성 접두어 검색용 정렬 목록과 원래 위치
+        order = sorted(range(len(rows)), key=self.choseongs.__getitem__)
+        self.choseong_sorted = tuple(self.choseongs[i] for i in order)
+        self.choseong_order = tuple(order)
+        self.positions = {corp_code: i for i, corp_code in enumerate(self.corp_codes)}
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.corp_codes)
+
+    def row(self, i: int) -> dict:
+        return {
+            'corp_code': self.corp_codes[i],
+            'corp_name': self.corp_names[i],
+            'stock_code': self.stock_codes[i],
+            'modify_date': self.modify_dates[i],
+        }
+
+    def get(self, corp_code: str) -> Optional[dict]:
+        i = self.positions.get(corp_code)
+        return None if i is None else self.row(i)
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """정확히 일치 > 접두어 일치 > 부분 일치 순으로 검색"""
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        if is_choseong_query(query):
+            keys = self.choseongs
+            prefix_hits = [
+                self.choseong_order[i]
+                for i in self._prefix_range(self.choseong_sorted, query)
+            ]
+        else:
+            keys = self.names_lower
+            prefix_hits = list(self._prefix_range(self.names_lower, query))
+
+        ranked = []
+        seen = set(prefix_hits)
+        for i in prefix_hits:
+            ranked.append((0 if keys[i] == query else 1, len(keys[i]), i))
+
+        # 부분 일치는 접두어 후보가 limit 미만일 때만 전체 스캔
+        if len(prefix_hits) < limit:
+            for i, key in enumerate(keys):
+                if i not in seen and query in key:
+                    ranked.append((2, len(key), i))
+
+        ranked.sort()
+        return [self.row(i) for _, _, i in ranked[:limit]]
+
+    @staticmethod
+    def _prefix_range(sorted_keys, query: str) -> range:
+        """정렬된 키에서 접두어가 일치하는 구간"""
+        start = bisect_left(sorted_keys, query)
+        end = start
+        while end < len(sorted_keys) and sorted_keys[end].startswith(query):
+            end += 1
+        return range(start, end)
+
+
+class CompanyRegistry:
+    """dart.db에서 상장회사 목록을 메모리에 올려 두는 레지스트리
+
+    검색은 현재 스냅샷만 읽고, 재적재 시에는 새 스냅샷을 만든 뒤 참조를 교체합니다.
+    변경 감지는 sync_meta의 companies.version 값으로 합니다 (캐시 테이블 쓰기로는 재적재하지 않음).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._index: Optional[CompanyIndex] = None
+        self._version = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def __len__(self):
+        return len(self._index) if self._index else 0
+
+    def _connect(self):
+        return sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+
+    def _db_version(self):
+        """companies 데이터 버전 (DB가 없으면 None, 버전 정보가 없는 이전 DB는 '')"""
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value FROM sync_meta WHERE key = 'companies.version'"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return ''
+        return row[0] if row else ''
+
+    def _fetch_rows(self):
+        conn = self._connect()
+        try:
+            try:
+                return conn.execute('''
+                    SELECT corp_code, corp_name, stock_code, modify_date
+                    FROM companies_fts
+                ''').fetchall()
+            except sqlite3.OperationalError:
+                # 검색 인덱스가 없는 이전 DB
+                return conn.execute('''
+                    SELECT corp_code, corp_name, TRIM(stock_code), modify_date
+                    FROM companies
+                    WHERE LENGTH(TRIM(stock_code)) = 6
+                    AND TRIM(stock_code) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
+                ''').fetchall()
+        finally:
+            conn.close()
+
+    def reload(self) -> bool:
+        """DB에서 새 스냅샷을 만들어 교체"""
+        with self._lock:
+            version = self._db_version()
+            if version is None:
+                return False
+
+            started = time.perf_counter()
+            try:
+                index = CompanyIndex(self._fetch_rows())
+            except sqlite3.Error as e:
+                print(f"✗ 회사 레지스트리 로드 실패: {str(e)}")
+                return False
+
+            self._index = index
+            self._version = version
+            self._last_check = time.monotonic()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"✓ 회사 레지스트리 로드: {len(index)}개 ({elapsed:.1f}ms)")
+            return True
+
+    def reload_if_changed(self):
+        """회사 데이터가 바뀌었으면 재적재 (확인은 RELOAD_CHECK_INTERVAL마다 한 번)"""
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        if self._index is None or self._db_version() != self._version:
+            self.reload()
+
+    def search(self, query: str, limit: int = 20) -> Optional[List[dict]]:
+        """검색 결과 목록 (레지스트리를 쓸 수 없으면 None)"""
+        self.reload_if_changed()
+        index = self._index
+        if index is None:
+            return None
+        return index.search(query, limit)
+
+    def get(self, corp_code: str) -> Optional[dict]:
+        """고유번호로 상장회사 조회"""
+        self.reload_if_changed()
+        index = self._index
+        return None if index is None else index.get(corp_code)
+
+    def listed(self) -> List[tuple]:
+        """현재 스냅샷의 (corp_code, stock_code) 목록"""
+        self.reload_if_changed()
+        index = self._index
+        if index is None:
+            return []
+        return list(zip(index.corp_codes, index.stock_codes))
@@ -0,0 +1,218 @@
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+
+# OpenDART 사용량은 한국 시간 자정에 초기화
+KST = timezone(timedelta(hours=9))
+
+# 요청 우선순위 (숫자가 작을수록 먼저)
+INTERACTIVE = 0    # 사용자 요청 (재무제표 조회, AI 분석 등)
+PREFETCH = 1       # 백그라운드 수집 (스크리너 데이터 등)
+
+# DART 사용량 초과 응답 상태 코드
+STATUS_QUOTA_EXCEEDED = '020'
+
+# 일일 사용량을 dart.db에 반영하는 주기 (호출 수 / 초)
+PERSIST_EVERY_CALLS = 10
+PERSIST_INTERVAL = 5.0
+
+
+class DartQuotaExceeded(Exception):
+    """오늘 DART 호출 예산을 다 써서 요청할 수 없음 (캐시가 있으면 오래된 캐시로 응답)"""
+
+
+def kst_today() -> str:
+    return datetime.now(KST).strftime('%Y-%m-%d')
+
+
+def seconds_until_reset() -> int:
+    """한국 시간 다음 자정까지 남은 초"""
+    now = datetime.now(KST)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int((midnight - now).total_seconds()) + 1
+
+
+class DartScheduler:
+    """모든 DART API 호출이 거쳐 가는 호출 예산 관리자
+
+    토큰 버킷(초당 rate개, 최대 burst개)으로 호출 속도를 제한하고, 대기 중인 사용자 요청이 있으면
+    백그라운드 수집 요청은 토큰을 가져가지 않습니다. 일일 호출 수는 메모리에서 세고 주기적으로
+    dart.db에 저장하므로 서버를 다시 시작하거나 여러 프로세스로 실행해도 이어서 셉니다.
+    dart.db 읽기/쓰기는 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+    남은 일일 예산이 reserve 이하이면 백그라운드 수집은 거절하고, 사용자 요청은
+    만료된 캐시라도 있으면 그것으로 응답하도록 low_budget을 알려줍니다.
+    """
+
+    def __init__(self, db_path: str, rate: float = 10.0, burst: int = 20,
+                 daily_limit: int = 20000, reserve: int = 2000):
+        self.db_path = db_path
+        self.rate = rate
+        self.burst = burst
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self.tokens = float(burst)
+        self.rejected = 0
+        self.waiting: Dict[int, int] = {INTERACTIVE: 0, PREFETCH: 0}
+        self._updated = time.monotonic()
+        self._day: Optional[str] = None
+        self._used = 0
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dart_quota (
+                    day TEXT PRIMARY KEY,
+                    used INTEGER NOT NULL
+                )
+            ''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _save(self, day: str, count: int) -> int:
+        """day 사용량에 count를 더하고, 다른 프로세스 사용량까지 합친 저장된 값을 반환"""
+        conn = self._connect()
+        try:
+            with conn:
+                if count:
+                    conn.execute('''
+                        INSERT INTO dart_quota (day, used) VALUES (?, ?)
+                        ON CONFLICT(day) DO UPDATE SET used = used + excluded.used
+                    ''', (day, count))
+                row = conn.execute('SELECT used FROM dart_quota WHERE day = ?', (day,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else 0
+
+    def load(self):
+        """저장된 오늘 사용량을 불러옴 (서버 시작 시)"""
+        self._day = kst_today()
+        self._used = self._save(self._day, 0)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+
+    def persist(self):
+        """아직 저장하지 않은 호출 수를 바로 저장 (서버 종료 시)"""
+        if self._day is None or not self._unsaved:
+            return
+        count, self._unsaved = self._unsaved, 0
+        self._used = max(self._used, self._save(self._day, count))
+        self._saved_at = time.monotonic()
+
+    async def _check_day(self):
+        """날짜가 바뀌었으면(처음 호출 포함) 어제 남은 사용량을 저장하고 오늘 사용량을 불러옴"""
+        today = kst_today()
+        if self._day == today:
+            return
+        previous, count = self._day, self._unsaved
+        # 기다리는 동안 들어온 호출은 새 날짜로 셈
+        self._day, self._used, self._unsaved = today, 0, 0
+        if previous is not None and count:
+            await asyncio.to_thread(self._save, previous, count)
+        used = await asyncio.to_thread(self._save, today, 0)
+        self._used = max(self._used, used + self._unsaved)
+        self._saved_at = time.monotonic()
+
+    async def flush(self):
+        """아직 저장하지 않은 호출 수를 스레드에서 dart.db에 더하고 다른 프로세스 사용량까지 반영"""
+        day, count = self._day, self._unsaved
+        if day is None:
+            return
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        try:
+            used = await asyncio.to_thread(self._save, day, count)
+        except sqlite3.Error as e:
+            print(f"✗ DART 사용량 저장 실패: {str(e)}")
+            if day == self._day:
+                self._unsaved += count
+            return
+        if day == self._day:
+            # 저장하는 동안 늘어난 호출 수(_unsaved)까지 포함
+            self._used = max(self._used, used + self._unsaved)
+
+    def _schedule_flush(self):
+        """요청을 기다리게 하지 않도록 저장은 백그라운드 작업으로 (이미 저장 중이면 다음 기회에)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    @property
+    def used(self) -> int:
+        """오늘 사용량 (날짜가 바뀐 뒤 아직 호출이 없으면 0)"""
+        return self._used if self._day == kst_today() else 0
+
+    @property
+    def remaining(self) -> int:
+        return max(self.daily_limit - self.used, 0)
+
+    @property
+    def low_budget(self) -> bool:
+        """남은 예산이 reserve 이하 (사용자 요청도 가능하면 오래된 캐시 사용)"""
+        return self.remaining <= self.reserve
+
+    def _check_budget(self, priority: int):
+        if self.remaining <= 0 or (priority != INTERACTIVE and self.low_budget):
+            self.rejected += 1
+            raise DartQuotaExceeded(
+                f"오늘 DART API 호출 예산을 모두 사용했습니다 (사용 {self.used:,}/{self.daily_limit:,})."
+            )
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(float(self.burst), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        """호출 한 번의 토큰을 받을 때까지 대기 (예산이 없으면 DartQuotaExceeded)"""
+        await self._check_day()
+        self._check_budget(priority)
+        self.waiting[priority] += 1
+        try:
+            while True:
+                self._refill()
+                # 더 높은 우선순위 요청이 기다리고 있으면 양보
+                blocked = any(count for level, count in self.waiting.items() if level < priority)
+                if self.tokens >= 1 and not blocked:
+                    break
+                await asyncio.sleep(max((1 - self.tokens) / self.rate, 0.01))
+        finally:
+            self.waiting[priority] -= 1
+
+        # 기다리는 동안 예산이 줄었을 수 있으므로 다시 확인
+        self._check_budget(priority)
+        self.tokens -= 1
+        self._used += 1
+        self._unsaved += 1
+        if self._unsaved >= PERSIST_EVERY_CALLS or time.monotonic() - self._saved_at >= PERSIST_INTERVAL:
+            self._schedule_flush()
+
+    def mark_exhausted(self):
+        """DART가 사용량 초과(020)를 응답하면 오늘 예산을 모두 쓴 것으로 기록 (acquire 이후 호출)"""
+        if self._used < self.daily_limit:
+            self._unsaved += self.daily_limit - self._used
+            self._used = self.daily_limit
+            self._schedule_flush()
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            'day': self._day or kst_today(),
+            'used': self.used,
+            'daily_limit': self.daily_limit,
+            'remaining': self.remaining,
+            'reserve': self.reserve,
+            'low_budget': self.low_budget,
+            'tokens': round(self.tokens, 2),
+            'rate_per_sec': self.rate,
+            'waiting_interactive': self.waiting[INTERACTIVE],
+            'waiting_prefetch': self.waiting[PREFETCH],
+            'rejected': self.rejected,
+        }
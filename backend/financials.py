@@ -0,0 +1,289 @@
+import json
+import sqlite3
+import time
+from typing import List, Optional
+
+
+# 표준 계정 ID -> DART 계정명 (회사/보고서마다 표기가 조금씩 다름)
+ACCOUNT_ALIASES = {
+    'current_assets': ('유동자산',),
+    'non_current_assets': ('비유동자산',),
+    'total_assets': ('자산총계',),
+    'current_liabilities': ('유동부채',),
+    'non_current_liabilities': ('비유동부채',),
+    'total_liabilities': ('부채총계',),
+    'capital_stock': ('자본금',),
+    'retained_earnings': ('이익잉여금', '이익잉여금(결손금)'),
+    'total_equity': ('자본총계',),
+    'revenue': ('매출액', '수익(매출액)', '영업수익'),
+    'operating_income': ('영업이익', '영업이익(손실)'),
+    'pretax_income': ('법인세차감전 순이익', '법인세비용차감전순이익', '법인세차감전순이익'),
+    'net_income': ('당기순이익', '당기순이익(손실)'),
+}
+ACCOUNT_IDS = tuple(ACCOUNT_ALIASES)
+ACCOUNT_BY_NAME = {
+    alias.replace(' ', ''): account_id
+    for account_id, aliases in ACCOUNT_ALIASES.items()
+    for alias in aliases
+}
+
+# 비율 ID -> (분자 계정, 분모 계정), 단위: %
+RATIO_DEFINITIONS = {
+    'debt_ratio': ('total_liabilities', 'total_equity'),
+    'equity_ratio': ('total_equity', 'total_assets'),
+    'current_ratio': ('current_assets', 'current_liabilities'),
+    'roe': ('net_income', 'total_equity'),
+    'roa': ('net_income', 'total_assets'),
+    'operating_margin': ('operating_income', 'revenue'),
+    'net_margin': ('net_income', 'revenue'),
+}
+RATIO_IDS = tuple(RATIO_DEFINITIONS)
+
+# 전년 대비 증감률을 계산할 계정
+YOY_ACCOUNTS = ('revenue', 'operating_income', 'net_income', 'total_assets', 'total_equity')
+YOY_IDS = tuple(f'{account_id}_yoy' for account_id in YOY_ACCOUNTS)
+
+# 프롬프트 등에 표시할 이름
+METRIC_LABELS = {
+    'debt_ratio': '부채비율',
+    'equity_ratio': '자기자본비율',
+    'current_ratio': '유동비율',
+    'roe': 'ROE',
+    'roa': 'ROA',
+    'operating_margin': '영업이익률',
+    'net_margin': '순이익률',
+    'revenue_yoy': '매출액 증감률',
+    'operating_income_yoy': '영업이익 증감률',
+    'net_income_yoy': '당기순이익 증감률',
+    'total_assets_yoy': '자산총계 증감률',
+    'total_equity_yoy': '자본총계 증감률',
+}
+
+
+# 보고서 코드 순서 (분기 → 반기 → 3분기 → 사업보고서)
+REPORT_CODE_ORDER = {'11013': 1, '11012': 2, '11014': 3, '11011': 4}
+
+
+def parse_amount(amount) -> Optional[int]:
+    """DART 금액 문자열을 정수로 변환 (예: '1,234' -> 1234, '-'나 빈 값은 None)"""
+    if amount is None:
+        return None
+    text = str(amount).replace(',', '').strip()
+    if not text or text == '-':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return int(float(text))
+        except ValueError:
+            return None
+
+
+def period_sort_key(bsns_year: str, reprt_code: str):
+    return (bsns_year, REPORT_CODE_ORDER.get(reprt_code, 0))
+
+
+def build_series(results: List[dict], fs_div: str = 'CFS') -> dict:
+    """여러 기간의 DART 응답을 계정과목별 시계열로 변환
+
+    Args:
+        results: bsns_year, reprt_code, status, payload 키를 가진 기간별 결과
+        fs_div: CFS(연결) 또는 OFS(별도). 해당 기간에 없으면 다른 쪽을 사용
+
+    Returns:
+        periods(기간 목록)와 accounts(계정과목 -> 기간 순서의 당기 금액 목록)
+    """
+    results = sorted(results, key=lambda r: period_sort_key(r['bsns_year'], r['reprt_code']))
+
+    periods = []
+    accounts = {}
+    for i, result in enumerate(results):
+        period = {
+            'bsns_year': result['bsns_year'],
+            'reprt_code': result['reprt_code'],
+            'status': result['status'],
+            'fs_div': None,
+        }
+        periods.append(period)
+
+        items = json.loads(result['payload']).get('list', []) if result['payload'] else []
+        selected = select_fs_div(items, fs_div)
+        period['fs_div'] = selected
+
+        for item in items:
+            if item.get('fs_div') != selected:
+                continue
+            name = item.get('account_nm', '')
+            values = accounts.setdefault(name, {
+                'sj_div': item.get('sj_div'),
+                'values': [None] * len(results),
+            })['values']
+            values[i] = parse_amount(item.get('thstrm_amount'))
+
+    return {'periods': periods, 'accounts': accounts}
+
+
+def normalize_statement(items: List[dict], fs_div: str = 'CFS') -> dict:
+    """DART 재무제표 항목을 표준 계정 ID별 정수 금액으로 변환
+
+    Returns:
+        account_id -> {'current': 당기, 'previous': 전기, 'before_previous': 전전기}
+    """
+    accounts = {}
+    for item in items:
+        if item.get('fs_div') != fs_div:
+            continue
+        account_id = ACCOUNT_BY_NAME.get(item.get('account_nm', '').replace(' ', ''))
+        if account_id is None or account_id in accounts:
+            continue
+        accounts[account_id] = {
+            'current': parse_amount(item.get('thstrm_amount')),
+            'previous': parse_amount(item.get('frmtrm_amount')),
+            'before_previous': parse_amount(item.get('bfefrmtrm_amount')),
+        }
+    return accounts
+
+
+def percent(numerator: Optional[int], denominator: Optional[int]) -> Optional[float]:
+    if numerator is None or not denominator:
+        return None
+    return round(numerator / denominator * 100, 2)
+
+
+def compute_metrics(accounts: dict) -> dict:
+    """표준 계정 금액으로 주요 재무비율(%)과 전년 대비 증감률(%) 계산"""
+    def value(account_id, period='current'):
+        return accounts.get(account_id, {}).get(period)
+
+    metrics = {
+        ratio_id: percent(value(numerator), value(denominator))
+        for ratio_id, (numerator, denominator) in RATIO_DEFINITIONS.items()
+    }
+    for account_id in YOY_ACCOUNTS:
+        current, previous = value(account_id), value(account_id, 'previous')
+        change = None if current is None or previous is None else current - previous
+        metrics[f'{account_id}_yoy'] = percent(change, abs(previous) if previous else None)
+    return metrics
+
+
+def select_fs_div(items: List[dict], fs_div: str = 'CFS') -> Optional[str]:
+    """요청한 재무제표 구분이 없으면 다른 구분(CFS/OFS)을 사용"""
+    available = {item.get('fs_div') for item in items} - {None}
+    if fs_div in available:
+        return fs_div
+    return next(iter(sorted(available)), None)
+
+
+def format_metrics(metrics: dict) -> List[str]:
+    """프롬프트용 지표 문자열 목록 (예: '부채비율: 25.36%')"""
+    return [
+        f"{METRIC_LABELS[metric_id]}: {metrics[metric_id]:+.2f}%"
+        if metric_id.endswith('_yoy') else
+        f"{METRIC_LABELS[metric_id]}: {metrics[metric_id]:.2f}%"
+        for metric_id in RATIO_IDS + YOY_IDS
+        if metrics.get(metric_id) is not None
+    ]
+
+
+class FinancialStore:
+    """정규화된 재무 수치와 미리 계산한 비율을 dart.db에 저장
+
+    기간(corp_code, bsns_year, reprt_code, fs_div)당 한 행이며,
+    계정별 당기/전기 금액은 INTEGER, 비율과 증감률은 REAL 컬럼입니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            columns = [f'{account_id} INTEGER, {account_id}_prev INTEGER' for account_id in ACCOUNT_IDS]
+            columns += [f'{metric_id} REAL' for metric_id in RATIO_IDS + YOY_IDS]
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS financial_facts (
+                    corp_code TEXT NOT NULL,
+                    bsns_year TEXT NOT NULL,
+                    reprt_code TEXT NOT NULL,
+                    fs_div TEXT NOT NULL,
+                    {', '.join(columns)},
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (corp_code, bsns_year, reprt_code, fs_div)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def _rows(corp_code: str, bsns_year: str, reprt_code: str, items: List[dict]) -> List[list]:
+        rows = []
+        for fs_div in sorted({item.get('fs_div') for item in items} - {None}):
+            accounts = normalize_statement(items, fs_div)
+            metrics = compute_metrics(accounts)
+            row = [corp_code, bsns_year, reprt_code, fs_div]
+            for account_id in ACCOUNT_IDS:
+                amounts = accounts.get(account_id, {})
+                row += [amounts.get('current'), amounts.get('previous')]
+            row += [metrics[metric_id] for metric_id in RATIO_IDS + YOY_IDS]
+            row.append(time.time())
+            rows.append(row)
+        return rows
+
+    def ingest(self, corp_code: str, bsns_year: str, reprt_code: str, payload: str):
+        """DART 응답(JSON 문자열)을 정규화하여 연결/별도 재무제표별로 저장"""
+        items = json.loads(payload).get('list', [])
+        self.ingest_many([(corp_code, bsns_year, reprt_code, items)])
+
+    def ingest_many(self, entries: List[tuple]):
+        """(corp_code, bsns_year, reprt_code, items) 목록을 한 트랜잭션으로 저장"""
+        rows = [
+            row
+            for corp_code, bsns_year, reprt_code, items in entries
+            for row in self._rows(corp_code, bsns_year, reprt_code, items)
+        ]
+        if not rows:
+            return
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO financial_facts VALUES ({", ".join("?" * len(rows[0]))})',
+                    rows
+                )
+        finally:
+            conn.close()
+
+    def get(self, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str = 'CFS') -> Optional[dict]:
+        """저장된 정규화 수치 조회 (요청한 구분이 없으면 다른 구분)
+
+        Returns:
+            fs_div, accounts(계정 ID -> current/previous), metrics(비율/증감률) 또는 None
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute('''
+                SELECT * FROM financial_facts
+                WHERE corp_code = ? AND bsns_year = ? AND reprt_code = ?
+                ORDER BY fs_div = ? DESC, fs_div
+            ''', (corp_code, bsns_year, reprt_code, fs_div)).fetchall()
+        finally:
+            conn.close()
+
+        if not rows:
+            return None
+
+        row = rows[0]
+        return {
+            'fs_div': row['fs_div'],
+            'accounts': {
+                account_id: {'current': row[account_id], 'previous': row[f'{account_id}_prev']}
+                for account_id in ACCOUNT_IDS
+                if row[account_id] is not None or row[f'{account_id}_prev'] is not None
+            },
+            'metrics': {metric_id: row[metric_id] for metric_id in RATIO_IDS + YOY_IDS},
+        }
@@ -0,0 +1,229 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# 연간 거래일 수 (변동성 연환산)
+TRADING_DAYS = 252
+
+# 이동평균 기간 (거래일)
+MA_WINDOWS = (5, 20, 60, 120)
+
+# RSI / 변동성 계산 기간 (거래일)
+RSI_PERIOD = 14
+VOLATILITY_WINDOW = 20
+
+# 수익률 구간 -> 거래일 수
+RETURN_WINDOWS = {
+    '1w': 5,
+    '1m': 21,
+    '3m': 63,
+    '6m': 126,
+    '1y': 252,
+}
+
+INDICATOR_NAMES = tuple(f'ma{window}' for window in MA_WINDOWS) + (
+    f'rsi{RSI_PERIOD}', 'volatility', 'drawdown', 'returns'
+)
+
+# (ticker, period)별 계산 결과 캐시 크기
+INDICATOR_CACHE_SIZE = 256
+
+
+def parse_indicators(expression: Optional[str]) -> tuple:
+    """'ma20,rsi14' 형식의 지표 목록 파싱 ('all'은 전체 지표)"""
+    names = [name.strip().lower() for name in (expression or '').split(',') if name.strip()]
+    if 'all' in names:
+        return INDICATOR_NAMES
+    for name in names:
+        if name not in INDICATOR_NAMES:
+            raise ValueError(f"지원하지 않는 지표입니다: {name}")
+    return tuple(dict.fromkeys(names))
+
+
+def fill_forward(values: np.ndarray) -> np.ndarray:
+    """NaN을 직전 값으로 채움 (맨 앞의 NaN은 그대로)"""
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    positions = np.where(missing, 0, np.arange(len(values)))
+    np.maximum.accumulate(positions, out=positions)
+    return values[positions]
+
+
+def rolling_sum(cumsum: np.ndarray, window: int) -> np.ndarray:
+    """앞에 0을 붙인 누적합으로 구간 합 계산 (window개가 모이기 전은 NaN)"""
+    result = np.full(len(cumsum) - 1, np.nan)
+    if len(result) >= window:
+        result[window - 1:] = cumsum[window:] - cumsum[:-window]
+    return result
+
+
+def to_list(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    """JSON용 목록 변환 (NaN은 None)"""
+    return np.where(np.isnan(values), None, np.round(values, digits)).tolist()
+
+
+def last_value(values: np.ndarray, digits: int = 2) -> Optional[float]:
+    if len(values) == 0 or np.isnan(values[-1]):
+        return None
+    return round(float(values[-1]), digits)
+
+
+def compute_indicators(closes: List[float]) -> dict:
+    """종가 목록으로 전체 기술적 지표를 한 번에 계산
+
+    일간 수익률과 누적합을 한 번만 만들고 모든 이동 구간 계산에 함께 사용합니다.
+    RSI는 상승/하락폭의 단순 이동평균(Cutler 방식)이라 재귀 없이 벡터 연산으로 계산합니다.
+    중간의 NaN은 직전 종가로 채우고, 첫 종가 이전(앞쪽 NaN)은 계산에서 빼고 결과를 NaN으로 둡니다.
+
+    Returns:
+        series(지표 -> 날짜별 값 목록)와 summary(지표 -> 마지막 값)
+    """
+    closes = fill_forward(np.asarray(closes, dtype=np.float64))
+    # 앞쪽 NaN이 누적합에 들어가면 이후 구간이 모두 NaN이 되므로 잘라냄
+    valid = np.flatnonzero(~np.isnan(closes))
+    leading = int(valid[0]) if len(valid) else len(closes)
+    closes = closes[leading:]
+    series: Dict[str, np.ndarray] = {}
+    summary: dict = {}
+
+    # 이동평균
+    price_cumsum = np.concatenate(([0.0], np.cumsum(closes)))
+    for window in MA_WINDOWS:
+        series[f'ma{window}'] = rolling_sum(price_cumsum, window) / window
+
+    # 일간 변화량 / 로그 수익률 (첫날은 0)
+    changes = np.diff(closes, prepend=closes[:1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_returns = np.log(closes / np.concatenate((closes[:1], closes[:-1])))
+    log_returns = np.nan_to_num(log_returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # RSI
+    gains = np.concatenate(([0.0], np.cumsum(np.clip(changes, 0, None))))
+    losses = np.concatenate(([0.0], np.cumsum(np.clip(-changes, 0, None))))
+    average_gain = rolling_sum(gains, RSI_PERIOD)
+    average_loss = rolling_sum(losses, RSI_PERIOD)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 * average_gain / (average_gain + average_loss)
+    series[f'rsi{RSI_PERIOD}'] = np.where(
+        np.isnan(average_gain), np.nan, np.nan_to_num(rsi, nan=50.0)
+    )
+
+    # 변동성 (연환산 %, 구간 표준편차)
+    return_sums = np.concatenate(([0.0], np.cumsum(log_returns)))
+    square_sums = np.concatenate(([0.0], np.cumsum(log_returns ** 2)))
+    mean = rolling_sum(return_sums, VOLATILITY_WINDOW) / VOLATILITY_WINDOW
+    variance = rolling_sum(square_sums, VOLATILITY_WINDOW) / VOLATILITY_WINDOW - mean ** 2
+    series['volatility'] = np.sqrt(np.clip(variance, 0, None)) * np.sqrt(TRADING_DAYS) * 100
+    period_volatility = (
+        float(np.std(log_returns[1:]) * np.sqrt(TRADING_DAYS) * 100) if len(closes) > 2 else None
+    )
+
+    # 고점 대비 하락률 (%)
+    peaks = np.fmax.accumulate(closes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['drawdown'] = (closes / peaks - 1) * 100
+
+    for name, values in series.items():
+        summary[name] = last_value(values)
+    summary['period_volatility'] = None if period_volatility is None else round(period_volatility, 2)
+    summary['max_drawdown'] = (
+        round(float(np.nanmin(series['drawdown'])), 2) if len(closes) else None
+    )
+
+    # 구간별 수익률 (%)
+    returns = {}
+    for label, window in RETURN_WINDOWS.items():
+        if len(closes) > window and closes[-1 - window]:
+            returns[label] = round(float((closes[-1] / closes[-1 - window] - 1) * 100), 2)
+        else:
+            returns[label] = None
+    summary['returns'] = returns
+
+    padding = np.full(leading, np.nan)
+    return {
+        'series': {name: to_list(np.concatenate((padding, values))) for name, values in series.items()},
+        'summary': summary,
+    }
+
+
+def select_indicators(result: dict, names: tuple) -> dict:
+    """전체 계산 결과에서 요청한 지표만 추림"""
+    series = {name: result['series'][name] for name in names if name in result['series']}
+    summary = {}
+    for name in names:
+        if name == 'volatility':
+            summary['volatility'] = result['summary']['volatility']
+            summary['period_volatility'] = result['summary']['period_volatility']
+        elif name == 'drawdown':
+            summary['drawdown'] = result['summary']['drawdown']
+            summary['max_drawdown'] = result['summary']['max_drawdown']
+        else:
+            summary[name] = result['summary'][name]
+    return {'series': series, 'summary': summary}
+
+
+def format_indicators(summary: dict) -> List[str]:
+    """프롬프트용 지표 문자열 목록 (예: 'RSI(14): 55.20')"""
+    lines = []
+    for window in MA_WINDOWS:
+        if summary.get(f'ma{window}') is not None:
+            lines.append(f"{window}일 이동평균: {summary[f'ma{window}']:,.0f}원")
+    if summary.get(f'rsi{RSI_PERIOD}') is not None:
+        lines.append(f"RSI({RSI_PERIOD}): {summary[f'rsi{RSI_PERIOD}']:.2f}")
+    if summary.get('volatility') is not None:
+        lines.append(f"{VOLATILITY_WINDOW}일 변동성(연환산): {summary['volatility']:.2f}%")
+    if summary.get('period_volatility') is not None:
+        lines.append(f"기간 변동성(연환산): {summary['period_volatility']:.2f}%")
+    if summary.get('drawdown') is not None:
+        lines.append(f"고점 대비 현재 하락률: {summary['drawdown']:.2f}%")
+    if summary.get('max_drawdown') is not None:
+        lines.append(f"최대 낙폭(MDD): {summary['max_drawdown']:.2f}%")
+    returns = summary.get('returns') or {}
+    parts = [f"{label} {value:+.2f}%" for label, value in returns.items() if value is not None]
+    if parts:
+        lines.append(f"구간 수익률: {', '.join(parts)}")
+    return lines
+
+
+class IndicatorCache:
+    """(ticker, period)별 지표 계산 결과 LRU 캐시
+
+    저장된 일봉이 바뀌면(첫/마지막 날짜, 봉 개수, 마지막 봉의 종가·거래량) 다시 계산합니다.
+    장중에는 날짜와 개수가 그대로인 채 오늘 봉만 갱신되므로 마지막 봉 값도 버전에 넣습니다.
+    """
+
+    def __init__(self, max_entries: int = INDICATOR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker: str, period: str, stock_data: dict) -> dict:
+        key = (ticker, period)
+        dates = stock_data['dates']
+        version = (
+            dates[0], dates[-1], len(dates),
+            stock_data['prices'][-1], stock_data['volumes'][-1],
+        ) if dates else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        result = compute_indicators(stock_data['prices'])
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
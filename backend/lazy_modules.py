@@ -0,0 +1,53 @@
+import importlib
+import threading
+import time
+from typing import Callable, Optional
+
+
+class LazyModule:
+    """처음 사용할 때 import하는 모듈 대리 객체
+
+    yfinance, google.generativeai처럼 import에 수백 ms가 걸리는 모듈을 서버 시작 시점이 아니라
+    처음 필요한 요청에서(또는 warm_up으로 백그라운드에서) 불러옵니다.
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable] = None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+        self.load_time: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_load:
+                        self._on_load(module)
+                    self.load_time = time.perf_counter() - started
+                    self._module = module
+                    print(f"✓ {self._name} 로드 ({self.load_time * 1000:.0f}ms)")
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def warm_up(*modules: LazyModule):
+    """서버가 요청을 받기 시작한 뒤 백그라운드 스레드에서 모듈을 미리 import"""
+    def run():
+        for module in modules:
+            try:
+                module.load()
+            except Exception as e:
+                print(f"✗ 모듈 미리 로드 실패: {str(e)}")
+
+    thread = threading.Thread(target=run, name='warm-up-imports', daemon=True)
+    thread.start()
+    return thread
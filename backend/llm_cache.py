@@ -0,0 +1,104 @@
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Optional
+
+
+DAY = 24 * 3600
+
+# 기본 캐시 정책
+DEFAULT_TTL = 7 * DAY
+DEFAULT_MAX_ENTRIES = 2000
+
+# 적중 시 last_used_at을 다시 기록하는 최소 간격 (초) - 적중마다 쓰기 트랜잭션을 열지 않도록
+TOUCH_INTERVAL = 3600
+
+
+def cache_key(model: str, kind: str, template_version: int, prompt: str) -> str:
+    """모델, 프롬프트 종류/템플릿 버전, 프롬프트 내용으로 만든 캐시 키 (sha256)"""
+    source = json.dumps([model, kind, template_version, prompt], ensure_ascii=False)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """Gemini 응답을 dart.db에 저장하는 내용 주소 기반 영구 캐시
+
+    같은 모델/템플릿/요약 입력이면 같은 키가 되어 저장된 응답을 그대로 반환합니다.
+    TTL이 지난 항목은 사용하지 않고, 항목 수가 max_entries를 넘으면
+    가장 오래 사용하지 않은 항목부터 삭제합니다 (LRU, 사용 시각은 TOUCH_INTERVAL 단위로 갱신).
+    """
+
+    def __init__(self, db_path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 (없거나 만료되었으면 None)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT response, created_at, last_used_at FROM llm_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl and now - row[2] >= TOUCH_INTERVAL:
+                with conn:
+                    conn.execute('UPDATE llm_cache SET last_used_at = ? WHERE key = ?', (now, key))
+        finally:
+            conn.close()
+
+        if row is None or now - row[1] >= self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, kind: str, model: str, response: str):
+        """응답 저장 후 만료 항목과 max_entries 초과분 정리"""
+        if not response:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO llm_cache
+                    (key, kind, model, response, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (key, kind, model, response, now, now))
+                conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl,))
+                conn.execute('''
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache
+                        ORDER BY last_used_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Deque, Dict, Hashable
+
+
+# 대기/실행 시간 통계에 사용할 최근 작업 수
+TIMING_SAMPLES = 500
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 작업을 받을 수 없음 (HTTP 429로 응답)"""
+
+
+def percentile(samples, ratio: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class LLMQueue:
+    """LLM 호출용 작업 스케줄러
+
+    동시에 실행하는 작업은 max_concurrency개로 제한하고, 나머지는 클라이언트별 대기열에 넣어
+    클라이언트를 번갈아 가며(라운드 로빈) 실행합니다. 전체 대기 작업이 max_queue개이거나
+    한 클라이언트의 대기 작업이 max_per_client개면 바로 QueueFullError를 발생시킵니다.
+    같은 키의 작업이 이미 대기/실행 중이면 새로 넣지 않고 그 결과를 함께 받습니다.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 32, max_per_client: int = 4):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.deduplicated = 0
+        self.queue_times: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        self.run_times: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        # 클라이언트 -> 대기 중인 슬롯 요청 (앞에 있는 클라이언트가 다음 차례)
+        self._waiting: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._jobs: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    def ensure_capacity(self, client_id: Hashable):
+        """지금 작업을 넣을 수 있는지 확인 (대기열이 가득 찼으면 QueueFullError)"""
+        if self.running < self.max_concurrency and not self._waiting:
+            return
+        if self.queued >= self.max_queue or len(self._waiting.get(client_id, ())) >= self.max_per_client:
+            self.rejected += 1
+            raise QueueFullError("AI 요청이 많아 잠시 후 다시 시도해주세요.")
+
+    async def _acquire(self, client_id: Hashable):
+        self.ensure_capacity(client_id)
+        if self.running < self.max_concurrency and not self._waiting:
+            self.running += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(client_id, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨
+                self._release()
+            else:
+                waiters = self._waiting.get(client_id)
+                if waiters is not None and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiting[client_id]
+            raise
+
+    def _release(self):
+        """실행 슬롯을 다음 차례 클라이언트에게 넘김 (대기 작업이 없으면 반납)"""
+        while self._waiting:
+            client_id, waiters = next(iter(self._waiting.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiting.move_to_end(client_id)
+            else:
+                del self._waiting[client_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self, client_id: Hashable):
+        """차례가 올 때까지 기다린 뒤 실행 슬롯을 점유 (스트리밍처럼 결과를 나눠 받는 작업용)"""
+        queued_at = time.perf_counter()
+        await self._acquire(client_id)
+        started = time.perf_counter()
+        self.queue_times.append(started - queued_at)
+        try:
+            yield
+        except BaseException:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+        finally:
+            self.run_times.append(time.perf_counter() - started)
+            self._release()
+
+    async def run(self, client_id: Hashable, key: Hashable, func: Callable[[], Awaitable]):
+        """작업 실행 (같은 키의 작업이 대기/실행 중이면 그 결과를 함께 받음)"""
+        task = self._jobs.get(key)
+        if task is None:
+            self.ensure_capacity(client_id)
+            task = asyncio.ensure_future(self._run_job(client_id, func))
+            self._jobs[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    async def _run_job(self, client_id: Hashable, func: Callable[[], Awaitable]):
+        async with self.slot(client_id):
+            return await func()
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._jobs.get(key) is task:
+            del self._jobs[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'queued': self.queued,
+            'clients_waiting': len(self._waiting),
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'deduplicated': self.deduplicated,
+            'queue_time_ms': {
+                'p50': round(percentile(self.queue_times, 0.5) * 1000, 1),
+                'p95': round(percentile(self.queue_times, 0.95) * 1000, 1),
+                'max': round(max(self.queue_times, default=0.0) * 1000, 1),
+            },
+            'run_time_ms': {
+                'p50': round(percentile(self.run_times, 0.5) * 1000, 1),
+                'p95': round(percentile(self.run_times, 0.95) * 1000, 1),
+                'max': round(max(self.run_times, default=0.0) * 1000, 1),
+            },
+        }
@@ -1,32 +1,94 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# 서버 시작 시간 측정 (모듈 import부터)
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from brotli_asgi import BrotliMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 import sqlite3
-import requests
+import json
+import asyncio
+import functools
+import anyio
+import httpx
 from typing import List, Optional
 from pydantic import BaseModel
+import ipaddress
 import os
+import secrets
 import sys
+import threading
+import traceback
+from collections import deque
 from dotenv import load_dotenv
-import google.generativeai as genai
-import yfinance as yf
 from datetime import datetime, timedelta
-import pandas as pd
+from urllib.parse import urlsplit
+import numpy as np
+
+# backend 및 프로젝트 루트 모듈 import (python main.py / uvicorn backend.main:app 모두 지원)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BACKEND_DIR)
+for module_dir in (BACKEND_DIR, PROJECT_DIR):
+    if module_dir not in sys.path:
+        sys.path.insert(0, module_dir)
+
+from lazy_modules import LazyModule, warm_up
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, FAST_BUCKETS, MetricsMiddleware, MetricsRegistry
+from profiling import ProfilingMiddleware, record_stage, stage
+from company_registry import CompanyRegistry
+from upstream import UpstreamClient
+from single_flight import SingleFlight
+from screener import ScreenerDataset, collect_financials, parse_filters, SCREENER_COLUMNS
+from financials import (
+    FinancialStore, build_series, compute_metrics, format_metrics,
+    normalize_statement, select_fs_div
+)
+from llm_cache import LLMCache, cache_key
+from llm_queue import LLMQueue, QueueFullError
+from indicators import INDICATOR_NAMES, IndicatorCache, format_indicators, parse_indicators, select_indicators
+from responses import (
+    CACHE_LIVE, CACHE_SEARCH, CACHE_STATIC, FastJSONResponse, conditional_response
+)
+from price_store import PriceStore, PERIOD_DAYS, compact_series, market_ticker, period_start, ticker_market
+from statement_cache import StatementCache, STATUS_OK, statement_cache_control
+from dart_quota import (
+    DartQuotaExceeded, DartScheduler, INTERACTIVE, STATUS_QUOTA_EXCEEDED, seconds_until_reset
+)
+from corp_code_ingest import CORP_CODE_URL, refresh_corp_codes
 
 # .env 파일 로드
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 DART_API_KEY = os.getenv('DART_API_KEY')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# 관리자 API 토큰 (미설정 시 관리자 API 사용 불가)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# X-Forwarded-For를 믿을 리버스 프록시 주소 (쉼표로 구분한 IP 또는 CIDR, 미설정 시 헤더 무시)
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(value.strip(), strict=False)
+    for value in os.getenv('TRUSTED_PROXIES', '').split(',') if value.strip()
+]
+
 # 프론트엔드 URL 설정 (배포 시 환경 변수로 설정 가능)
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 
-# Gemini API 설정
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+def configure_genai(module):
+    """Gemini API 설정 (google.generativeai를 처음 불러올 때 실행)"""
+    if GEMINI_API_KEY:
+        module.configure(api_key=GEMINI_API_KEY)
 
-app = FastAPI(title="재무제표 시각화 API")
+
+# 무거운 모듈은 처음 사용할 때 import (서버 시작 후 백그라운드에서 미리 로드)
+genai = LazyModule('google.generativeai', on_load=configure_genai)
+yf = LazyModule('yfinance')
+WARM_UP_IMPORTS = os.getenv('WARM_UP_IMPORTS', 'true').lower() != 'false'
+
+# 기본 응답은 orjson으로 직렬화
+app = FastAPI(title="재무제표 시각화 API", default_response_class=FastJSONResponse)
 
 # CORS 설정 (로컬 개발 + 배포 환경)
 allowed_origins = [
@@ -53,6 +115,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (Accept-Encoding에 따라 brotli, 없으면 gzip / SSE 스트림은 제외)
+app.add_middleware(
+    BrotliMiddleware,
+    minimum_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+    gzip_fallback=True,
+    excluded_handlers=[r'/stream$'],
+)
+
+# 요청/업스트림 지표 (/metrics에서 Prometheus 텍스트 형식으로 제공)
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'http_request_duration_seconds', '경로별 요청 처리 시간', ('method', 'route', 'status')
+)
+upstream_latency = metrics.histogram(
+    'upstream_request_duration_seconds', '외부 API 호출 시간 (DART, yfinance, Gemini)',
+    ('service', 'operation', 'outcome')
+)
+llm_first_chunk_latency = metrics.histogram(
+    'llm_stream_first_chunk_seconds', 'AI 스트리밍 첫 청크까지 시간 (대기열 대기 포함)', ('kind',)
+)
+search_latency = metrics.histogram(
+    'company_search_duration_seconds', '회사 검색 시간 (메모리 레지스트리 / SQLite)', ('backend',),
+    buckets=FAST_BUCKETS
+)
+
+# 압축까지 포함한 처리 시간을 재도록 압축 미들웨어 바깥에 추가 (아래 프로파일링 미들웨어 바로 안쪽)
+app.add_middleware(MetricsMiddleware, histogram=request_latency)
+
+# 느린 요청 단계별 시간 기록, 관리자 요청 프로파일링 (X-Profile 헤더 또는 ?profile)
+# 마지막에 추가하므로 가장 바깥 미들웨어 - 단계 기록용 contextvar가 다른 미들웨어까지 감쌈
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(PROJECT_DIR, 'profiles'))
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 2000))
+slow_requests = deque(maxlen=200)
+app.add_middleware(
+    ProfilingMiddleware,
+    is_allowed=lambda scope: is_admin(Request(scope)),
+    profile_dir=PROFILE_DIR,
+    slow_threshold=SLOW_REQUEST_MS / 1000,
+    slow_log=slow_requests,
+)
+
 
 # 데이터 모델
 class Company(BaseModel):
@@ -60,6 +163,7 @@ class Company(BaseModel):
     corp_name: str
     stock_code: Optional[str]
     modify_date: Optional[str]
+    market: Optional[str] = None
 
 
 class FinancialStatement(BaseModel):
@@ -82,58 +186,527 @@ class FinancialStatement(BaseModel):
     bfefrmtrm_amount: Optional[str]
 
 
+DB_PATH = os.getenv('DART_DB_PATH', os.path.join(PROJECT_DIR, 'dart.db'))
+# DART OpenAPI 주소 (벤치마크 등에서 로컬 스텁 서버로 교체 가능)
+DART_API_BASE_URL = os.getenv('DART_API_BASE_URL', 'https://opendart.fss.or.kr/api').rstrip('/')
+# 회사코드 다운로드 URL (로컬 스텁 서버로 교체 가능)
+DART_CORP_CODE_URL = os.getenv('DART_CORP_CODE_URL', CORP_CODE_URL)
+
+# 상장회사 메모리 레지스트리 (검색 시 SQLite를 거치지 않음)
+company_registry = CompanyRegistry(DB_PATH)
+
+async def run_db(func, *args, **kwargs):
+    """동기 SQLite 작업을 스레드 풀에서 실행하고 현재 요청의 db 단계에 기록
+
+    async 핸들러에서 sqlite3를 직접 호출하면 다른 쓰기 트랜잭션(회사코드 동기화, 스크리너 수집 등)을
+    기다리는 동안(최대 timeout초) 이벤트 루프 전체가 멈추므로, DB 작업은 이 함수로 실행합니다.
+    """
+    with stage('db'):
+        return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+
+def observe_upstream(service: str, operation: str, outcome: str, seconds: float):
+    """외부 API 호출 시간을 지표와 현재 요청의 upstream 단계에 기록"""
+    upstream_latency.observe((service, operation, outcome), seconds)
+    record_stage('upstream', seconds)
+
+
+def record_upstream_request(url: str, status: str, seconds: float):
+    """UpstreamClient HTTP 호출 시간 기록 (DART는 API 이름별)"""
+    if url.startswith(DART_API_BASE_URL):
+        service, operation = 'dart', url[len(DART_API_BASE_URL):].lstrip('/')
+    else:
+        service, operation = urlsplit(url).netloc, 'get'
+    observe_upstream(service, operation, status, seconds)
+
+
+# DART, yfinance, Gemini 호출용 공용 연결 풀 / 블로킹 호출 스레드 풀
+upstream = UpstreamClient(on_request=record_upstream_request)
+
+# DART 재무제표 응답 영구 캐시 (dart.db)
+statement_cache = StatementCache(DB_PATH)
+
+# DART 호출 예산 (초당 호출 수 제한, 일일 사용량은 dart.db에 저장, 사용자 요청 우선)
+dart_scheduler = DartScheduler(
+    DB_PATH,
+    rate=float(os.getenv('DART_RATE_PER_SEC', 10)),
+    burst=int(os.getenv('DART_RATE_BURST', 20)),
+    daily_limit=int(os.getenv('DART_DAILY_LIMIT', 20000)),
+    reserve=int(os.getenv('DART_INTERACTIVE_RESERVE', 2000))
+)
+
+# 종목별 일봉 로컬 저장소 (dart.db)
+price_store = PriceStore(DB_PATH)
+
+# (ticker, period)별 기술적 지표 계산 결과
+indicator_cache = IndicatorCache()
+
+# Gemini 응답 영구 캐시 (dart.db, 모델/템플릿 버전/프롬프트 해시 기준)
+llm_cache = LLMCache(
+    DB_PATH,
+    ttl=float(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600)),
+    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 2000))
+)
+
+# Gemini 호출 스케줄러 (동시 실행 수 제한, 클라이언트별 공정 대기열, 초과 시 429)
+llm_queue = LLMQueue(
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 4)),
+    max_queue=int(os.getenv('LLM_MAX_QUEUE', 32)),
+    max_per_client=int(os.getenv('LLM_MAX_QUEUED_PER_CLIENT', 4))
+)
+
+# 정규화된 재무 수치/비율 저장소 (dart.db)
+financial_store = FinancialStore(DB_PATH)
+
+# 스크리너용 컬럼 데이터 (기간별, SCREENER_DATASET_TTL초마다 다시 적재)
+SCREENER_DATASET_TTL = 300
+screener_datasets = {}
+screener_build_status = {
+    "running": False,
+    "started_at": None,
+    "finished_at": None,
+    "result": None,
+    "error": None,
+}
+
+# 동일 키 동시 업스트림 요청 병합
+statement_flight = SingleFlight('dart_statement')
+stock_flight = SingleFlight('stock_history')
+
+# 재무제표 시계열 조회 시 DART 동시 요청 수 / 최대 기간 수
+SERIES_CONCURRENCY = int(os.getenv('DART_SERIES_CONCURRENCY', '5'))
+SERIES_MAX_PERIODS = 40
+
+
 def get_db_connection():
     """데이터베이스 연결"""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dart.db')
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
 
-@app.get("/api/companies/search", response_model=List[Company])
-def search_companies(query: str, limit: int = 20):
-    """회사명으로 검색"""
+# 서버 시작 소요 시간 (ms)
+startup_report = {}
+
+
+@app.on_event("startup")
+def load_company_registry():
+    """서버 시작 시 상장회사 목록을 메모리에 적재하고 시작 소요 시간 출력"""
+    started = time.perf_counter()
+    company_registry.reload()
+    dart_scheduler.load()
+    startup_report['import_ms'] = round((IMPORT_FINISHED - IMPORT_STARTED) * 1000, 1)
+    startup_report['startup_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    print(
+        f"✓ 서버 시작 준비 완료: import {startup_report['import_ms']:.0f}ms, "
+        f"시작 작업 {startup_report['startup_ms']:.0f}ms"
+    )
     
-    if not query:
-        raise HTTPException(status_code=400, detail="검색어를 입력하세요")
+    # yfinance / Gemini SDK는 요청을 받기 시작한 뒤 백그라운드에서 로드
+    if WARM_UP_IMPORTS:
+        warm_up(yf, genai)
+
+
+@app.on_event("shutdown")
+async def close_upstream():
+    """외부 API 연결 풀 정리, DART 사용량 저장"""
+    await upstream.aclose()
+    dart_scheduler.persist()
+
+
+# 검색 결과 정렬: 정확히 일치 > 접두어 일치 > 부분 일치, 같은 순위는 짧은 이름 우선
+SEARCH_RANK_SQL = '''
+    ORDER BY CASE
+        WHEN LOWER(corp_name) = :query THEN 0
+        WHEN LOWER(corp_name) LIKE :prefix ESCAPE '\\' THEN 1
+        ELSE 2
+    END, LENGTH(corp_name), corp_name
+    LIMIT :limit
+'''
+
+
+def escape_like(value: str) -> str:
+    """LIKE 패턴의 와일드카드 문자 이스케이프"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_companies_db(query_lower: str, limit: int):
+    """SQLite 검색 인덱스로 회사 검색 (레지스트리를 쓸 수 없을 때)"""
+    
+    params = {
+        'query': query_lower,
+        'prefix': f'{escape_like(query_lower)}%',
+        'substring': f'%{escape_like(query_lower)}%',
+        'match': '"' + query_lower.replace('"', '""') + '"',
+        'limit': limit,
+    }
     
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # LIKE 검색 (상장회사만 - stock_code가 6자리 숫자인 경우)
-    cursor.execute('''
-        SELECT corp_code, corp_name, TRIM(stock_code) as stock_code, modify_date
-        FROM companies
-        WHERE corp_name_lower LIKE ? 
-        AND LENGTH(TRIM(stock_code)) = 6
-        AND TRIM(stock_code) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
-        ORDER BY corp_name
-        LIMIT ?
-    ''', (f'%{query.lower()}%', limit))
-    
-    results = cursor.fetchall()
+    try:
+        if len(query_lower) >= 3:
+            # trigram 인덱스로 부분 문자열 검색
+            cursor.execute('''
+                SELECT corp_code, corp_name, stock_code, modify_date
+                FROM companies_fts
+                WHERE companies_fts MATCH :match
+            ''' + SEARCH_RANK_SQL, params)
+        else:
+            # 2글자 이하는 trigram으로 찾을 수 없으므로 상장회사 인덱스만 스캔
+            cursor.execute('''
+                SELECT corp_code, corp_name, stock_code, modify_date
+                FROM companies_fts
+                WHERE corp_name LIKE :substring ESCAPE '\\'
+            ''' + SEARCH_RANK_SQL, params)
+    except sqlite3.OperationalError:
+        # 검색 인덱스가 없는 이전 DB (init_db.py 재실행 전)
+        cursor.execute('''
+            SELECT corp_code, corp_name, TRIM(stock_code) as stock_code, modify_date
+            FROM companies
+            WHERE corp_name_lower LIKE :substring ESCAPE '\\'
+            AND LENGTH(TRIM(stock_code)) = 6
+            AND TRIM(stock_code) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
+        ''' + SEARCH_RANK_SQL, params)
+    
+    results = [dict(row) for row in cursor.fetchall()]
     conn.close()
     
-    companies = [
-        Company(
-            corp_code=row['corp_code'],
-            corp_name=row['corp_name'],
-            stock_code=row['stock_code'],
-            modify_date=row['modify_date']
-        )
-        for row in results
+    return results
+
+
+@app.get("/api/companies/search", response_model=List[Company])
+def search_companies(request: Request, query: str, limit: int = 20):
+    """회사명으로 검색 (초성 검색 지원, 예: ㅅㅅㅈㅈ)"""
+    
+    if not query:
+        raise HTTPException(status_code=400, detail="검색어를 입력하세요")
+    
+    query_lower = query.strip().lower()
+    if not query_lower:
+        raise HTTPException(status_code=400, detail="검색어를 입력하세요")
+    
+    started = time.perf_counter()
+    results = company_registry.search(query_lower, limit)
+    if results is None:
+        started = time.perf_counter()
+        results = search_companies_db(query_lower, limit)
+        search_latency.observe(('sqlite',), time.perf_counter() - started)
+        record_stage('db', time.perf_counter() - started)
+    else:
+        search_latency.observe(('registry',), time.perf_counter() - started)
+    
+    for row in results:
+        row['market'] = price_store.market(row['stock_code'])
+    
+    body = FastJSONResponse([Company(**row).model_dump() for row in results]).body
+    return conditional_response(request, body, CACHE_SEARCH)
+
+
+def is_admin(request: Request) -> bool:
+    """관리자 토큰이 맞는지 (ADMIN_TOKEN이 없으면 항상 거부)
+
+    같은 머신의 프록시나 포트 포워딩을 거치면 모든 요청이 로컬 주소로 보이므로
+    접속 주소로는 판단하지 않습니다.
+    """
+    if not ADMIN_TOKEN:
+        return False
+    # Prometheus 등 스크레이퍼는 Authorization: Bearer 헤더로도 전달 가능
+    token = request.headers.get('x-admin-token')
+    authorization = request.headers.get('authorization', '')
+    if token is None and authorization.startswith('Bearer '):
+        token = authorization[len('Bearer '):]
+    return token is not None and secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(request: Request):
+    """관리자 요청 확인 (ADMIN_TOKEN이 없으면 관리자 API를 사용할 수 없음)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="ADMIN_TOKEN이 설정되지 않아 관리자 API를 사용할 수 없습니다.")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+# 회사코드 증분 동기화 작업 상태 (한 번에 하나만 실행)
+corp_sync_lock = threading.Lock()
+corp_sync_status = {
+    "running": False,
+    "started_at": None,
+    "finished_at": None,
+    "result": None,
+    "error": None,
+}
+
+
+def run_corp_code_sync(force: bool = False):
+    """DART 회사코드를 받아 증분 동기화 후 레지스트리 재적재 (백그라운드 작업)"""
+    try:
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        try:
+            corp_sync_status["result"] = refresh_corp_codes(
+                conn, DART_API_KEY, url=DART_CORP_CODE_URL, force=force
+            )
+            corp_sync_status["error"] = None
+        finally:
+            conn.close()
+        company_registry.reload()
+    except Exception as e:
+        print(f"회사코드 동기화 중 오류: {str(e)}\n상세: {traceback.format_exc()}")
+        corp_sync_status["error"] = str(e)
+    finally:
+        corp_sync_status["running"] = False
+        corp_sync_status["finished_at"] = datetime.now().isoformat(timespec='seconds')
+        corp_sync_lock.release()
+
+
+@app.post("/api/admin/corp-codes/sync", status_code=202)
+def start_corp_code_sync(request: Request, background_tasks: BackgroundTasks, force: bool = False):
+    """DART 회사코드 변경분을 백그라운드에서 DB에 반영 (서버 재시작 불필요)
+    
+    Args:
+        force: True면 ETag/내용이 같아도 다시 다운로드
+    """
+    require_admin(request)
+    
+    if not DART_API_KEY:
+        raise HTTPException(status_code=503, detail="DART_API_KEY가 설정되지 않았습니다.")
+    
+    if not corp_sync_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="이미 동기화가 진행 중입니다.")
+    
+    corp_sync_status["running"] = True
+    corp_sync_status["started_at"] = datetime.now().isoformat(timespec='seconds')
+    background_tasks.add_task(run_corp_code_sync, force)
+    
+    return {"status": "started"}
+
+
+@app.get("/api/admin/corp-codes/sync")
+def get_corp_code_sync_status(request: Request):
+    """회사코드 동기화 작업 상태"""
+    require_admin(request)
+    return corp_sync_status
+
+
+def quota_exceeded_error(e: DartQuotaExceeded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(seconds_until_reset())})
+
+
+def dart_error_message(payload: str) -> str:
+    """DART 오류 응답에서 메시지 추출"""
+    try:
+        return json.loads(payload).get('message', '알 수 없는 오류')
+    except ValueError:
+        return '알 수 없는 오류'
+
+
+@app.get("/api/admin/upstream-stats")
+def get_upstream_stats(request: Request):
+    """업스트림 요청 병합(single-flight), LLM 대기열/캐시, 서버 시작 시간 통계"""
+    require_admin(request)
+    stats = {flight.name: flight.stats() for flight in (statement_flight, stock_flight)}
+    stats['llm_queue'] = llm_queue.stats()
+    stats['llm_cache'] = llm_cache.stats()
+    stats['statement_cache'] = statement_cache.stats()
+    stats['dart_quota'] = dart_scheduler.stats()
+    stats['startup'] = {
+        **startup_report,
+        'lazy_modules_ms': {
+            name: None if module.load_time is None else round(module.load_time * 1000, 1)
+            for name, module in (('yfinance', yf), ('google.generativeai', genai))
+        },
+    }
+    return stats
+
+
+def cache_ratio(hits: int, misses: int) -> Optional[float]:
+    return hits / (hits + misses) if hits + misses else None
+
+
+@metrics.collector
+def collect_service_stats():
+    """/metrics 조회 시점에 읽는 캐시, 요청 병합, LLM 대기열, 스레드 풀 상태"""
+    caches = {
+        'statement': statement_cache.stats(),
+        'llm': llm_cache.stats(),
+        'indicator': {'hits': indicator_cache.hits, 'misses': indicator_cache.misses},
+    }
+    yield ('cache_requests_total', 'counter', '캐시 조회 수', ('cache', 'result'), [
+        ((name, result), stats[key])
+        for name, stats in caches.items() for result, key in (('hit', 'hits'), ('miss', 'misses'))
+    ])
+    yield ('cache_hit_ratio', 'gauge', '서버 시작 후 캐시 적중률', ('cache',), [
+        ((name,), cache_ratio(stats['hits'], stats['misses'])) for name, stats in caches.items()
+    ])
+    
+    flights = [flight.name for flight in (statement_flight, stock_flight)]
+    flight_stats = [flight.stats() for flight in (statement_flight, stock_flight)]
+    yield ('singleflight_calls_total', 'counter', '업스트림 실제 호출 수', ('name',), [
+        ((name,), stats['calls']) for name, stats in zip(flights, flight_stats)
+    ])
+    yield ('singleflight_coalesced_total', 'counter', '진행 중인 호출에 합쳐진 요청 수', ('name',), [
+        ((name,), stats['coalesced']) for name, stats in zip(flights, flight_stats)
+    ])
+    yield ('singleflight_in_flight', 'gauge', '진행 중인 업스트림 호출 수', ('name',), [
+        ((name,), stats['in_flight']) for name, stats in zip(flights, flight_stats)
+    ])
+    
+    queue = llm_queue.stats()
+    yield ('llm_queue_running', 'gauge', '실행 중인 AI 작업 수', (), [((), queue['running'])])
+    yield ('llm_queue_waiting', 'gauge', '대기 중인 AI 작업 수', (), [((), queue['queued'])])
+    yield ('llm_queue_max_concurrency', 'gauge', 'AI 작업 동시 실행 한도', (), [((), queue['max_concurrency'])])
+    yield ('llm_queue_jobs_total', 'counter', 'AI 작업 처리 결과별 수', ('result',), [
+        ((result,), queue[result]) for result in ('completed', 'failed', 'rejected', 'deduplicated')
+    ])
+    yield ('llm_queue_wait_seconds', 'gauge', '최근 AI 작업 대기 시간 분위수', ('quantile',), [
+        (('0.5',), queue['queue_time_ms']['p50'] / 1000),
+        (('0.95',), queue['queue_time_ms']['p95'] / 1000),
+    ])
+    
+    workers = upstream.blocking_workers
+    pending = upstream.blocking_pending
+    yield ('threadpool_workers', 'gauge', '스레드 풀 크기', ('pool',), [(('upstream',), workers)])
+    yield ('threadpool_busy', 'gauge', '작업 중인 스레드 수', ('pool',), [(('upstream',), min(pending, workers))])
+    yield ('threadpool_queued', 'gauge', '스레드를 기다리는 작업 수', ('pool',), [
+        (('upstream',), max(pending - workers, 0))
+    ])
+    quota = dart_scheduler.stats()
+    yield ('dart_quota_used', 'gauge', '오늘(KST) DART API 호출 수', (), [((), quota['used'])])
+    yield ('dart_quota_remaining', 'gauge', '오늘 남은 DART API 호출 예산', (), [((), quota['remaining'])])
+    yield ('dart_scheduler_waiting', 'gauge', '토큰을 기다리는 DART 호출 수', ('priority',), [
+        (('interactive',), quota['waiting_interactive']),
+        (('prefetch',), quota['waiting_prefetch']),
+    ])
+    yield ('dart_quota_rejected_total', 'counter', '예산 부족으로 거절한 DART 호출 수', (), [((), quota['rejected'])])
+    
+    yield ('company_registry_size', 'gauge', '메모리 레지스트리의 상장회사 수', (), [((), len(company_registry))])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Prometheus 형식 지표 (요청/업스트림 지연 히스토그램, 캐시 적중률, 대기열/스레드 풀 상태)"""
+    require_admin(request)
+    
+    # 동기 엔드포인트를 실행하는 anyio 스레드 풀 (이벤트 루프에서만 조회 가능)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    request_pool = limiter.statistics()
+    request_threads = [
+        ('threadpool_workers', 'gauge', '스레드 풀 크기', ('pool',), [(('request',), limiter.total_tokens)]),
+        ('threadpool_busy', 'gauge', '작업 중인 스레드 수', ('pool',), [(('request',), limiter.borrowed_tokens)]),
+        ('threadpool_queued', 'gauge', '스레드를 기다리는 작업 수', ('pool',), [
+            (('request',), request_pool.tasks_waiting)
+        ]),
     ]
+    return Response(metrics.render(request_threads), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/admin/slow-requests")
+def get_slow_requests(request: Request, limit: int = 50):
+    """SLOW_REQUEST_MS 이상 걸린 최근 요청과 단계별(db, upstream, serialize, other) 시간 (최신순)"""
+    require_admin(request)
+    return {
+        "threshold_ms": SLOW_REQUEST_MS,
+        "requests": list(reversed(slow_requests))[:limit],
+    }
+
+
+@app.get("/api/admin/profiles")
+def list_profiles(request: Request):
+    """저장된 요청 프로파일 목록 (X-Profile 헤더 또는 ?profile로 요청하면 생성)"""
+    require_admin(request)
+    if not os.path.isdir(PROFILE_DIR):
+        return {"profiles": []}
+    names = sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith('.collapsed')), reverse=True)
+    return {
+        "profiles": [
+            {"id": name[:-len('.collapsed')], "size": os.path.getsize(os.path.join(PROFILE_DIR, name))}
+            for name in names
+        ]
+    }
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+def get_profile(request: Request, profile_id: str):
+    """요청 프로파일 다운로드 (collapsed stack 형식, flamegraph.pl / speedscope에서 열 수 있음)"""
+    require_admin(request)
+    path = os.path.join(PROFILE_DIR, f"{os.path.basename(profile_id)}.collapsed")
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return FileResponse(path, media_type='text/plain; charset=utf-8', filename=os.path.basename(path))
+
+
+async def fetch_financial_statement(corp_code: str, bsns_year: str, reprt_code: str) -> dict:
+    """DART에서 재무제표를 받아 캐시에 저장 (dart_scheduler의 호출 예산 사용)
+    
+    Returns:
+        status(DART 상태 코드)와 payload(응답 JSON 문자열)
+    """
+    url = f"{DART_API_BASE_URL}/fnlttSinglAcnt.json"
+    
+    params = {
+        'crtfc_key': DART_API_KEY,
+        'corp_code': corp_code,
+        'bsns_year': bsns_year,
+        'reprt_code': reprt_code
+    }
+    
+    # 재시도도 DART 호출이므로 매번 예산을 받음
+    acquire = functools.partial(dart_scheduler.acquire, INTERACTIVE)
+    await acquire()
+    response = await upstream.get(url, params=params, timeout=10, before_retry=acquire)
+    data = response.json()
+    
+    status = data.get('status', '')
+    if status == STATUS_QUOTA_EXCEEDED:
+        dart_scheduler.mark_exhausted()
+        raise DartQuotaExceeded(f"DART API 사용량 초과: {data.get('message', '')}")
+    
+    payload = json.dumps(data, ensure_ascii=False)
+    await run_db(store_financial_statement, corp_code, bsns_year, reprt_code, status, payload)
+    return {'status': status, 'payload': payload}
+
+
+def store_financial_statement(corp_code: str, bsns_year: str, reprt_code: str, status: str, payload: str):
+    """DART 응답을 statement_cache에 저장하고 정상 응답이면 정규화 항목도 적재"""
+    statement_cache.put(corp_code, bsns_year, reprt_code, status, payload)
+    if status == STATUS_OK:
+        financial_store.ingest(corp_code, bsns_year, reprt_code, payload)
+
+
+async def load_financial_statement(corp_code: str, bsns_year: str, reprt_code: str):
+    """캐시 또는 DART에서 재무제표 조회
     
-    return companies
+    DART 호출 예산이 부족하면(dart_scheduler.low_budget) 만료된 캐시라도 있으면 그것을 반환하고,
+    예산을 다 썼는데 캐시도 없으면 DartQuotaExceeded를 발생시킵니다.
+    
+    Returns:
+        (status/payload dict, 'HIT', 'MISS' 또는 'STALE')
+    """
+    result = await run_db(statement_cache.get, corp_code, bsns_year, reprt_code, allow_stale=True)
+    if result is not None and (not result['stale'] or dart_scheduler.low_budget):
+        return result, "STALE" if result['stale'] else "HIT"
+    
+    try:
+        # 같은 재무제표를 동시에 요청하면 DART 호출 한 번의 결과를 공유
+        fresh = await statement_flight.do(
+            (corp_code, bsns_year, reprt_code),
+            lambda: fetch_financial_statement(corp_code, bsns_year, reprt_code)
+        )
+    except DartQuotaExceeded:
+        if result is None:
+            raise
+        return result, "STALE"
+    return fresh, "MISS"
 
 
 @app.get("/api/financial-statement")
-def get_financial_statement(
+async def get_financial_statement(
+    request: Request,
     corp_code: str,
     bsns_year: str,
     reprt_code: str = "11011"
 ):
-    """재무제표 조회
+    """재무제표 조회 (dart.db 캐시 우선, X-Cache 헤더로 적중 여부 표시, ETag/304 지원)
     
     Args:
         corp_code: 회사 고유번호 (8자리)
@@ -144,90 +717,533 @@ def get_financial_statement(
             - 11013: 1분기보고서
             - 11014: 3분기보고서
     """
-    url = "https://opendart.fss.or.kr/api/fnlttSinglAcnt.json"
+    try:
+        result, cache_state = await load_financial_statement(corp_code, bsns_year, reprt_code)
+    except DartQuotaExceeded as e:
+        raise quota_exceeded_error(e)
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"API 요청 실패: {str(e)}")
     
-    params = {
-        'crtfc_key': DART_API_KEY,
-        'corp_code': corp_code,
-        'bsns_year': bsns_year,
-        'reprt_code': reprt_code
+    cache_header = {"X-Cache": cache_state}
+    if result['status'] != STATUS_OK:
+        raise HTTPException(
+            status_code=400,
+            detail=f"DART API 오류: {dart_error_message(result['payload'])}",
+            headers=cache_header
+        )
+    
+    # 지난 사업연도는 immutable, 그 외에는 서버 캐시 유효 시간 기준 (ETag로 재검증)
+    # 예산 부족으로 만료된 캐시를 보낸 경우에는 클라이언트가 매번 재검증
+    return conditional_response(
+        request,
+        result['payload'].encode('utf-8'),
+        'no-cache' if cache_state == "STALE" else statement_cache_control(bsns_year),
+        headers=cache_header
+    )
+
+
+@app.get("/api/financial-statement/series")
+async def get_financial_statement_series(
+    corp_code: str,
+    start_year: int,
+    end_year: int,
+    reprt_codes: str = "11011",
+    fs_div: str = "CFS"
+):
+    """여러 사업연도/보고서의 재무제표를 계정과목별 시계열로 조회
+    
+    캐시에 없는 기간만 DART에 동시에 요청합니다 (최대 SERIES_CONCURRENCY개씩).
+    
+    Args:
+        corp_code: 회사 고유번호 (8자리)
+        start_year: 시작 사업연도
+        end_year: 끝 사업연도
+        reprt_codes: 쉼표로 구분한 보고서 코드 (예: 11013,11012,11014,11011)
+        fs_div: CFS(연결재무제표) 또는 OFS(재무제표)
+    """
+    codes = [code.strip() for code in reprt_codes.split(',') if code.strip()]
+    if start_year > end_year or not codes:
+        raise HTTPException(status_code=400, detail="조회 기간 또는 보고서 코드를 확인하세요.")
+    
+    keys = [(str(year), code) for year in range(start_year, end_year + 1) for code in codes]
+    if len(keys) > SERIES_MAX_PERIODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {SERIES_MAX_PERIODS}개 기간까지 조회할 수 있습니다."
+        )
+    
+    semaphore = asyncio.Semaphore(SERIES_CONCURRENCY)
+    
+    async def load(bsns_year: str, reprt_code: str):
+        async with semaphore:
+            try:
+                result, cache_state = await load_financial_statement(corp_code, bsns_year, reprt_code)
+            except (httpx.HTTPError, ValueError, DartQuotaExceeded) as e:
+                print(f"재무제표 시계열 조회 실패 ({bsns_year}/{reprt_code}): {str(e)}")
+                result, cache_state = {'status': 'error', 'payload': ''}, "MISS"
+        return {
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code,
+            'status': result['status'],
+            'payload': result['payload'],
+            'cache': cache_state,
+        }
+    
+    results = await asyncio.gather(*(load(year, code) for year, code in keys))
+    series = build_series(results, fs_div)
+    
+    hits = sum(1 for result in results if result['cache'] in ("HIT", "STALE"))
+    return {
+        "status": "success",
+        "corp_code": corp_code,
+        "fs_div": fs_div,
+        "periods": series['periods'],
+        "accounts": series['accounts'],
+        "cache_hits": hits,
+        "cache_misses": len(results) - hits,
     }
+
+
+def ingest_financial_facts(corp_code: str, bsns_year: str, reprt_code: str, fs_div: str, payload: str):
+    """캐시에만 있고 아직 정규화되지 않은 재무제표를 적재한 뒤 조회"""
+    financial_store.ingest(corp_code, bsns_year, reprt_code, payload)
+    return financial_store.get(corp_code, bsns_year, reprt_code, fs_div)
+
+
+@app.get("/api/financial-metrics")
+async def get_financial_metrics(
+    corp_code: str,
+    bsns_year: str,
+    reprt_code: str = "11011",
+    fs_div: str = "CFS"
+):
+    """정규화된 주요 계정 금액(정수)과 미리 계산된 재무비율/전년 대비 증감률 조회
     
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+    Args:
+        corp_code: 회사 고유번호 (8자리)
+        bsns_year: 사업연도 (4자리)
+        reprt_code: 보고서 코드
+        fs_div: CFS(연결재무제표) 또는 OFS(재무제표), 없으면 다른 구분 사용
+    """
+    facts = await run_db(financial_store.get, corp_code, bsns_year, reprt_code, fs_div)
+    
+    if facts is None:
+        try:
+            result, _ = await load_financial_statement(corp_code, bsns_year, reprt_code)
+        except DartQuotaExceeded as e:
+            raise quota_exceeded_error(e)
+        except (httpx.HTTPError, ValueError) as e:
+            raise HTTPException(status_code=500, detail=f"API 요청 실패: {str(e)}")
         
-        if data['status'] != '000':
+        if result['status'] != STATUS_OK:
             raise HTTPException(
                 status_code=400,
-                detail=f"DART API 오류: {data.get('message', '알 수 없는 오류')}"
+                detail=f"DART API 오류: {dart_error_message(result['payload'])}"
             )
         
-        return data
-        
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"API 요청 실패: {str(e)}")
+        # 캐시에만 있고 아직 정규화되지 않은 재무제표
+        facts = await run_db(ingest_financial_facts, corp_code, bsns_year, reprt_code, fs_div, result['payload'])
+        if facts is None:
+            raise HTTPException(status_code=404, detail="재무제표 항목이 없습니다.")
+    
+    return {
+        "status": "success",
+        "corp_code": corp_code,
+        "bsns_year": bsns_year,
+        "reprt_code": reprt_code,
+        **facts,
+    }
+
+
+def get_screener_dataset(bsns_year: str, reprt_code: str, fs_div: str) -> ScreenerDataset:
+    """기간별 스크리너 데이터 (메모리 캐시)"""
+    key = (bsns_year, reprt_code, fs_div)
+    dataset = screener_datasets.get(key)
+    if dataset is None or time.time() - dataset.loaded_at > SCREENER_DATASET_TTL:
+        dataset = ScreenerDataset.load(DB_PATH, bsns_year, reprt_code, fs_div)
+        screener_datasets[key] = dataset
+    return dataset
+
+
+@app.get("/api/screener")
+def screen_companies(
+    bsns_year: str,
+    reprt_code: str = "11011",
+    fs_div: str = "CFS",
+    filters: str = "",
+    sort: Optional[str] = None,
+    order: str = "desc",
+    limit: int = 50
+):
+    """전체 상장회사 재무 데이터에서 조건 검색 및 정렬
+    
+    Args:
+        bsns_year: 사업연도
+        reprt_code: 보고서 코드
+        fs_div: 우선 사용할 재무제표 구분 (CFS/OFS)
+        filters: 쉼표로 구분한 조건 (예: roe>15,debt_ratio<100)
+        sort: 정렬 기준 항목 (예: roe)
+        order: desc(내림차순) 또는 asc(오름차순)
+        limit: 최대 결과 수
+    """
+    try:
+        conditions = parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if sort and sort not in SCREENER_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 정렬 항목입니다: {sort}")
+    
+    dataset = get_screener_dataset(bsns_year, reprt_code, fs_div)
+    results = dataset.screen(conditions, sort=sort, descending=(order != "asc"), limit=limit)
+    
+    for row in results:
+        company = company_registry.get(row['corp_code'])
+        row['corp_name'] = company['corp_name'] if company else None
+        row['stock_code'] = company['stock_code'] if company else None
+    
+    return {
+        "status": "success",
+        "bsns_year": bsns_year,
+        "reprt_code": reprt_code,
+        "universe": len(dataset),
+        "count": len(results),
+        "results": results,
+    }
+
+
+async def run_screener_build(bsns_year: str, reprt_code: str):
+    """상장회사 전체 재무 데이터 수집 (백그라운드 작업)"""
+    try:
+        screener_build_status["result"] = await collect_financials(
+            upstream,
+            f"{DART_API_BASE_URL}/fnlttMultiAcnt.json",
+            DART_API_KEY,
+            company_registry.listed(),
+            bsns_year,
+            reprt_code,
+            financial_store,
+            scheduler=dart_scheduler
+        )
+        screener_build_status["error"] = None
+        for key in [key for key in screener_datasets if key[:2] == (bsns_year, reprt_code)]:
+            del screener_datasets[key]
+    except Exception as e:
+        print(f"스크리너 데이터 수집 중 오류: {str(e)}\n상세: {traceback.format_exc()}")
+        screener_build_status["error"] = str(e)
+    finally:
+        screener_build_status["running"] = False
+        screener_build_status["finished_at"] = datetime.now().isoformat(timespec='seconds')
+
+
+@app.post("/api/admin/screener/build", status_code=202)
+def start_screener_build(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    bsns_year: str,
+    reprt_code: str = "11011"
+):
+    """스크리너용 상장회사 재무 데이터를 DART 다중회사 API로 일괄 수집"""
+    require_admin(request)
+    
+    if not DART_API_KEY:
+        raise HTTPException(status_code=503, detail="DART_API_KEY가 설정되지 않았습니다.")
+    
+    if screener_build_status["running"]:
+        raise HTTPException(status_code=409, detail="이미 수집이 진행 중입니다.")
+    
+    if dart_scheduler.low_budget:
+        raise quota_exceeded_error(DartQuotaExceeded(
+            f"DART API 남은 호출 예산이 {dart_scheduler.remaining:,}회라 사용자 요청용으로 남겨둡니다."
+        ))
+    
+    screener_build_status["running"] = True
+    screener_build_status["started_at"] = datetime.now().isoformat(timespec='seconds')
+    background_tasks.add_task(run_screener_build, bsns_year, reprt_code)
+    
+    return {"status": "started"}
+
+
+@app.get("/api/admin/screener/build")
+def get_screener_build_status(request: Request):
+    """스크리너 데이터 수집 작업 상태"""
+    require_admin(request)
+    return screener_build_status
+
+
+REPORT_CODES = [
+    {"code": "11011", "name": "사업보고서"},
+    {"code": "11012", "name": "반기보고서"},
+    {"code": "11013", "name": "1분기보고서"},
+    {"code": "11014", "name": "3분기보고서"}
+]
+REPORT_CODES_BODY = FastJSONResponse(REPORT_CODES).body
 
 
 @app.get("/api/report-codes")
-def get_report_codes():
+def get_report_codes(request: Request):
     """보고서 코드 목록"""
-    return [
-        {"code": "11011", "name": "사업보고서"},
-        {"code": "11012", "name": "반기보고서"},
-        {"code": "11013", "name": "1분기보고서"},
-        {"code": "11014", "name": "3분기보고서"}
-    ]
+    return conditional_response(request, REPORT_CODES_BODY, CACHE_STATIC)
+
+
+def statement_metric_lines(financial_data: dict) -> List[str]:
+    """DART 응답 dict에서 프롬프트용 재무비율 문자열 생성"""
+    items = financial_data.get('list', [])
+    fs_div = select_fs_div(items, 'CFS')
+    if fs_div is None:
+        return []
+    return format_metrics(compute_metrics(normalize_statement(items, fs_div)))
+
+
+# Gemini 모델 (최신 안정 버전 사용)
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+# 프롬프트 템플릿 버전 (문구를 바꾸면 올려서 이전 캐시를 쓰지 않도록 함)
+PROMPT_VERSIONS = {
+    'explain': 1,
+    'investment': 1,
+}
+
+GEMINI_SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+
+def is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_key(request: Request) -> str:
+    """LLM 대기열에서 클라이언트를 구분하는 키
+
+    기본은 접속한 주소이고, 접속 주소가 TRUSTED_PROXIES에 있을 때만 X-Forwarded-For를
+    오른쪽부터 따라가 신뢰하지 않는 첫 주소를 씁니다 (왼쪽 값은 클라이언트가 마음대로 넣을 수 있음).
+    """
+    host = request.client.host if request.client else 'unknown'
+    forwarded = request.headers.get('x-forwarded-for')
+    if not forwarded or not is_trusted_proxy(host):
+        return host
+    for hop in reversed([value.strip() for value in forwarded.split(',') if value.strip()]):
+        host = hop
+        if not is_trusted_proxy(hop):
+            break
+    return host
+
+
+def queue_full_error(e: QueueFullError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+async def generate_text(kind: str, prompt: str, max_output_tokens: int,
+                        client_id: str, temperature: float = 0.7):
+    """Gemini로 응답 생성 (llm_cache에 같은 키가 있으면 API를 호출하지 않음)
+    
+    API 호출은 llm_queue를 거치므로 동시 실행 수가 제한되고, 같은 프롬프트가 대기/실행 중이면
+    한 번만 호출합니다. 대기열이 가득 차면 429 HTTPException을 발생시킵니다.
+    
+    Returns:
+        (응답 텍스트, "HIT" 또는 "MISS")
+    """
+    key = cache_key(GEMINI_MODEL, kind, PROMPT_VERSIONS[kind], prompt)
+    cached = await run_db(llm_cache.get, key)
+    if cached is not None:
+        return cached, "HIT"
+    
+    async def generate():
+        # Gemini API 호출 (안전 설정 추가, 비동기 클라이언트라 스레드 풀을 점유하지 않음)
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await model.generate_content_async(
+                prompt,
+                **gemini_options(max_output_tokens, temperature)
+            )
+            outcome = 'ok'
+        finally:
+            observe_upstream('gemini', kind, outcome, time.perf_counter() - started)
+        await run_db(llm_cache.put, key, kind, GEMINI_MODEL, result.text)
+        return result.text
+    
+    try:
+        text = await llm_queue.run(client_id, key, generate)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    return text, "MISS"
+
+
+def gemini_options(max_output_tokens: int, temperature: float) -> dict:
+    return {
+        'generation_config': genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        ),
+        'safety_settings': GEMINI_SAFETY_SETTINGS,
+    }
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 형식 문자열 (data는 JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_text(kind: str, prompt: str, max_output_tokens: int, client_id: str, temperature: float = 0.7):
+    """Gemini 응답을 생성되는 대로 SSE로 전달하는 StreamingResponse
+    
+    이벤트: chunk {"text"} 여러 번 → done {"cached"} 또는 error {"message"}
+    캐시에 있으면 저장된 응답을 chunk 하나로 바로 보내고, 없으면 비동기 스트림을 그대로 전달한 뒤
+    끝까지 받은 응답만 캐시에 저장합니다 (스트리밍 중에는 스레드 풀을 점유하지 않음).
+    """
+    key = cache_key(GEMINI_MODEL, kind, PROMPT_VERSIONS[kind], prompt)
+    cached = await run_db(llm_cache.get, key)
+    if cached is None:
+        # 대기열이 가득 찼으면 스트림을 열기 전에 429로 응답
+        try:
+            llm_queue.ensure_capacity(client_id)
+        except QueueFullError as e:
+            raise queue_full_error(e)
+    
+    async def events():
+        if cached is not None:
+            yield sse_event('chunk', {'text': cached})
+            yield sse_event('done', {'cached': True})
+            return
+        
+        parts = []
+        queued_at = time.perf_counter()
+        started = None
+        try:
+            # 차례가 올 때까지 대기한 뒤 스트림이 끝날 때까지 실행 슬롯 점유
+            async with llm_queue.slot(client_id):
+                model = genai.GenerativeModel(GEMINI_MODEL)
+                started = time.perf_counter()
+                stream = await model.generate_content_async(
+                    prompt,
+                    stream=True,
+                    **gemini_options(max_output_tokens, temperature)
+                )
+                async for chunk in stream:
+                    text = chunk.text
+                    if text:
+                        if not parts:
+                            llm_first_chunk_latency.observe((kind,), time.perf_counter() - queued_at)
+                        parts.append(text)
+                        yield sse_event('chunk', {'text': text})
+        except Exception as e:
+            if started is not None:
+                observe_upstream('gemini', f'{kind}/stream', 'error', time.perf_counter() - started)
+            print(f"AI 스트리밍 중 오류 ({kind}): {str(e)}\n상세: {traceback.format_exc()}")
+            yield sse_event('error', {'message': str(e)})
+            return
+        
+        observe_upstream('gemini', f'{kind}/stream', 'ok', time.perf_counter() - started)
+        await run_db(llm_cache.put, key, kind, GEMINI_MODEL, ''.join(parts))
+        yield sse_event('done', {'cached': False})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": "MISS" if cached is None else "HIT",
+        }
+    )
 
 
 class ExplainRequest(BaseModel):
+    """재무제표 설명 요청
+
+    financial_data를 보내지 않으면 corp_code/year/reprt_code로 서버 캐시에서 조회합니다.
+    """
     company_name: str
     year: str
-    financial_data: dict
+    corp_code: Optional[str] = None
+    reprt_code: str = "11011"
+    financial_data: Optional[dict] = None
 
 
 class InvestmentAnalysisRequest(BaseModel):
+    """투자 분석 요청
+
+    financial_data/stock_data를 보내지 않으면 corp_code/year/reprt_code와
+    stock_code/period로 서버 캐시(재무제표 캐시, 로컬 시세 저장소)에서 조회합니다.
+    """
     company_name: str
     stock_code: str
     year: str
-    financial_data: dict
-    stock_data: dict
+    corp_code: Optional[str] = None
+    reprt_code: str = "11011"
+    period: str = "1y"
+    financial_data: Optional[dict] = None
+    stock_data: Optional[dict] = None
 
 
-@app.post("/api/explain-financial-statement")
-def explain_financial_statement(request: ExplainRequest):
-    """Gemini AI를 사용하여 재무제표 설명"""
+async def resolve_financial_data(request) -> dict:
+    """요청에 재무제표가 없으면 corp_code/year/reprt_code로 조회 (dart.db 캐시 우선)"""
+    if request.financial_data is not None:
+        return request.financial_data
+    if not request.corp_code:
+        raise HTTPException(status_code=400, detail="financial_data 또는 corp_code가 필요합니다.")
     
-    if not GEMINI_API_KEY:
+    try:
+        result, _ = await load_financial_statement(request.corp_code, request.year, request.reprt_code)
+    except DartQuotaExceeded as e:
+        raise quota_exceeded_error(e)
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"API 요청 실패: {str(e)}")
+    
+    if result['status'] != STATUS_OK:
         raise HTTPException(
-            status_code=503,
-            detail="GEMINI_API_KEY가 설정되지 않았습니다. .env 파일에 추가해주세요."
+            status_code=400,
+            detail=f"DART API 오류: {dart_error_message(result['payload'])}"
         )
+    return json.loads(result['payload'])
+
+
+async def resolve_stock_data(request: InvestmentAnalysisRequest) -> dict:
+    """요청에 주가 데이터가 없으면 stock_code/period로 조회 (로컬 시세 저장소 우선, 지표 포함)"""
+    if request.stock_data is not None:
+        return request.stock_data
+    return await stock_price_result(request.stock_code, request.period, INDICATOR_NAMES)
+
+
+def build_explain_prompt(request: ExplainRequest, financial_data: dict) -> str:
+    """재무제표 설명 프롬프트 생성"""
     
-    try:
-        # Gemini 모델 생성 (최신 안정 버전 사용)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # 재무 데이터 요약
-        financial_summary = []
-        for item in request.financial_data.get('list', [])[:15]:  # 상위 15개만
-            if item.get('fs_div') == 'CFS':  # 연결재무제표만
-                sj_nm = item.get('sj_nm', '')
-                account_nm = item.get('account_nm', '')
-                thstrm = item.get('thstrm_amount', '0')
-                frmtrm = item.get('frmtrm_amount', '0')
-                
-                financial_summary.append(
-                    f"{sj_nm} - {account_nm}: 당기 {thstrm}, 전기 {frmtrm}"
-                )
-        
-        # 프롬프트 생성
-        prompt = f"""당신은 고등학생도 이해할 수 있도록 재무제표를 쉽게 설명하는 전문가입니다. 
+    # 재무 데이터 요약
+    financial_summary = []
+    for item in financial_data.get('list', [])[:15]:  # 상위 15개만
+        if item.get('fs_div') == 'CFS':  # 연결재무제표만
+            sj_nm = item.get('sj_nm', '')
+            account_nm = item.get('account_nm', '')
+            thstrm = item.get('thstrm_amount', '0')
+            frmtrm = item.get('frmtrm_amount', '0')
+            
+            financial_summary.append(
+                f"{sj_nm} - {account_nm}: 당기 {thstrm}, 전기 {frmtrm}"
+            )
+    
+    # 주요 재무비율/증감률은 서버에서 미리 계산
+    metric_lines = statement_metric_lines(financial_data)
+    
+    # 프롬프트 생성
+    prompt = f"""당신은 고등학생도 이해할 수 있도록 재무제표를 쉽게 설명하는 전문가입니다. 
 {request.company_name}의 {request.year}년 재무제표를 분석하여 아래 형식으로 설명해주세요.
 
 📊 주요 재무 데이터:
 {chr(10).join(financial_summary[:10])}
 
+📐 미리 계산된 재무비율 (아래 값을 그대로 사용하세요):
+{chr(10).join(metric_lines)}
+
 다음 형식으로 구조화된 설명을 작성해주세요:
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -294,39 +1310,131 @@ def explain_financial_statement(request: ExplainRequest):
 
 모든 설명은 고등학생이 이해할 수 있는 쉬운 단어로 작성하고, 전문용어는 반드시 괄호()로 풀어서 설명해주세요.
 구체적인 숫자를 많이 사용하여 실감나게 설명해주세요."""
+    return prompt
+
+
+def build_investment_prompt(request: InvestmentAnalysisRequest, financial_data: dict, stock_data: dict) -> str:
+    """투자 분석 프롬프트 생성 (재무제표 + 주가 통계/기술적 지표)"""
+
+    # 재무 데이터 요약
+    financial_summary = []
+    for item in financial_data.get('list', [])[:20]:
+        if item.get('fs_div') == 'CFS':
+            sj_nm = item.get('sj_nm', '')
+            account_nm = item.get('account_nm', '')
+            thstrm = item.get('thstrm_amount', '0')
+            frmtrm = item.get('frmtrm_amount', '0')
+
+            financial_summary.append(
+                f"{sj_nm} - {account_nm}: 당기 {thstrm}, 전기 {frmtrm}"
+            )
+
+    # 주요 재무비율/증감률은 서버에서 미리 계산
+    metric_lines = statement_metric_lines(financial_data)
+
+    # 주가 통계
+    stock_stats = stock_data.get('statistics', {})
+    current_price = stock_stats.get('current_price', 0)
+    change_percent = stock_stats.get('change_percent', 0)
+    high_52week = stock_stats.get('high_52week', 0)
+    low_52week = stock_stats.get('low_52week', 0)
+
+    # 기술적 지표 (/api/stock-price?indicators=... 로 받았거나 서버에서 조회한 경우)
+    indicator_lines = format_indicators(
+        (stock_data.get('indicators') or {}).get('summary', {})
+    )
+    indicator_section = (
+        "\n\n📉 기술적 지표:\n" + "\n".join(f"- {line}" for line in indicator_lines)
+        if indicator_lines else ""
+    )
+
+    # AI 프롬프트 생성
+    prompt = f"""당신은 금융 전문가입니다. {request.company_name}({request.stock_code})의 {request.year}년 재무제표와 최근 주가 데이터를 종합적으로 분석하여 투자 의견을 제시해주세요.
+
+📊 재무제표 주요 데이터:
+{chr(10).join(financial_summary[:15])}
+
+📐 미리 계산된 재무비율 (아래 값을 그대로 사용하세요):
+{chr(10).join(metric_lines)}
+
+📈 주가 현황:
+- 현재가: {current_price:,.0f}원
+- 기간 변동률: {change_percent:+.2f}%
+- 52주 최고가: {high_52week:,.0f}원
+- 52주 최저가: {low_52week:,.0f}원{indicator_section}
+
+다음 형식으로 종합 투자 분석을 작성해주세요:
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+📊 1. 재무제표 핵심 분석
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+- 자산/부채/자본 구조 평가
+- 매출 및 수익성 분석
+- 주요 재무비율 (부채비율, ROE, 영업이익률 등)
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+📈 2. 주가 트렌드 분석
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+- 현재 주가 수준 평가 (52주 최고/최저 대비)
+- 최근 변동성 및 추세 분석
+- 시장 대비 상대적 강도
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+🔍 3. 재무제표 vs 주가 괴리도 분석
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+- 재무 실적 대비 주가가 적정한지 평가
+- 고평가/저평가 여부 분석
+- PER, PBR 등 밸류에이션 지표 언급 (추정)
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+💡 4. 종합 투자 의견
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+**투자 등급**: 매수 / 보유 / 매도 중 하나 선택
+
+**투자 포인트**:
+✅ 강점 3가지
+❌ 약점 3가지
+
+**목표가 및 전략**:
+- 적정 목표 주가 제시 (근거 포함)
+- 단기/중기/장기 투자 전략 제안
+
+**리스크 요인**:
+- 주의해야 할 위험 요소 나열
+
+구체적인 숫자를 사용하여 설득력 있게 작성해주세요.
+전문 투자자가 읽어도 유익한 수준의 분석을 제공해주세요."""
+    return prompt
+
+
+@app.post("/api/explain-financial-statement")
+async def explain_financial_statement(request: ExplainRequest, response: Response, http_request: Request):
+    """Gemini AI를 사용하여 재무제표 설명"""
+    
+    if not GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="GEMINI_API_KEY가 설정되지 않았습니다. .env 파일에 추가해주세요."
+        )
+    
+    try:
+        financial_data = await resolve_financial_data(request)
+        prompt = build_explain_prompt(request, financial_data)
         
-        # Gemini API 호출 (안전 설정 추가)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=2500,
-            ),
-            safety_settings=[
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE"
-                }
-            ]
+        # Gemini API 호출 (같은 입력이면 캐시된 응답 사용)
+        explanation, cache_state = await generate_text(
+            'explain', prompt, max_output_tokens=2500, client_id=client_key(http_request)
         )
+        response.headers["X-Cache"] = cache_state
         
         return {
             "status": "success",
-            "explanation": response.text
+            "explanation": explanation
         }
         
+    except HTTPException:
+        raise
+        
     except Exception as e:
         import traceback
         error_detail = f"AI 설명 생성 중 오류: {str(e)}\n상세: {traceback.format_exc()}"
@@ -338,60 +1446,141 @@ def explain_financial_statement(request: ExplainRequest):
         }
 
 
-@app.get("/api/stock-price")
-def get_stock_price(stock_code: str, period: str = "1y"):
-    """주식 가격 정보 조회
+@app.post("/api/explain-financial-statement/stream")
+async def explain_financial_statement_stream(request: ExplainRequest, http_request: Request):
+    """재무제표 설명을 생성되는 대로 SSE로 전달"""
+    
+    if not GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="GEMINI_API_KEY가 설정되지 않았습니다. .env 파일에 추가해주세요."
+        )
+    
+    financial_data = await resolve_financial_data(request)
+    return await stream_text(
+        'explain', build_explain_prompt(request, financial_data), max_output_tokens=2500,
+        client_id=client_key(http_request)
+    )
 
-    Args:
-        stock_code: 종목 코드 (6자리)
-        period: 조회 기간 (1mo, 3mo, 6mo, 1y, 2y, 5y)
-    """
+
+def yf_history(ticker_symbol: str, **kwargs):
+    """yfinance 일봉 조회 (호출 시간을 지표로 기록)"""
+    started = time.perf_counter()
+    outcome = 'error'
     try:
-        # 한국 주식 코드 형식으로 변환 (예: 005930 -> 005930.KS)
-        ticker_symbol = f"{stock_code}.KS"
+        hist = yf.Ticker(ticker_symbol).history(**kwargs)
+        outcome = 'empty' if hist.empty else 'ok'
+        return hist
+    finally:
+        observe_upstream('yfinance', 'history', outcome, time.perf_counter() - started)
 
-        # yfinance로 주식 데이터 가져오기
-        stock = yf.Ticker(ticker_symbol)
 
-        # 역사적 데이터 가져오기
-        hist = stock.history(period=period)
+def fetch_stock_history(stock_code: str, period: str, ticker_symbol: Optional[str] = None):
+    """yfinance로 주가 이력 조회 (종목 시장을 모르면 코스피 .KS 실패 시 코스닥 .KQ 시도)"""
+    
+    if ticker_symbol:
+        return ticker_symbol, yf_history(ticker_symbol, period=period)
+    
+    # 한국 주식 코드 형식으로 변환 (예: 005930 -> 005930.KS)
+    ticker_symbol = f"{stock_code}.KS"
+    
+    # yfinance로 역사적 데이터 가져오기
+    hist = yf_history(ticker_symbol, period=period)
+    
+    if hist.empty:
+        # KS가 안되면 KQ(코스닥) 시도
+        ticker_symbol = f"{stock_code}.KQ"
+        hist = yf_history(ticker_symbol, period=period)
+    
+    return ticker_symbol, hist
+
 
+def load_stock_history(stock_code: str, period: str):
+    """로컬 시세 저장소에서 주가 이력 조회 (없는 구간이나 최근 봉만 yfinance에서 받음)
+    
+    Returns:
+        (티커, 컬럼별 목록 dict) - 데이터가 없으면 dict 대신 None
+    """
+    start = period_start(period)
+    with stage('db'):
+        meta = price_store.meta(stock_code)
+    
+    if not PriceStore.covers(meta, start):
+        # 처음 조회하거나 저장된 것보다 긴 기간: 요청 기간 전체를 받음
+        if meta:
+            ticker_symbol = meta['ticker']
+        else:
+            market = price_store.market(stock_code)
+            ticker_symbol = market_ticker(stock_code, market) if market else None
+        ticker_symbol, hist = fetch_stock_history(stock_code, period, ticker_symbol)
         if hist.empty:
-            # KS가 안되면 KQ(코스닥) 시도
-            ticker_symbol = f"{stock_code}.KQ"
-            stock = yf.Ticker(ticker_symbol)
-            hist = stock.history(period=period)
-
-            if hist.empty:
-                raise HTTPException(
-                    status_code=404,
-                    detail="주식 데이터를 찾을 수 없습니다. 종목 코드를 확인해주세요."
-                )
+            return ticker_symbol, None
+        with stage('db'):
+            price_store.save(stock_code, ticker_symbol, hist, start)
+        
+        # 시장 구분을 저장해 두면 다음부터는 .KS/.KQ를 시도하지 않고 한 번에 조회
+        market = ticker_market(ticker_symbol)
+        if market and price_store.market(stock_code) != market:
+            price_store.save_market(stock_code, market)
+    elif not PriceStore.is_fresh(meta):
+        # 마지막으로 저장한 날짜 이후 봉만 받음
+        ticker_symbol = meta['ticker']
+        try:
+            hist = yf_history(ticker_symbol, start=meta['last_date'])
+        except Exception as e:
+            # 갱신에 실패해도 저장된 봉으로 응답
+            print(f"✗ 주가 갱신 실패 ({ticker_symbol}), 저장된 데이터 사용: {str(e)}")
+            hist = None
+        if hist is not None and not hist.empty:
+            with stage('db'):
+                price_store.save(stock_code, ticker_symbol, hist, meta['covered_from'])
+        elif hist is not None:
+            # 새 봉 없음 (휴장일 등)
+            with stage('db'):
+                price_store.touch(stock_code)
+    else:
+        ticker_symbol = meta['ticker']
+    
+    with stage('db'):
+        stock_data = price_store.load(stock_code, start)
+    return ticker_symbol, stock_data if stock_data['dates'] else None
 
-        # 데이터 가공
-        stock_data = {
-            "dates": hist.index.strftime('%Y-%m-%d').tolist(),
-            "prices": hist['Close'].tolist(),
-            "volumes": hist['Volume'].tolist(),
-            "high": hist['High'].tolist(),
-            "low": hist['Low'].tolist(),
-            "open": hist['Open'].tolist(),
-        }
 
-        # 기본 통계 계산
-        current_price = hist['Close'].iloc[-1]
-        previous_price = hist['Close'].iloc[0]
+async def stock_price_result(stock_code: str, period: str, indicator_names: tuple = ()) -> dict:
+    """주가 이력, 기본 통계, 요청한 기술적 지표 (/api/stock-price 응답 형식)"""
+    if period != 'ytd' and period not in PERIOD_DAYS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 조회 기간입니다: {period}")
+
+    try:
+        # 로컬 저장소 조회와 yfinance 호출은 스레드 풀에서 실행 (같은 종목/기간 동시 요청은 한 번만 조회)
+        ticker_symbol, stock_data = await stock_flight.do(
+            (stock_code, period),
+            lambda: upstream.run_blocking(load_stock_history, stock_code, period)
+        )
+
+        if stock_data is None:
+            raise HTTPException(
+                status_code=404,
+                detail="주식 데이터를 찾을 수 없습니다. 종목 코드를 확인해주세요."
+            )
+
+        # 기본 통계 계산 (비어 있는 시가/고가/저가(None)는 NaN으로 보고 제외)
+        current_price = stock_data['prices'][-1]
+        previous_price = stock_data['prices'][0]
         change = current_price - previous_price
         change_percent = (change / previous_price) * 100
 
-        # 52주 최고/최저
-        high_52week = hist['High'].max()
-        low_52week = hist['Low'].min()
+        # 52주 최고/최저 (고가/저가가 없는 봉만 있으면 종가 기준)
+        closes = np.asarray(stock_data['prices'], dtype=float)
+        highs = np.fmax(np.asarray(stock_data['high'], dtype=float), closes)
+        lows = np.fmin(np.asarray(stock_data['low'], dtype=float), closes)
+        high_52week = float(np.nanmax(highs))
+        low_52week = float(np.nanmin(lows))
 
         # 평균 거래량
-        avg_volume = hist['Volume'].mean()
+        avg_volume = float(np.nanmean(np.asarray(stock_data['volumes'], dtype=float)))
 
-        return {
+        result = {
             "status": "success",
             "ticker": ticker_symbol,
             "data": stock_data,
@@ -406,6 +1595,17 @@ def get_stock_price(stock_code: str, period: str = "1y"):
             }
         }
 
+        if indicator_names:
+            result["indicators"] = select_indicators(
+                indicator_cache.get(ticker_symbol, period, stock_data),
+                indicator_names
+            )
+
+        return result
+
+    except HTTPException:
+        raise
+
     except Exception as e:
         import traceback
         error_detail = f"주식 데이터 조회 중 오류: {str(e)}\n상세: {traceback.format_exc()}"
@@ -417,8 +1617,35 @@ def get_stock_price(stock_code: str, period: str = "1y"):
         )
 
 
+@app.get("/api/stock-price")
+async def get_stock_price(request: Request, stock_code: str, period: str = "1y",
+                          indicators: Optional[str] = None, encoding: Optional[str] = None):
+    """주식 가격 정보 조회
+
+    Args:
+        stock_code: 종목 코드 (6자리)
+        period: 조회 기간 (1mo, 3mo, 6mo, 1y, 2y, 5y)
+        indicators: 함께 계산할 기술적 지표 (예: ma20,rsi14,volatility,drawdown,returns 또는 all)
+        encoding: compact면 일봉(data)을 정수 차분 형식으로 반환 (price_store.compact_series 참고)
+    """
+    if encoding not in (None, 'compact'):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {encoding}")
+
+    try:
+        indicator_names = parse_indicators(indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await stock_price_result(stock_code, period, indicator_names)
+    if encoding == 'compact':
+        result = {**result, "data": compact_series(result["data"])}
+
+    # 긴 숫자 목록은 jsonable_encoder를 거치지 않고 바로 직렬화 (새 봉이 없으면 304)
+    return conditional_response(request, FastJSONResponse(result).body, CACHE_LIVE)
+
+
 @app.post("/api/investment-analysis")
-def investment_analysis(request: InvestmentAnalysisRequest):
+async def investment_analysis(request: InvestmentAnalysisRequest, response: Response, http_request: Request):
     """재무제표와 주가 데이터를 종합하여 AI 투자 분석 제공"""
 
     if not GEMINI_API_KEY:
@@ -428,101 +1655,23 @@ def investment_analysis(request: InvestmentAnalysisRequest):
         )
 
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-
-        # 재무 데이터 요약
-        financial_summary = []
-        for item in request.financial_data.get('list', [])[:20]:
-            if item.get('fs_div') == 'CFS':
-                sj_nm = item.get('sj_nm', '')
-                account_nm = item.get('account_nm', '')
-                thstrm = item.get('thstrm_amount', '0')
-                frmtrm = item.get('frmtrm_amount', '0')
-
-                financial_summary.append(
-                    f"{sj_nm} - {account_nm}: 당기 {thstrm}, 전기 {frmtrm}"
-                )
-
-        # 주가 통계
-        stock_stats = request.stock_data.get('statistics', {})
-        current_price = stock_stats.get('current_price', 0)
-        change_percent = stock_stats.get('change_percent', 0)
-        high_52week = stock_stats.get('high_52week', 0)
-        low_52week = stock_stats.get('low_52week', 0)
-
-        # AI 프롬프트 생성
-        prompt = f"""당신은 금융 전문가입니다. {request.company_name}({request.stock_code})의 {request.year}년 재무제표와 최근 주가 데이터를 종합적으로 분석하여 투자 의견을 제시해주세요.
-
-📊 재무제표 주요 데이터:
-{chr(10).join(financial_summary[:15])}
-
-📈 주가 현황:
-- 현재가: {current_price:,.0f}원
-- 기간 변동률: {change_percent:+.2f}%
-- 52주 최고가: {high_52week:,.0f}원
-- 52주 최저가: {low_52week:,.0f}원
-
-다음 형식으로 종합 투자 분석을 작성해주세요:
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📊 1. 재무제표 핵심 분석
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-- 자산/부채/자본 구조 평가
-- 매출 및 수익성 분석
-- 주요 재무비율 (부채비율, ROE, 영업이익률 등)
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📈 2. 주가 트렌드 분석
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-- 현재 주가 수준 평가 (52주 최고/최저 대비)
-- 최근 변동성 및 추세 분석
-- 시장 대비 상대적 강도
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🔍 3. 재무제표 vs 주가 괴리도 분석
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-- 재무 실적 대비 주가가 적정한지 평가
-- 고평가/저평가 여부 분석
-- PER, PBR 등 밸류에이션 지표 언급 (추정)
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💡 4. 종합 투자 의견
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-**투자 등급**: 매수 / 보유 / 매도 중 하나 선택
-
-**투자 포인트**:
-✅ 강점 3가지
-❌ 약점 3가지
-
-**목표가 및 전략**:
-- 적정 목표 주가 제시 (근거 포함)
-- 단기/중기/장기 투자 전략 제안
-
-**리스크 요인**:
-- 주의해야 할 위험 요소 나열
-
-구체적인 숫자를 사용하여 설득력 있게 작성해주세요.
-전문 투자자가 읽어도 유익한 수준의 분석을 제공해주세요."""
+        financial_data = await resolve_financial_data(request)
+        stock_data = await resolve_stock_data(request)
+        prompt = build_investment_prompt(request, financial_data, stock_data)
 
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=3000,
-            ),
-            safety_settings=[
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
-            ]
+        analysis, cache_state = await generate_text(
+            'investment', prompt, max_output_tokens=3000, client_id=client_key(http_request)
         )
+        response.headers["X-Cache"] = cache_state
 
         return {
             "status": "success",
-            "analysis": response.text
+            "analysis": analysis
         }
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         import traceback
         error_detail = f"투자 분석 생성 중 오류: {str(e)}\n상세: {traceback.format_exc()}"
@@ -534,41 +1683,50 @@ def investment_analysis(request: InvestmentAnalysisRequest):
         }
 
 
+@app.post("/api/investment-analysis/stream")
+async def investment_analysis_stream(request: InvestmentAnalysisRequest, http_request: Request):
+    """투자 분석을 생성되는 대로 SSE로 전달"""
+
+    if not GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="GEMINI_API_KEY가 설정되지 않았습니다."
+        )
+
+    financial_data = await resolve_financial_data(request)
+    stock_data = await resolve_stock_data(request)
+    return await stream_text(
+        'investment', build_investment_prompt(request, financial_data, stock_data), max_output_tokens=3000,
+        client_id=client_key(http_request)
+    )
+
+
 # ============================================
 # 정적 파일 서빙 (맨 마지막에 정의 - catch-all 라우트)
 # ============================================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 POSSIBLE_STATIC_DIRS = [
     os.path.join(BASE_DIR, "frontend", "dist"),
-    os.path.join(os.path.dirname(__file__), "..", "frontend", "dist"),
     "frontend/dist",
-    "./frontend/dist"
 ]
 
-STATIC_DIR = None
-for possible_dir in POSSIBLE_STATIC_DIRS:
-    abs_path = os.path.abspath(possible_dir)
-    print(f"🔍 정적 파일 경로 확인: {abs_path}")
-    if os.path.exists(abs_path):
-        STATIC_DIR = abs_path
-        print(f"✅ 정적 파일 디렉토리 발견: {STATIC_DIR}")
-        break
+STATIC_DIR = next(
+    (os.path.abspath(path) for path in POSSIBLE_STATIC_DIRS if os.path.isdir(path)),
+    None
+)
 
-if STATIC_DIR and os.path.exists(STATIC_DIR):
-    print(f"📂 정적 파일 내용: {os.listdir(STATIC_DIR)}")
+if STATIC_DIR:
+    print(f"✓ 정적 파일 디렉토리: {STATIC_DIR}")
     
     # assets 폴더가 있는 경우에만 마운트
     assets_dir = os.path.join(STATIC_DIR, "assets")
     if os.path.exists(assets_dir):
         app.mount("/assets", StaticFiles(directory=assets_dir), name="static")
-        print(f"✅ /assets 마운트 완료")
     
     @app.get("/")
     async def serve_root():
         """프론트엔드 index.html 서빙"""
-        index_path = os.path.join(STATIC_DIR, "index.html")
-        print(f"📄 index.html 서빙: {index_path}")
-        return FileResponse(index_path)
+        return FileResponse(os.path.join(STATIC_DIR, "index.html"))
     
     @app.get("/{full_path:path}")
     async def serve_spa(full_path: str):
@@ -585,15 +1743,16 @@ if STATIC_DIR and os.path.exists(STATIC_DIR):
         # 그 외에는 index.html 반환 (SPA 라우팅)
         return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 else:
-    print(f"❌ 정적 파일 디렉토리를 찾을 수 없습니다. 시도한 경로:")
-    for possible_dir in POSSIBLE_STATIC_DIRS:
-        print(f"  - {os.path.abspath(possible_dir)}")
+    print(f"✗ 정적 파일 디렉토리를 찾을 수 없습니다: {', '.join(POSSIBLE_STATIC_DIRS)}")
     
     @app.get("/")
     def read_root():
         return {"message": "재무제표 시각화 API", "error": "프론트엔드 빌드 파일을 찾을 수 없습니다."}
 
 
+IMPORT_FINISHED = time.perf_counter()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
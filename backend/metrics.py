@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# SQLite / 메모리 검색처럼 짧은 작업용 구간 (초)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Tuple[str, ...], values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """레이블별 고정 구간 히스토그램 (관측 1회 = 이진 탐색 + 카운터 2개 증가)
+
+    요청 수는 따로 세지 않고 _count 시계열(레이블별 관측 수)을 사용합니다.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # 레이블 -> [구간별 개수 (마지막은 +Inf), 합계]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                yield f"{self.name}_bucket{format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}"
+
+
+# 수집 시점에 값을 읽는 지표: (이름, 종류, 설명, 레이블 이름, [(레이블 값, 값)])
+Collected = Tuple[str, str, str, Tuple[str, ...], List[Tuple[tuple, float]]]
+
+
+class MetricsRegistry:
+    """Prometheus 텍스트 형식 지표 모음
+
+    요청 경로에서 갱신하는 Histogram과, /metrics 조회 시점에만 다른 객체의 통계
+    (캐시 적중 수, 대기열 길이 등)를 읽는 수집 함수를 함께 관리합니다.
+    """
+
+    def __init__(self):
+        self._metrics: List[Histogram] = []
+        self._collectors: List[Callable[[], Iterable[Collected]]] = []
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func: Callable[[], Iterable[Collected]]):
+        """조회 시점 수집 함수 등록 (데코레이터로도 사용)"""
+        self._collectors.append(func)
+        return func
+
+    def render(self, extra: Optional[Iterable[Collected]] = None) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+
+        # 같은 이름의 수집 결과는 한 지표로 합침 (레이블만 다른 값)
+        families: Dict[str, list] = {}
+        collected = [item for func in self._collectors for item in func()]
+        for name, kind, help_text, labelnames, values in collected + list(extra or ()):
+            family = families.setdefault(name, [kind, help_text, labelnames, []])
+            family[3].extend(values)
+
+        for name, (kind, help_text, labelnames, values) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                if value is not None:
+                    lines.append(f"{name}{format_labels(labelnames, labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """경로 템플릿(/api/stock-price 등)별 요청 수와 처리 시간 기록 (순수 ASGI 미들웨어)
+
+    라우팅이 끝난 뒤 scope['route']의 경로 템플릿을 레이블로 쓰므로, 경로 매개변수가 달라도
+    레이블 개수가 늘어나지 않습니다. 스트리밍 응답은 마지막 청크를 보낼 때까지를 잽니다.
+    """
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            self.histogram.observe((scope['method'], path, str(status)), time.perf_counter() - started)
@@ -0,0 +1,265 @@
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+from indicators import fill_forward
+
+
+# 조회 기간 -> 일수 (None은 전체)
+PERIOD_DAYS = {
+    '5d': 7,
+    '1mo': 31,
+    '3mo': 92,
+    '6mo': 183,
+    '1y': 366,
+    '2y': 731,
+    '5y': 1827,
+    '10y': 3653,
+    'max': None,
+}
+
+# 시장 구분 -> yfinance 티커 접미사
+MARKET_SUFFIXES = {
+    'KOSPI': '.KS',
+    'KOSDAQ': '.KQ',
+}
+
+# 압축 형식(encoding=compact)에서 가격에 곱하는 값 (소수점 둘째 자리까지 보존)
+COMPACT_PRICE_SCALE = 100
+
+# 마지막 조회 후 이 시간이 지나면 최근 봉만 다시 받음 (초)
+REFRESH_INTERVAL = 10 * 60
+
+
+def period_start(period: str, today: Optional[date] = None) -> Optional[str]:
+    """조회 기간의 시작일 (YYYY-MM-DD, 전체 기간이면 None)"""
+    today = today or date.today()
+    if period == 'ytd':
+        return date(today.year, 1, 1).isoformat()
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"지원하지 않는 조회 기간입니다: {period}")
+    days = PERIOD_DAYS[period]
+    return None if days is None else (today - timedelta(days=days)).isoformat()
+
+
+def market_ticker(stock_code: str, market: str) -> str:
+    """종목코드와 시장 구분으로 yfinance 티커 생성 (예: 005930, KOSPI -> 005930.KS)"""
+    return f"{stock_code}{MARKET_SUFFIXES[market]}"
+
+
+def ticker_market(ticker: str) -> Optional[str]:
+    """yfinance 티커의 시장 구분 (예: 035720.KQ -> KOSDAQ)"""
+    for market, suffix in MARKET_SUFFIXES.items():
+        if ticker.endswith(suffix):
+            return market
+    return None
+
+
+def compact_series(stock_data: dict, scale: int = COMPACT_PRICE_SCALE) -> dict:
+    """일봉 컬럼을 정수 차분 형식으로 변환 (/api/stock-price?encoding=compact)
+
+    날짜는 시작일(start)과 이전 봉과의 일수 차이(date_deltas),
+    가격은 scale을 곱한 정수의 첫 값과 차분, 거래량은 첫 값과 차분으로 표현합니다.
+    복원: values[i] = (deltas[0] + ... + deltas[i]) / scale (거래량은 scale 없이 누적합)
+    """
+    dates = stock_data['dates']
+    result = {
+        'encoding': 'compact',
+        'scale': scale,
+        'start': dates[0] if dates else None,
+        'date_deltas': np.diff([date.fromisoformat(d).toordinal() for d in dates]).tolist() if dates else [],
+    }
+    for name in ('open', 'high', 'low', 'prices'):
+        values = fill_forward(np.asarray(stock_data[name], dtype=np.float64))
+        scaled = np.rint(np.nan_to_num(values) * scale).astype(np.int64)
+        result[name] = np.diff(scaled, prepend=0).tolist()
+    volumes = np.asarray(stock_data['volumes'], dtype=np.int64)
+    result['volumes'] = np.diff(volumes, prepend=0).tolist()
+    return result
+
+
+class PriceStore:
+    """종목별 일봉(OHLCV)을 dart.db에 저장하는 로컬 시세 저장소
+
+    stock_price_meta에 종목별로 어느 시작일까지 받아 두었는지(covered_from)와
+    마지막 봉 날짜, 마지막 확인 시각을 기록하여 필요한 구간만 새로 받습니다.
+    종목별 시장 구분(KOSPI/KOSDAQ)은 stock_markets에 한 번 확인한 뒤 보관합니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._initialized = False
+        self._markets: Optional[dict] = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS stock_prices (
+                    stock_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    PRIMARY KEY (stock_code, date)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS stock_price_meta (
+                    stock_code TEXT PRIMARY KEY,
+                    ticker TEXT NOT NULL,
+                    covered_from TEXT,
+                    last_date TEXT,
+                    checked_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS stock_markets (
+                    stock_code TEXT PRIMARY KEY,
+                    market TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def meta(self, stock_code: str) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT ticker, covered_from, last_date, checked_at
+                FROM stock_price_meta WHERE stock_code = ?
+            ''', (stock_code,)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {'ticker': row[0], 'covered_from': row[1], 'last_date': row[2], 'checked_at': row[3]}
+
+    def market(self, stock_code: str) -> Optional[str]:
+        """저장된 시장 구분 (아직 확인하지 않은 종목은 None)"""
+        if self._markets is None:
+            conn = self._connect()
+            try:
+                self._markets = dict(conn.execute('SELECT stock_code, market FROM stock_markets'))
+            finally:
+                conn.close()
+        return self._markets.get(stock_code)
+
+    def save_market(self, stock_code: str, market: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO stock_markets (stock_code, market, resolved_at)
+                    VALUES (?, ?, ?)
+                ''', (stock_code, market, time.time()))
+        finally:
+            conn.close()
+        if self._markets is not None:
+            self._markets[stock_code] = market
+
+    @staticmethod
+    def covers(meta: Optional[dict], start: Optional[str]) -> bool:
+        """저장된 구간이 start부터의 조회를 포함하는지"""
+        if meta is None:
+            return False
+        if meta['covered_from'] is None:
+            return True
+        return start is not None and meta['covered_from'] <= start
+
+    @staticmethod
+    def is_fresh(meta: dict) -> bool:
+        return time.time() - meta['checked_at'] < REFRESH_INTERVAL
+
+    def save(self, stock_code: str, ticker: str, hist, covered_from: Optional[str]):
+        """yfinance history DataFrame을 저장하고 메타데이터 갱신
+
+        Args:
+            covered_from: 이번 저장으로 확보된 시작일 (None이면 전체 기간). 기존 값보다 늦으면 무시
+        """
+        # 거래정지일이나 아직 확정되지 않은 장중 봉은 종가가 NaN으로 오므로 저장하지 않음
+        hist = hist.dropna(subset=['Close'])
+        if hist.empty:
+            # 새 봉이 없음 (휴장일 등): 저장된 봉은 그대로 두고 확인 시각만 갱신
+            self.touch(stock_code)
+            return
+
+        rows = list(zip(
+            hist.index.strftime('%Y-%m-%d'),
+            hist['Open'].tolist(),
+            hist['High'].tolist(),
+            hist['Low'].tolist(),
+            hist['Close'].tolist(),
+            hist['Volume'].fillna(0).astype('int64').tolist(),
+        ))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO stock_prices
+                    (stock_code, date, open, high, low, close, volume)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(stock_code,) + row for row in rows])
+
+                previous = conn.execute(
+                    'SELECT covered_from FROM stock_price_meta WHERE stock_code = ?', (stock_code,)
+                ).fetchone()
+                if previous is not None and (previous[0] is None or (
+                        covered_from is not None and previous[0] < covered_from)):
+                    covered_from = previous[0]
+
+                last_date = conn.execute(
+                    'SELECT MAX(date) FROM stock_prices WHERE stock_code = ?', (stock_code,)
+                ).fetchone()[0]
+                conn.execute('''
+                    INSERT OR REPLACE INTO stock_price_meta
+                    (stock_code, ticker, covered_from, last_date, checked_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (stock_code, ticker, covered_from, last_date, time.time()))
+        finally:
+            conn.close()
+
+    def touch(self, stock_code: str):
+        """최근 봉 확인 시각만 갱신 (REFRESH_INTERVAL 동안 다시 조회하지 않음)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    'UPDATE stock_price_meta SET checked_at = ? WHERE stock_code = ?',
+                    (time.time(), stock_code)
+                )
+        finally:
+            conn.close()
+
+    def load(self, stock_code: str, start: Optional[str]) -> dict:
+        """start 이후 일봉을 컬럼별 목록으로 반환"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT date, open, high, low, close, volume
+                FROM stock_prices
+                WHERE stock_code = ? AND date >= ? AND close IS NOT NULL
+                ORDER BY date
+            ''', (stock_code, start or '')).fetchall()
+        finally:
+            conn.close()
+
+        columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in range(6)]
+        dates, opens, highs, lows, closes, volumes = columns
+        return {
+            "dates": dates,
+            "prices": closes,
+            "volumes": volumes,
+            "high": highs,
+            "low": lows,
+            "open": opens,
+        }
@@ -0,0 +1,178 @@
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Deque, Dict, Optional
+
+
+# 샘플링 간격 (초)
+SAMPLE_INTERVAL = 0.002
+
+# 대기 중인 스레드로 보고 샘플에서 제외할 가장 안쪽 프레임 (파일 이름, 함수 이름)
+IDLE_FRAMES = frozenset({
+    ('threading.py', 'wait'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+})
+
+# 요청 처리 단계별 누적 시간 (초) - 요청마다 새 dict
+_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar('request_stages', default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    """현재 요청의 단계별 시간에 더함 (요청 밖에서 호출되면 무시)"""
+    stages = _stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """with 블록 실행 시간을 현재 요청의 name 단계에 기록 ('db', 'upstream', 'serialize' 등)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+class StackSampler:
+    """sys._current_frames()로 모든 스레드의 호출 스택을 주기적으로 수집하는 샘플링 프로파일러
+
+    결과는 flamegraph.pl / speedscope에서 바로 열 수 있는 collapsed stack 형식
+    ('스레드;바깥 함수;...;안쪽 함수 샘플 수')입니다. 이벤트 루프와 스레드 풀을 함께 샘플링하므로
+    프로파일링 중 동시에 처리된 다른 요청도 섞일 수 있습니다.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # 스레드 풀 작업자 번호는 합침 (upstream-blocking_3 -> upstream-blocking)
+                thread_name = re.sub(r'[_-]?\d+$', '', names.get(thread_id, 'thread'))
+                stack.append(thread_name)
+                self.samples[';'.join(reversed(stack))] += 1
+
+    @staticmethod
+    def collapsed(samples: Counter) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class ProfilingMiddleware:
+    """느린 요청 단계별 시간 기록과 관리자용 요청 프로파일링 (순수 ASGI 미들웨어)
+
+    모든 요청에 단계별 시간 dict를 붙이고, 전체 시간이 slow_threshold(초) 이상이면
+    단계(db, upstream, serialize, 나머지) 분해를 출력하고 slow_log에 남깁니다.
+    X-Profile 헤더나 profile 쿼리 매개변수가 있고 is_allowed(scope)가 참이면 요청을
+    StackSampler로 샘플링해 profile_dir에 .collapsed 파일로 저장하고 X-Profile-Id 헤더로 이름을 알려줍니다.
+    """
+
+    def __init__(self, app, is_allowed: Callable[[dict], bool], profile_dir: str,
+                 slow_threshold: float, slow_log: Deque[dict]):
+        self.app = app
+        self.is_allowed = is_allowed
+        self.profile_dir = profile_dir
+        self.slow_threshold = slow_threshold
+        self.slow_log = slow_log
+        self._profile_count = 0
+
+    def wants_profile(self, scope) -> bool:
+        if any(name == b'x-profile' for name, _ in scope['headers']):
+            return self.is_allowed(scope)
+        query = scope.get('query_string', b'')
+        if re.search(rb'(^|&)profile(=|&|$)', query):
+            return self.is_allowed(scope)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stages: Dict[str, float] = {}
+        token = _stages.set(stages)
+        sampler = None
+        profile_id = None
+        if self.wants_profile(scope):
+            self._profile_count += 1
+            profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{self._profile_count}"
+            sampler = StackSampler()
+            sampler.start()
+
+        status = 500
+
+        async def send_with_profile(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if profile_id is not None:
+                    message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', profile_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            elapsed = time.perf_counter() - started
+            _stages.reset(token)
+            if sampler is not None:
+                self.save_profile(profile_id, scope, sampler.stop())
+            if elapsed >= self.slow_threshold:
+                self.log_slow_request(scope, status, elapsed, stages)
+
+    def save_profile(self, profile_id: str, scope, samples: Counter):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{profile_id}.collapsed")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(StackSampler.collapsed(samples))
+        print(f"✓ 프로파일 저장: {scope['method']} {scope['path']} -> {path} ({sum(samples.values())} samples)")
+
+    def log_slow_request(self, scope, status: int, elapsed: float, stages: Dict[str, float]):
+        breakdown = {name: round(seconds * 1000, 1) for name, seconds in stages.items()}
+        breakdown['other'] = round(max(elapsed - sum(stages.values()), 0.0) * 1000, 1)
+        query = scope.get('query_string', b'').decode('latin-1')
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'method': scope['method'],
+            'path': scope['path'] + (f"?{query}" if query else ''),
+            'route': getattr(scope.get('route'), 'path', None),
+            'status': status,
+            'duration_ms': round(elapsed * 1000, 1),
+            'stages_ms': breakdown,
+        }
+        self.slow_log.append(entry)
+        parts = ', '.join(f"{name} {ms:.0f}ms" for name, ms in breakdown.items())
+        print(f"✗ 느린 요청: {entry['method']} {entry['path']} {status} {entry['duration_ms']:.0f}ms ({parts})")
@@ -0,0 +1,58 @@
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from profiling import stage
+
+
+# 엔드포인트별 Cache-Control 정책 (재무제표는 statement_cache.statement_cache_control)
+CACHE_STATIC = 'public, max-age=86400'   # 보고서 코드 목록
+CACHE_SEARCH = 'public, max-age=300'     # 회사 검색 (회사코드 동기화 시 변경)
+CACHE_LIVE = 'public, max-age=60'        # 주가 (장중 갱신)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSON 응답 (기본 응답 클래스)
+
+    NumPy 배열/스칼라를 그대로 직렬화할 수 있고, NaN/Infinity는 null로 변환합니다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with stage('serialize'):
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def make_etag(body: bytes) -> str:
+    """응답 본문으로 만든 약한 ETag
+
+    압축 미들웨어가 같은 본문을 brotli/gzip/무압축 중 하나로 보내므로, 전송 바이트가 같다고
+    보장하는 강한 ETag 대신 내용이 같다는 뜻의 W/ ETag를 씁니다.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더에 etag가 있는지 확인 (약한 비교, *도 처리)"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    opaque = etag.removeprefix('W/')
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == opaque:
+            return True
+    return False
+
+
+def conditional_response(request: Request, body: bytes, cache_control: str,
+                         headers: Optional[dict] = None, media_type: str = 'application/json') -> Response:
+    """ETag/Cache-Control을 붙인 응답 (If-None-Match가 일치하면 본문 없이 304)"""
+    with stage('serialize'):
+        etag = make_etag(body)
+    headers = {'ETag': etag, 'Cache-Control': cache_control, **(headers or {})}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
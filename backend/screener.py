@@ -0,0 +1,201 @@
+import functools
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from dart_quota import PREFETCH, STATUS_QUOTA_EXCEEDED, DartQuotaExceeded
+from financials import ACCOUNT_IDS, RATIO_IDS, YOY_IDS
+
+
+# 스크리너에서 사용할 수 있는 컬럼 (금액은 원, 비율/증감률은 %)
+SCREENER_COLUMNS = ACCOUNT_IDS + RATIO_IDS + YOY_IDS
+
+# DART 다중회사 주요계정 API는 한 번에 최대 100개 회사까지 조회 가능
+MULTI_ACCOUNT_BATCH = 100
+
+# 필터 조건 (예: roe>15, debt_ratio<=100)
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+FILTER_OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+def parse_filters(expression: str) -> List[tuple]:
+    """'roe>15, debt_ratio<100' 형식의 조건을 (컬럼, 연산자, 값) 목록으로 변환
+
+    조건은 쉼표 또는 and로 구분하며, 모든 조건을 만족하는 회사만 남깁니다.
+    """
+    conditions = []
+    for part in re.split(r',|\band\b', expression or '', flags=re.IGNORECASE):
+        if not part.strip():
+            continue
+        match = FILTER_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"잘못된 조건입니다: {part.strip()}")
+        column, operator, value = match.groups()
+        if column not in SCREENER_COLUMNS:
+            raise ValueError(f"지원하지 않는 항목입니다: {column}")
+        conditions.append((column, operator, float(value)))
+    return conditions
+
+
+class ScreenerDataset:
+    """한 기간(사업연도/보고서)의 전체 회사 재무 수치를 컬럼별 NumPy 배열로 보관
+
+    회사당 한 행이며 연결재무제표(CFS)가 없으면 별도재무제표(OFS)를 사용합니다.
+    값이 없는 칸은 NaN이라 모든 비교 조건에서 제외됩니다.
+    """
+
+    __slots__ = ('bsns_year', 'reprt_code', 'corp_codes', 'fs_divs', 'columns', 'loaded_at')
+
+    def __init__(self, bsns_year: str, reprt_code: str, rows: List[sqlite3.Row]):
+        self.bsns_year = bsns_year
+        self.reprt_code = reprt_code
+        self.corp_codes = np.array([row['corp_code'] for row in rows], dtype=object)
+        self.fs_divs = np.array([row['fs_div'] for row in rows], dtype=object)
+        self.columns: Dict[str, np.ndarray] = {
+            column: np.array(
+                [np.nan if row[column] is None else row[column] for row in rows],
+                dtype=np.float64
+            )
+            for column in SCREENER_COLUMNS
+        }
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, db_path: str, bsns_year: str, reprt_code: str, fs_div: str = 'CFS'):
+        conn = sqlite3.connect(db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f'''
+                SELECT corp_code, fs_div, {', '.join(SCREENER_COLUMNS)}
+                FROM financial_facts
+                WHERE bsns_year = ? AND reprt_code = ?
+                ORDER BY corp_code, fs_div = ? DESC
+            ''', (bsns_year, reprt_code, fs_div)).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+
+        # 회사별로 우선 구분(fs_div) 한 행만 사용
+        selected = []
+        last_corp_code = None
+        for row in rows:
+            if row['corp_code'] != last_corp_code:
+                selected.append(row)
+                last_corp_code = row['corp_code']
+        return cls(bsns_year, reprt_code, selected)
+
+    def __len__(self):
+        return len(self.corp_codes)
+
+    def screen(self, conditions: List[tuple], sort: Optional[str] = None,
+               descending: bool = True, limit: int = 50) -> List[dict]:
+        """조건을 벡터 연산으로 적용하고 sort 컬럼 기준 상위 limit개 반환"""
+        mask = np.ones(len(self), dtype=bool)
+        for column, operator, value in conditions:
+            with np.errstate(invalid='ignore'):
+                mask &= FILTER_OPERATORS[operator](self.columns[column], value)
+
+        indices = np.flatnonzero(mask)
+        if sort:
+            values = self.columns[sort][indices]
+            # NaN은 항상 뒤로
+            keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+            indices = indices[np.argsort(keys, kind='stable')]
+        indices = indices[:limit]
+
+        results = []
+        for i in indices:
+            row = {'corp_code': self.corp_codes[i], 'fs_div': self.fs_divs[i]}
+            for column, values in self.columns.items():
+                value = values[i]
+                row[column] = None if np.isnan(value) else (
+                    int(value) if column in ACCOUNT_IDS else float(value)
+                )
+            results.append(row)
+        return results
+
+
+async def collect_financials(client, api_url: str, api_key: str, companies: List[tuple],
+                             bsns_year: str, reprt_code: str, store, scheduler=None) -> dict:
+    """DART 다중회사 주요계정 API로 여러 회사의 재무제표를 받아 정규화 저장소에 적재
+
+    Args:
+        client: UpstreamClient (DART 호출과 적재용 스레드 풀)
+        api_url: fnlttMultiAcnt.json URL
+        companies: 대상 (corp_code, stock_code) 목록 (상장회사)
+        store: FinancialStore
+        scheduler: DartScheduler (있으면 백그라운드 우선순위로 호출 예산을 받고, 예산이 부족하면 중단)
+
+    Returns:
+        requests, companies, errors 통계 (예산 부족으로 중단했으면 stopped에 사유)
+    """
+    stats = {'requests': 0, 'companies': 0, 'errors': 0, 'stopped': None}
+    corp_codes = [corp_code for corp_code, _ in companies]
+    # 응답 항목에 corp_code가 없으면 종목코드로 찾음
+    corp_by_stock = {stock_code: corp_code for corp_code, stock_code in companies}
+
+    # 재시도도 DART 호출이므로 매번 예산을 받음
+    acquire = functools.partial(scheduler.acquire, PREFETCH) if scheduler is not None else None
+
+    for start in range(0, len(corp_codes), MULTI_ACCOUNT_BATCH):
+        batch = corp_codes[start:start + MULTI_ACCOUNT_BATCH]
+        if acquire is not None:
+            try:
+                await acquire()
+            except DartQuotaExceeded as e:
+                print(f"✗ 스크리너 데이터 수집 중단 ({start}~): {str(e)}")
+                stats['stopped'] = str(e)
+                break
+        stats['requests'] += 1
+        try:
+            response = await client.get(api_url, params={
+                'crtfc_key': api_key,
+                'corp_code': ','.join(batch),
+                'bsns_year': bsns_year,
+                'reprt_code': reprt_code,
+            }, timeout=30, before_retry=acquire)
+            data = response.json()
+        except Exception as e:
+            print(f"✗ 다중회사 재무제표 조회 실패 ({start}~): {str(e)}")
+            stats['errors'] += 1
+            continue
+
+        if data.get('status') == STATUS_QUOTA_EXCEEDED:
+            if scheduler is not None:
+                scheduler.mark_exhausted()
+            stats['stopped'] = data.get('message') or 'DART API 사용량 초과'
+            print(f"✗ 스크리너 데이터 수집 중단 ({start}~): {stats['stopped']}")
+            break
+        if data.get('status') != '000':
+            continue
+
+        # 응답 항목을 회사별로 나누어 저장
+        by_company: Dict[str, List[dict]] = {}
+        for item in data.get('list', []):
+            corp_code = item.get('corp_code') or corp_by_stock.get((item.get('stock_code') or '').strip())
+            if corp_code:
+                by_company.setdefault(corp_code, []).append(item)
+
+        # 일괄 적재는 스레드 풀에서 (수집 중에도 다른 요청 처리)
+        await client.run_blocking(store.ingest_many, [
+            (corp_code, bsns_year, reprt_code, items)
+            for corp_code, items in by_company.items()
+        ])
+        stats['companies'] += len(by_company)
+
+    print(
+        f"✓ 스크리너 데이터 수집 완료: {stats['companies']}개 회사 "
+        f"({stats['requests']}회 요청, 오류 {stats['errors']}회)"
+    )
+    return stats
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """같은 키의 동시 요청을 하나의 업스트림 호출로 합치는 도우미
+
+    첫 요청이 작업(Task)을 시작하고, 작업이 끝나기 전에 들어온 같은 키의 요청은
+    그 결과(또는 예외)를 함께 받습니다. 작업은 별도 Task로 실행되므로
+    처음 요청한 클라이언트가 연결을 끊어도 나머지 요청은 영향을 받지 않습니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외 미처리 경고가 나지 않도록 확인
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+        }
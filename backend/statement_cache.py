@@ -0,0 +1,142 @@
+import sqlite3
+import time
+from datetime import datetime
+from typing import Optional
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# DART 응답 상태 코드
+STATUS_OK = '000'
+STATUS_NO_DATA = '013'
+
+# 캐시 정책 (초, None은 만료 없음)
+TTL_CURRENT_YEAR = 6 * HOUR        # 올해 보고서: 정정/추가 공시 가능
+TTL_LAST_YEAR = 30 * DAY           # 작년 보고서: 정정 공시 가능성 있음
+TTL_CLOSED_YEAR = None             # 그 이전 연도: 변하지 않음
+TTL_NO_DATA_RECENT = 1 * HOUR      # 아직 공시되지 않았을 수 있음
+TTL_NO_DATA_CLOSED = 7 * DAY
+
+
+def statement_ttl(bsns_year: str, status: str, now: Optional[datetime] = None) -> Optional[float]:
+    """사업연도와 응답 상태에 따른 캐시 유효 시간 (초)"""
+    current_year = (now or datetime.now()).year
+    try:
+        year = int(bsns_year)
+    except ValueError:
+        return TTL_CURRENT_YEAR
+
+    if status == STATUS_NO_DATA:
+        return TTL_NO_DATA_RECENT if year >= current_year - 1 else TTL_NO_DATA_CLOSED
+    if year >= current_year:
+        return TTL_CURRENT_YEAR
+    if year == current_year - 1:
+        return TTL_LAST_YEAR
+    return TTL_CLOSED_YEAR
+
+
+def statement_cache_control(bsns_year: str, status: str = STATUS_OK) -> str:
+    """클라이언트용 Cache-Control (지난 사업연도는 immutable, 그 외에는 서버 캐시 유효 시간까지, 최대 하루)"""
+    ttl = statement_ttl(bsns_year, status)
+    if ttl is None:
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={int(min(ttl, DAY))}'
+
+
+def is_cacheable(status: str) -> bool:
+    """정상 응답과 '조회된 데이터 없음'만 캐시 (키 오류, 사용량 초과 등은 제외)"""
+    return status in (STATUS_OK, STATUS_NO_DATA)
+
+
+class StatementCache:
+    """DART 재무제표(fnlttSinglAcnt) 응답을 dart.db에 저장하는 영구 캐시
+
+    응답 JSON은 문자열 그대로 저장하여 캐시 적중 시 다시 인코딩하지 않습니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS statement_cache (
+                    corp_code TEXT NOT NULL,
+                    bsns_year TEXT NOT NULL,
+                    reprt_code TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (corp_code, bsns_year, reprt_code)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, corp_code: str, bsns_year: str, reprt_code: str,
+            allow_stale: bool = False) -> Optional[dict]:
+        """캐시 조회 (만료된 항목은 None, allow_stale이면 만료된 항목도 반환)
+
+        Returns:
+            status, payload, fetched_at, stale 키를 가진 dict 또는 None
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT status, payload, fetched_at, expires_at
+                FROM statement_cache
+                WHERE corp_code = ? AND bsns_year = ? AND reprt_code = ?
+            ''', (corp_code, bsns_year, reprt_code)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        status, payload, fetched_at, expires_at = row
+        stale = expires_at is not None and expires_at < time.time()
+        if stale:
+            self.misses += 1
+            if not allow_stale:
+                return None
+        else:
+            self.hits += 1
+
+        return {
+            'status': status,
+            'payload': payload,
+            'fetched_at': fetched_at,
+            'stale': stale,
+        }
+
+    def put(self, corp_code: str, bsns_year: str, reprt_code: str,
+            status: str, payload: str):
+        """응답 저장 (캐시 대상 상태가 아니면 무시)"""
+        if not is_cacheable(status):
+            return
+
+        now = time.time()
+        ttl = statement_ttl(bsns_year, status)
+        expires_at = None if ttl is None else now + ttl
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO statement_cache
+                    (corp_code, bsns_year, reprt_code, status, payload, fetched_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (corp_code, bsns_year, reprt_code, status, payload, now, expires_at))
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+# 연결 풀 설정
+MAX_CONNECTIONS = int(os.getenv('UPSTREAM_MAX_CONNECTIONS', '200'))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('UPSTREAM_MAX_KEEPALIVE', '50'))
+
+# 호스트별 동시 요청 수 제한
+PER_HOST_LIMIT = int(os.getenv('UPSTREAM_PER_HOST_LIMIT', '20'))
+
+# 타임아웃 (초)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# 재시도 설정 (연결 오류, 429, 5xx)
+MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', '2'))
+RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# yfinance, Gemini SDK 같은 동기 호출을 실행할 스레드 수
+BLOCKING_WORKERS = int(os.getenv('UPSTREAM_BLOCKING_WORKERS', '16'))
+
+
+class UpstreamClient:
+    """외부 API 호출용 공용 비동기 HTTP 클라이언트
+
+    keep-alive 연결 풀과 HTTP/2를 공유하고, 호스트별 동시 요청 수 제한과
+    지수 백오프 재시도를 적용합니다. 동기 SDK 호출은 크기가 제한된 스레드 풀에서 실행합니다.
+    on_request를 주면 HTTP 시도마다 (url, 상태 코드 또는 'error', 소요 시간(초))로 호출합니다.
+    """
+
+    def __init__(self, per_host_limit: int = PER_HOST_LIMIT, max_retries: int = MAX_RETRIES,
+                 blocking_workers: int = BLOCKING_WORKERS,
+                 on_request: Optional[Callable[[str, str, float], None]] = None):
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.blocking_workers = blocking_workers
+        self.on_request = on_request
+        # 스레드 풀에 넣었지만 아직 끝나지 않은 작업 수 (blocking_workers보다 크면 대기 중)
+        self.blocking_pending = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.blocking_workers,
+                thread_name_prefix='upstream-blocking'
+            )
+        return self._executor
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def get(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None,
+                  before_retry: Optional[Callable[[], Awaitable]] = None) -> httpx.Response:
+        """GET 요청 (실패 시 백오프 후 재시도)
+
+        before_retry가 있으면 재시도마다 먼저 실행합니다 (DART 호출 예산을 재시도에도 쓰도록).
+        """
+        request_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+
+        attempt = 0
+        while True:
+            try:
+                async with self._host_limit(url):
+                    started = time.perf_counter()
+                    try:
+                        response = await self.client.get(url, params=params, timeout=request_timeout)
+                    except httpx.TransportError:
+                        self._observe(url, 'error', started)
+                        raise
+                    self._observe(url, str(response.status_code), started)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+
+            attempt += 1
+            delay = RETRY_BACKOFF * (2 ** (attempt - 1))
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            if before_retry is not None:
+                await before_retry()
+
+    def _observe(self, url: str, status: str, started: float):
+        if self.on_request is not None:
+            self.on_request(url, status, time.perf_counter() - started)
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """동기 함수를 제한된 스레드 풀에서 실행 (호출한 요청의 contextvars를 그대로 사용)"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        self.blocking_pending += 1
+        try:
+            return await loop.run_in_executor(self.executor, lambda: context.run(func, *args, **kwargs))
+        finally:
+            self.blocking_pending -= 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,31 @@
+"""벤치마크용 서버 실행 (backend.main + yfinance / Gemini 대역)
+
+DART 요청은 DART_API_BASE_URL 환경 변수로 스텁 서버에 보내고,
+yfinance / Gemini는 backend.main의 모듈 참조를 stubs의 가짜 모듈로 바꿉니다.
+
+    python benchmarks/app_server.py --port 9000
+"""
+import argparse
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'backend'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('WARM_UP_IMPORTS', 'false')
+
+import main  # noqa: E402
+from stubs import FakeGenAI, FakeYFinance  # noqa: E402
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="벤치마크용 API 서버")
+    parser.add_argument('--port', type=int, default=9000)
+    args = parser.parse_args()
+
+    main.yf = FakeYFinance()
+    main.genai = FakeGenAI()
+    uvicorn.run(main.app, host='127.0.0.1', port=args.port, log_level='warning')
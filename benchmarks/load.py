@@ -0,0 +1,283 @@
+"""혼합 부하 벤치마크 (외부 서비스 없이 로컬 스텁으로 실행)
+
+DART 스텁 서버와 API 서버(yfinance / Gemini 대역 포함)를 띄우고, 합성 회사코드로 만든 임시 DB에 대해
+가상 사용자들이 아래 시나리오를 섞어 실행한 뒤 엔드포인트별 처리량과 p50/p95/p99 지연을 출력합니다.
+
+    typeahead  회사명을 한 글자씩 입력하며 검색 (/api/companies/search)
+    statement  재무제표 + 재무비율 조회 (/api/financial-statement, /api/financial-metrics)
+    stock      1년 주가와 기술적 지표 조회 (/api/stock-price)
+    ai         AI 설명(일반) 또는 투자 분석(SSE 스트리밍) 요청
+
+사용법:
+    python benchmarks/load.py --users 50 --duration 30
+    python benchmarks/load.py --mix typeahead=1 --users 100     # 검색만
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from corp_code_ingest import ingest_corp_codes  # noqa: E402
+from stubs import company_rows, corp_code_xml  # noqa: E402
+
+ADMIN_TOKEN = 'bench'
+REPORT_CODES = ('11011', '11012', '11013', '11014')
+
+
+def percentile(samples, ratio: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] if ordered else 0.0
+
+
+def parse_mix(expression: str) -> dict:
+    """'typeahead=6,statement=3' -> 시나리오별 가중치"""
+    weights = {}
+    for part in expression.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"알 수 없는 시나리오: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Recorder:
+    """엔드포인트별 지연 시간(초)과 오류 수 기록"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        if response.status_code == 429:
+            self.rejected[label] += 1
+        elif response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    async def stream(self, client: httpx.AsyncClient, label: str, url: str, body: dict):
+        """SSE 요청의 첫 청크까지 시간(ttfb)과 전체 시간 기록"""
+        started = time.perf_counter()
+        first = None
+        try:
+            async with client.stream('POST', url, json=body) as response:
+                if response.status_code == 429:
+                    self.rejected[label] += 1
+                    return
+                if response.status_code >= 400:
+                    self.errors[label] += 1
+                    return
+                async for line in response.aiter_lines():
+                    if first is None and line.startswith('data:'):
+                        first = time.perf_counter() - started
+                    if line.startswith('event: error'):
+                        self.errors[label] += 1
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return
+        self.latencies[label].append(time.perf_counter() - started)
+        if first is not None:
+            self.latencies[f"{label} (ttfb)"].append(first)
+
+    def report(self, elapsed: float):
+        print(f"\n{'엔드포인트':<32}{'요청':>7}{'오류':>6}{'429':>6}{'req/s':>9}"
+              f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for label in sorted(set(self.latencies) | set(self.errors) | set(self.rejected)):
+            samples = self.latencies[label]
+            print(
+                f"{label:<32}{len(samples):>7}{self.errors[label]:>6}{self.rejected[label]:>6}"
+                f"{len(samples) / elapsed:>9.1f}"
+                f"{percentile(samples, 0.5) * 1000:>9.1f}{percentile(samples, 0.95) * 1000:>9.1f}"
+                f"{percentile(samples, 0.99) * 1000:>9.1f}{max(samples, default=0) * 1000:>9.1f}"
+            )
+
+
+async def typeahead(client, recorder, company, think):
+    _, name, _ = company
+    for length in range(1, len(name) + 1):
+        await recorder.request(client, 'GET /api/companies/search', 'GET', '/api/companies/search',
+                               params={'query': name[:length]})
+        await asyncio.sleep(think / 4)
+
+
+async def statement(client, recorder, company, think):
+    corp_code = company[0]
+    params = {
+        'corp_code': corp_code,
+        'bsns_year': str(random.randint(2016, date.today().year - 1)),
+        'reprt_code': random.choice(REPORT_CODES),
+    }
+    await recorder.request(client, 'GET /api/financial-statement', 'GET', '/api/financial-statement', params=params)
+    await recorder.request(client, 'GET /api/financial-metrics', 'GET', '/api/financial-metrics', params=params)
+
+
+async def stock(client, recorder, company, think):
+    await recorder.request(client, 'GET /api/stock-price', 'GET', '/api/stock-price',
+                           params={'stock_code': company[2], 'period': '1y', 'indicators': 'all'})
+
+
+async def ai(client, recorder, company, think):
+    corp_code, name, stock_code = company
+    body = {
+        'company_name': name,
+        'corp_code': corp_code,
+        'stock_code': stock_code,
+        'year': str(random.randint(2019, date.today().year - 1)),
+    }
+    if random.random() < 0.5:
+        await recorder.request(client, 'POST /api/explain-financial-statement', 'POST',
+                               '/api/explain-financial-statement', json=body, timeout=120)
+    else:
+        await recorder.stream(client, 'POST /api/investment-analysis/stream',
+                              '/api/investment-analysis/stream', body)
+
+
+SCENARIOS = {
+    'typeahead': typeahead,
+    'statement': statement,
+    'stock': stock,
+    'ai': ai,
+}
+
+
+async def virtual_user(client, recorder, companies, weights, deadline, think):
+    names, values = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        scenario = SCENARIOS[random.choices(names, values)[0]]
+        await scenario(client, recorder, random.choice(companies), think)
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think)
+
+
+async def run_load(base_url, companies, users, duration, weights, think):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            virtual_user(client, recorder, companies, weights, deadline, think)
+            for _ in range(users)
+        ])
+        elapsed = time.perf_counter() - started
+        stats = (await client.get('/api/admin/upstream-stats', headers={'X-Admin-Token': ADMIN_TOKEN})).json()
+    return recorder, elapsed, stats
+
+
+def wait_ready(url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise SystemExit(f"서버가 응답하지 않습니다: {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 스텁 기반 혼합 부하 벤치마크")
+    parser.add_argument('--users', type=int, default=30, help='동시 가상 사용자 수')
+    parser.add_argument('--duration', type=float, default=20, help='측정 시간 (초)')
+    parser.add_argument('--think-ms', type=float, default=200, help='사용자 행동 사이 평균 대기 (ms)')
+    parser.add_argument('--mix', default='typeahead=6,statement=3,stock=2,ai=1', help='시나리오 가중치')
+    parser.add_argument('--companies', type=int, default=10000, help='회사코드 목록 회사 수')
+    parser.add_argument('--dart-latency-ms', type=float, default=80)
+    parser.add_argument('--statement-items', type=int, default=180)
+    parser.add_argument('--dart-rate', type=float, default=1000,
+                        help='서버의 DART 초당 호출 제한 (DART_RATE_PER_SEC, 실제 키 기준은 10)')
+    parser.add_argument('--yf-latency-ms', type=float, default=300)
+    parser.add_argument('--llm-latency-ms', type=float, default=2000)
+    parser.add_argument('--llm-chunks', type=int, default=40)
+    parser.add_argument('--app-port', type=int, default=9000)
+    parser.add_argument('--stub-port', type=int, default=9001)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    weights = parse_mix(args.mix)
+    workdir = tempfile.mkdtemp(prefix='dart-bench-')
+    db_path = os.path.join(workdir, 'dart.db')
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    env = {
+        **os.environ,
+        'STUB_DART_LATENCY_MS': str(args.dart_latency_ms),
+        'STUB_STATEMENT_ITEMS': str(args.statement_items),
+        'STUB_COMPANIES': str(args.companies),
+        'STUB_YF_LATENCY_MS': str(args.yf_latency_ms),
+        'STUB_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'STUB_LLM_CHUNKS': str(args.llm_chunks),
+        'DART_DB_PATH': db_path,
+        'DART_API_BASE_URL': f"{stub_url}/api",
+        'DART_CORP_CODE_URL': f"{stub_url}/api/corpCode.xml",
+        'DART_API_KEY': 'bench',
+        'DART_RATE_PER_SEC': str(args.dart_rate),
+        'DART_RATE_BURST': str(max(int(args.dart_rate), 1)),
+        'DART_DAILY_LIMIT': '100000000',
+        'GEMINI_API_KEY': 'bench',
+        'ADMIN_TOKEN': ADMIN_TOKEN,
+    }
+
+    print(f"회사코드 {args.companies:,}개로 임시 DB 생성: {db_path}")
+    conn = sqlite3.connect(db_path)
+    ingest_corp_codes(conn, io.BytesIO(corp_code_xml(args.companies)))
+    conn.close()
+
+    processes = []
+    try:
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(BENCH_DIR, 'stubs.py'), '--port', str(args.stub_port)], env=env
+        ))
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(BENCH_DIR, 'app_server.py'), '--port', str(args.app_port)], env=env
+        ))
+        wait_ready(f"{stub_url}/stats")
+        wait_ready(f"{app_url}/api/report-codes")
+
+        companies = [
+            (corp_code, name, stock_code)
+            for corp_code, name, stock_code, _ in company_rows(args.companies)
+            if stock_code.strip()
+        ]
+        print(f"가상 사용자 {args.users}명, {args.duration:.0f}초, 시나리오 {weights}")
+        recorder, elapsed, stats = asyncio.run(
+            run_load(app_url, companies, args.users, args.duration, weights, args.think_ms / 1000)
+        )
+
+        recorder.report(elapsed)
+        total = sum(len(samples) for label, samples in recorder.latencies.items() if '(ttfb)' not in label)
+        print(f"\n전체 {total:,}건, {total / elapsed:.1f} req/s ({elapsed:.1f}초)")
+        print(f"DART 스텁 요청: {httpx.get(f'{stub_url}/stats').json()['requests']:,}건")
+        print(f"서버 통계: {stats}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""응답 직렬화/압축 벤치마크
+
+5년치 일봉(/api/stock-price)과 DART 재무제표 응답(/api/financial-statement) 크기의
+합성 데이터로 기존 방식(jsonable_encoder + json.dumps)과 orjson, gzip/brotli 압축,
+일봉 압축 형식(encoding=compact)의 바이트 수와 인코딩 시간을 비교합니다.
+
+사용법:
+    python benchmarks/serialization.py
+"""
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import brotli
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from price_store import compact_series  # noqa: E402
+from responses import FastJSONResponse  # noqa: E402
+
+
+def make_stock_response(days: int = 1250) -> dict:
+    """5년치 일봉 형태의 /api/stock-price 응답"""
+    rng = np.random.default_rng(0)
+    closes = 70000 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    start = date(2020, 1, 2)
+    data = {
+        'dates': [(start + timedelta(days=i * 7 // 5)).isoformat() for i in range(days)],
+        'prices': closes.tolist(),
+        'volumes': rng.integers(1_000_000, 30_000_000, days).tolist(),
+        'high': (closes * 1.01).tolist(),
+        'low': (closes * 0.99).tolist(),
+        'open': (closes * 1.002).tolist(),
+    }
+    return {'status': 'success', 'ticker': '005930.KS', 'data': data, 'statistics': {}}
+
+
+def make_statement_response(items: int = 180) -> dict:
+    """DART 단일회사 주요계정 응답 형태"""
+    return {
+        'status': '000',
+        'message': '정상',
+        'list': [
+            {
+                'rcept_no': '20240312000736', 'reprt_code': '11011', 'bsns_year': '2023',
+                'corp_code': '00126380', 'stock_code': '005930', 'fs_div': 'CFS' if i % 2 else 'OFS',
+                'fs_nm': '연결재무제표', 'sj_div': 'BS', 'sj_nm': '재무상태표',
+                'account_nm': f'계정과목{i}', 'thstrm_nm': '제 55 기', 'thstrm_dt': '2023.12.31 현재',
+                'thstrm_amount': f'{(i + 1) * 123456789:,}', 'frmtrm_nm': '제 54 기',
+                'frmtrm_dt': '2022.12.31 현재', 'frmtrm_amount': f'{(i + 1) * 98765432:,}',
+                'ord': str(i), 'currency': 'KRW',
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def stdlib_encode(content) -> bytes:
+    """FastAPI 기본 JSONResponse 경로 (jsonable_encoder + json.dumps)"""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+        indent=None, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def orjson_encode(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def timed(func, *args, repeat: int = 50):
+    """repeat회 실행한 평균 시간 (ms)과 마지막 결과"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def report(name: str, content):
+    print(f"\n=== {name} ===")
+    print(f"{'방식':<28}{'바이트':>12}{'시간(ms)':>12}")
+
+    def row(label, size, elapsed):
+        print(f"{label:<28}{size:>12,}{elapsed:>12.2f}")
+
+    stdlib_ms, stdlib_body = timed(stdlib_encode, content)
+    orjson_ms, orjson_body = timed(orjson_encode, content)
+    row('json (기존)', len(stdlib_body), stdlib_ms)
+    row('orjson', len(orjson_body), orjson_ms)
+
+    gzip_ms, gzip_body = timed(gzip.compress, orjson_body, 6, repeat=10)
+    brotli_ms, brotli_body = timed(brotli.compress, orjson_body, 0, 4, repeat=10)
+    row('orjson + gzip', len(gzip_body), orjson_ms + gzip_ms)
+    row('orjson + brotli(q4)', len(brotli_body), orjson_ms + brotli_ms)
+
+    if 'data' in content and 'dates' in content['data']:
+        compact_ms, compact = timed(lambda: {**content, 'data': compact_series(content['data'])})
+        compact_body = orjson_encode(compact)
+        compact_brotli = brotli.compress(compact_body, quality=4)
+        row('compact + orjson', len(compact_body), compact_ms + orjson_ms)
+        row('compact + orjson + brotli', len(compact_brotli), compact_ms + orjson_ms + brotli_ms)
+
+
+if __name__ == "__main__":
+    report('/api/stock-price (5y, 1250일)', make_stock_response())
+    report('/api/financial-statement (180개 계정)', make_statement_response())
@@ -0,0 +1,250 @@
+"""벤치마크용 로컬 스텁 (DART OpenAPI 서버, yfinance / Gemini 대역)
+
+DART 스텁은 별도 프로세스로 실행하는 FastAPI 앱이고, yfinance / Gemini 대역은
+app_server.py가 backend.main의 모듈 참조(yf, genai)를 바꿔 끼우는 가짜 모듈입니다.
+지연 시간과 응답 크기는 환경 변수로 조절합니다 (load.py가 설정).
+
+    STUB_DART_LATENCY_MS     DART 응답 지연 (기본 80)
+    STUB_STATEMENT_ITEMS     재무제표 응답 항목 수 (기본 180)
+    STUB_COMPANIES           회사코드 목록 회사 수 (기본 10000, 약 1/4이 상장회사)
+    STUB_YF_LATENCY_MS       yfinance history 지연 (기본 300)
+    STUB_LLM_LATENCY_MS      Gemini 전체 응답 지연 (기본 2000)
+    STUB_LLM_CHUNKS          Gemini 스트리밍 청크 수 (기본 40)
+
+DART 스텁 단독 실행:
+    python benchmarks/stubs.py --port 9001
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import time
+import zipfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+
+NAME_PREFIXES = (
+    '삼성', '현대', '엘지', '에스케이', '한화', '롯데', '포스코', '카카오', '네이버', '셀트리온',
+    '대한', '한국', '신한', '동원', '농심', '오리온', '코웨이', '한미', '유한', '종근당',
+)
+NAME_SUFFIXES = (
+    '전자', '화학', '바이오', '건설', '중공업', '생명', '증권', '물산', '제약', '에너지',
+    '홀딩스', '테크', '푸드', '리츠', '로지스', '소재', '모빌리티', '엔터', '게임즈', '반도체',
+)
+
+# 스텁 재무제표 계정 (financials.ACCOUNT_ALIASES와 같은 이름 포함)
+STATEMENT_ACCOUNTS = (
+    ('BS', '재무상태표', '유동자산'), ('BS', '재무상태표', '비유동자산'), ('BS', '재무상태표', '자산총계'),
+    ('BS', '재무상태표', '유동부채'), ('BS', '재무상태표', '비유동부채'), ('BS', '재무상태표', '부채총계'),
+    ('BS', '재무상태표', '자본금'), ('BS', '재무상태표', '이익잉여금'), ('BS', '재무상태표', '자본총계'),
+    ('IS', '손익계산서', '매출액'), ('IS', '손익계산서', '영업이익'),
+    ('IS', '손익계산서', '법인세차감전 순이익'), ('IS', '손익계산서', '당기순이익'),
+)
+
+
+def env_ms(name: str, default: float) -> float:
+    return float(os.getenv(name, default)) / 1000
+
+
+def company_rows(count: int):
+    """(corp_code, corp_name, stock_code, modify_date) 합성 회사 목록 (4개 중 1개는 상장회사)"""
+    for i in range(count):
+        name = f"{NAME_PREFIXES[i % len(NAME_PREFIXES)]}{NAME_SUFFIXES[(i // len(NAME_PREFIXES)) % len(NAME_SUFFIXES)]}"
+        if i >= len(NAME_PREFIXES) * len(NAME_SUFFIXES):
+            name += str(i)
+        stock_code = f"{100000 + i:06d}" if i % 4 == 0 else ' '
+        yield f"{i:08d}", name, stock_code, '20240101'
+
+
+def corp_code_xml(count: int) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<result>\n']
+    for corp_code, corp_name, stock_code, modify_date in company_rows(count):
+        parts.append(
+            f"<list><corp_code>{corp_code}</corp_code><corp_name>{escape(corp_name)}</corp_name>"
+            f"<stock_code>{stock_code}</stock_code><modify_date>{modify_date}</modify_date></list>\n"
+        )
+    parts.append('</result>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def corp_code_zip(count: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('CORPCODE.xml', corp_code_xml(count))
+    return buffer.getvalue()
+
+
+def seed(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b('|'.join(parts).encode(), digest_size=4).digest(), 'little')
+
+
+def statement_items(corp_code: str, bsns_year: str, reprt_code: str, count: int) -> list:
+    """DART 단일회사 주요계정 응답 항목 (같은 입력이면 같은 값)"""
+    rng = np.random.default_rng(seed(corp_code, bsns_year, reprt_code))
+    base = int(rng.integers(10**10, 10**13))
+    items = []
+    for i in range(count):
+        fs_div = 'CFS' if i % 2 == 0 else 'OFS'
+        sj_div, sj_nm, account_nm = STATEMENT_ACCOUNTS[(i // 2) % len(STATEMENT_ACCOUNTS)]
+        if i >= 2 * len(STATEMENT_ACCOUNTS):
+            account_nm = f"{account_nm} 세부{i}"
+        current = int(base * rng.uniform(0.05, 1.2))
+        items.append({
+            'rcept_no': f"{bsns_year}0312000736", 'reprt_code': reprt_code, 'bsns_year': bsns_year,
+            'corp_code': corp_code, 'stock_code': '', 'fs_div': fs_div,
+            'fs_nm': '연결재무제표' if fs_div == 'CFS' else '재무제표',
+            'sj_div': sj_div, 'sj_nm': sj_nm, 'account_nm': account_nm,
+            'thstrm_nm': f"제 {bsns_year} 기", 'thstrm_dt': f"{bsns_year}.12.31 현재",
+            'thstrm_amount': f"{current:,}",
+            'frmtrm_nm': '전기', 'frmtrm_dt': '', 'frmtrm_amount': f"{int(current * rng.uniform(0.8, 1.1)):,}",
+            'bfefrmtrm_nm': '전전기', 'bfefrmtrm_dt': '',
+            'bfefrmtrm_amount': f"{int(current * rng.uniform(0.7, 1.0)):,}",
+            'ord': str(i), 'currency': 'KRW',
+        })
+    return items
+
+
+def create_dart_app() -> FastAPI:
+    """DART OpenAPI 스텁 (fnlttSinglAcnt.json, fnlttMultiAcnt.json, corpCode.xml)"""
+    latency = env_ms('STUB_DART_LATENCY_MS', 80)
+    item_count = int(os.getenv('STUB_STATEMENT_ITEMS', 180))
+    corp_zip = corp_code_zip(int(os.getenv('STUB_COMPANIES', 10000)))
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/api/fnlttSinglAcnt.json")
+    async def single_account(corp_code: str, bsns_year: str, reprt_code: str):
+        app.state.requests += 1
+        await asyncio.sleep(latency)
+        if int(bsns_year) > date.today().year - 1:
+            return {'status': '013', 'message': '조회된 데이타가 없습니다.'}
+        return {'status': '000', 'message': '정상', 'list': statement_items(corp_code, bsns_year, reprt_code, item_count)}
+
+    @app.get("/api/fnlttMultiAcnt.json")
+    async def multi_account(corp_code: str, bsns_year: str, reprt_code: str):
+        app.state.requests += 1
+        await asyncio.sleep(latency)
+        items = []
+        for code in corp_code.split(','):
+            for item in statement_items(code, bsns_year, reprt_code, 2 * len(STATEMENT_ACCOUNTS)):
+                items.append(item)
+        return {'status': '000', 'message': '정상', 'list': items}
+
+    @app.get("/api/corpCode.xml")
+    async def corp_code():
+        app.state.requests += 1
+        await asyncio.sleep(latency)
+        return Response(corp_zip, media_type='application/zip', headers={'ETag': '"stub-corp-code"'})
+
+    @app.get("/stats")
+    async def stats():
+        return {'requests': app.state.requests}
+
+    return app
+
+
+class FakeTicker:
+    def __init__(self, module, symbol: str):
+        self.module = module
+        self.symbol = symbol
+
+    def history(self, period: str = None, start: str = None):
+        """합성 일봉 DataFrame (코스닥 종목은 .KQ로만 조회됨)"""
+        time.sleep(self.module.latency)
+        self.module.calls += 1
+        code = self.symbol.split('.')[0]
+        is_kosdaq = int(code) % 8 == 4
+        if self.symbol.endswith('.KQ') != is_kosdaq:
+            return pd.DataFrame()
+
+        end = date.today()
+        first = date.fromisoformat(start) if start else end - timedelta(days=self.module.bars * 7 // 5)
+        index = pd.bdate_range(first, end)
+        rng = np.random.default_rng(seed(code))
+        closes = 50000 * np.exp(np.cumsum(rng.normal(0, 0.015, len(index))))
+        return pd.DataFrame({
+            'Open': closes * 1.002,
+            'High': closes * 1.01,
+            'Low': closes * 0.99,
+            'Close': closes,
+            'Volume': rng.integers(100_000, 5_000_000, len(index)),
+        }, index=index)
+
+
+class FakeYFinance:
+    """yfinance 대역 (Ticker(...).history만 지원, 블로킹 지연 포함)"""
+
+    # backend.main의 LazyModule과 같은 속성 (서버 통계에서 참조)
+    load_time = None
+
+    def __init__(self):
+        self.latency = env_ms('STUB_YF_LATENCY_MS', 300)
+        self.bars = 1250
+        self.calls = 0
+
+    def Ticker(self, symbol: str):
+        return FakeTicker(self, symbol)
+
+
+class FakeModel:
+    def __init__(self, module):
+        self.module = module
+
+    def text(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return ''.join(f"분석 문단 {i} ({digest}). " * 8 + '\n' for i in range(self.module.chunks))
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.module.latency)
+        self.module.calls += 1
+        return SimpleNamespace(text=self.text(prompt))
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        self.module.calls += 1
+        if not stream:
+            await asyncio.sleep(self.module.latency)
+            return SimpleNamespace(text=self.text(prompt))
+
+        lines = self.text(prompt).splitlines(keepends=True)
+        delay = self.module.latency / max(len(lines), 1)
+
+        async def chunks():
+            for line in lines:
+                await asyncio.sleep(delay)
+                yield SimpleNamespace(text=line)
+        return chunks()
+
+
+class FakeGenAI:
+    """google.generativeai 대역 (GenerativeModel, types.GenerationConfig, configure)"""
+
+    types = SimpleNamespace(GenerationConfig=lambda **kwargs: kwargs)
+    load_time = None
+
+    def __init__(self):
+        self.latency = env_ms('STUB_LLM_LATENCY_MS', 2000)
+        self.chunks = int(os.getenv('STUB_LLM_CHUNKS', 40))
+        self.calls = 0
+
+    def configure(self, **kwargs):
+        pass
+
+    def GenerativeModel(self, name: str):
+        return FakeModel(self)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="DART OpenAPI 스텁 서버")
+    parser.add_argument('--port', type=int, default=9001)
+    args = parser.parse_args()
+    uvicorn.run(create_dart_app(), host='127.0.0.1', port=args.port, log_level='warning')
@@ -0,0 +1,476 @@
+import hashlib
+import os
+import struct
+import tempfile
+import time
+import zlib
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from itertools import islice
+
+import httpx
+
+
+# 한 번에 INSERT할 행 수
+BATCH_SIZE = 5000
+
+# DART 고유번호(회사코드) 다운로드 API
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+
+# HTTP 응답을 읽는 단위 (bytes)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 연결 실패 시 재시도 횟수
+DOWNLOAD_RETRIES = 3
+
+# ZIP 로컬 파일 헤더
+ZIP_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+ZIP_LOCAL_SIGNATURE = b'PK\x03\x04'
+
+SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS companies (
+        corp_code TEXT PRIMARY KEY,
+        corp_name TEXT NOT NULL,
+        stock_code TEXT,
+        modify_date TEXT,
+        corp_name_lower TEXT,
+        deleted_at TEXT
+    )
+'''
+
+# 이전 버전 DB에 추가할 컬럼
+MIGRATION_COLUMNS = {
+    'deleted_at': 'TEXT',
+}
+
+# 상장회사 검색용 FTS5 trigram 인덱스 (부분 문자열 검색에도 인덱스 사용)
+SEARCH_INDEX_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5(
+        corp_name,
+        corp_code UNINDEXED,
+        stock_code UNINDEXED,
+        modify_date UNINDEXED,
+        tokenize = 'trigram'
+    )
+'''
+
+# 다운로드 메타데이터 (ETag, 콘텐츠 해시 등)
+META_SQL = '''
+    CREATE TABLE IF NOT EXISTS sync_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+'''
+
+# 전체 적재 시 파싱한 행을 먼저 담아 두는 임시 파일 DB의 테이블 (ATTACH ... AS staging)
+STAGING_SQL = '''
+    CREATE TABLE staging.corp_codes (
+        corp_code TEXT,
+        corp_name TEXT,
+        stock_code TEXT,
+        modify_date TEXT,
+        corp_name_lower TEXT
+    )
+'''
+
+INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_corp_name ON companies(corp_name_lower)',
+    'CREATE INDEX IF NOT EXISTS idx_stock_code ON companies(stock_code)',
+)
+INDEX_NAMES = ('idx_corp_name', 'idx_stock_code')
+
+
+def bump_companies_version(conn):
+    """companies 데이터 버전 갱신 (서버의 회사 레지스트리가 변경을 감지하는 데 사용)"""
+    conn.execute(
+        'INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)',
+        ('companies.version', str(time.time_ns()))
+    )
+
+
+def configure_connection(conn):
+    """대량 적재용 PRAGMA 설정 (WAL 모드로 적재 중에도 읽기 가능)"""
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+
+def create_schema(conn):
+    """companies 테이블, 보조 인덱스, 검색 인덱스 생성"""
+    conn.execute(SCHEMA_SQL)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(companies)')}
+    for name, column_type in MIGRATION_COLUMNS.items():
+        if name not in columns:
+            conn.execute(f'ALTER TABLE companies ADD COLUMN {name} {column_type}')
+    for sql in INDEX_SQL:
+        conn.execute(sql)
+    conn.execute(SEARCH_INDEX_SQL)
+    conn.execute(META_SQL)
+    conn.commit()
+
+
+def iter_corp_codes(source):
+    """CORPCODE.xml을 스트리밍으로 읽어 회사 정보를 하나씩 반환
+
+    Args:
+        source: XML 파일 경로 또는 바이너리 파일 객체
+
+    Yields:
+        (corp_code, corp_name, stock_code, modify_date) 튜플
+    """
+    context = ET.iterparse(source, events=('start', 'end'))
+    _, root = next(context)
+
+    for event, elem in context:
+        if event != 'end' or elem.tag != 'list':
+            continue
+
+        yield (
+            elem.findtext('corp_code', ''),
+            elem.findtext('corp_name', ''),
+            elem.findtext('stock_code', ''),
+            elem.findtext('modify_date', ''),
+        )
+
+        # 처리한 요소는 바로 해제하여 메모리 사용량 유지
+        elem.clear()
+        root.clear()
+
+
+def iter_batches(rows, size: int = BATCH_SIZE):
+    """행 iterator를 size개씩 묶어서 반환"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def build_search_index(conn):
+    """상장회사(6자리 숫자 종목코드)만 모아 FTS5 검색 인덱스 재구성 (삭제된 회사 제외)"""
+    conn.execute('DELETE FROM companies_fts')
+    conn.execute('''
+        INSERT INTO companies_fts (corp_name, corp_code, stock_code, modify_date)
+        SELECT corp_name, corp_code, TRIM(stock_code), modify_date
+        FROM companies
+        WHERE LENGTH(TRIM(stock_code)) = 6
+        AND TRIM(stock_code) GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
+        AND deleted_at IS NULL
+    ''')
+    conn.execute("INSERT INTO companies_fts (companies_fts) VALUES ('optimize')")
+
+
+def ingest_corp_codes(conn, source, batch_size: int = BATCH_SIZE) -> int:
+    """CORPCODE.xml 전체를 companies 테이블에 다시 적재
+
+    source는 배치 단위로 임시 파일 DB(staging)에 먼저 적재하므로 메모리 사용량은 배치 크기로
+    제한되고, dart.db 쓰기 잠금은 staging에서 한 번에 옮겨 담는 짧은 트랜잭션 동안만 잡습니다.
+    보조 인덱스는 적재 후에 한 번에 만듭니다.
+
+    Returns:
+        적재한 회사 수
+    """
+    started = time.perf_counter()
+    configure_connection(conn)
+    create_schema(conn)
+
+    fd, staging_path = tempfile.mkstemp(prefix='corpcode-', suffix='.db')
+    os.close(fd)
+    conn.execute('ATTACH DATABASE ? AS staging', (staging_path,))
+    try:
+        conn.execute('PRAGMA staging.journal_mode=OFF')
+        conn.execute('PRAGMA staging.synchronous=OFF')
+        conn.execute(STAGING_SQL)
+
+        # staging만 쓰므로 dart.db는 잠그지 않음
+        count = 0
+        with conn:
+            for batch in iter_batches(iter_corp_codes(source), batch_size):
+                conn.executemany(
+                    'INSERT INTO staging.corp_codes VALUES (?, ?, ?, ?, ?)',
+                    [row + (row[1].lower(),) for row in batch]
+                )
+                count += len(batch)
+
+        conn.execute('BEGIN')
+        try:
+            for name in INDEX_NAMES:
+                conn.execute(f'DROP INDEX IF EXISTS main.{name}')
+            conn.execute('DELETE FROM main.companies')
+            conn.execute('''
+                INSERT INTO main.companies (corp_code, corp_name, stock_code, modify_date, corp_name_lower)
+                SELECT corp_code, corp_name, stock_code, modify_date, corp_name_lower
+                FROM staging.corp_codes
+            ''')
+
+            for sql in INDEX_SQL:
+                conn.execute(sql)
+            build_search_index(conn)
+            bump_companies_version(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute('DETACH DATABASE staging')
+        os.remove(staging_path)
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"✓ {count}개 회사 적재 완료 ({elapsed:.2f}초, {rate:,.0f} rows/sec)")
+    return count
+
+
+def sync_corp_codes(conn, source, batch_size: int = BATCH_SIZE) -> dict:
+    """저장된 modify_date와 비교하여 바뀐 회사만 반영하는 증분 동기화
+
+    신규/변경 회사는 upsert하고, 새 목록에 없는 회사는 deleted_at으로 표시합니다.
+    source를 끝까지 읽어 바뀐 행을 메모리에서 먼저 계산한 뒤, 쓰기 잠금은 변경 반영과
+    검색 인덱스 재구성에만 짧게 잡습니다 (WAL 모드라 동기화 중에도 읽기는 막히지 않음).
+
+    Returns:
+        inserted, updated, deleted, unchanged, elapsed 통계
+    """
+    started = time.perf_counter()
+    configure_connection(conn)
+    create_schema(conn)
+
+    # 현재 상태: corp_code -> (modify_date, deleted_at)
+    stored = {
+        corp_code: (modify_date, deleted_at)
+        for corp_code, modify_date, deleted_at in conn.execute(
+            'SELECT corp_code, modify_date, deleted_at FROM companies'
+        )
+    }
+
+    stats = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    seen = set()
+    changed = []
+
+    # 쓰기 잠금 없이 바뀐 행 계산
+    for row in iter_corp_codes(source):
+        corp_code = row[0]
+        seen.add(corp_code)
+        previous = stored.get(corp_code)
+        if previous is None:
+            stats['inserted'] += 1
+        elif previous[0] != row[3] or previous[1] is not None:
+            stats['updated'] += 1
+        else:
+            stats['unchanged'] += 1
+            continue
+        changed.append(row + (row[1].lower(),))
+
+    # 새 목록에서 빠진 회사는 삭제 대신 tombstone 처리
+    removed = [
+        (corp_code,)
+        for corp_code, (_, deleted_at) in stored.items()
+        if deleted_at is None and corp_code not in seen
+    ]
+    stats['deleted'] = len(removed)
+
+    if not changed and not removed:
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        print(f"✓ 증분 동기화: 변경 없음 (유지 {stats['unchanged']}, {stats['elapsed']:.2f}초)")
+        return stats
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for batch in iter_batches(changed, batch_size):
+            conn.executemany('''
+                INSERT INTO companies (corp_code, corp_name, stock_code, modify_date, corp_name_lower)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(corp_code) DO UPDATE SET
+                    corp_name = excluded.corp_name,
+                    stock_code = excluded.stock_code,
+                    modify_date = excluded.modify_date,
+                    corp_name_lower = excluded.corp_name_lower,
+                    deleted_at = NULL
+            ''', batch)
+
+        conn.executemany('''
+            UPDATE companies SET deleted_at = datetime('now')
+            WHERE corp_code = ?
+        ''', removed)
+
+        build_search_index(conn)
+        bump_companies_version(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    stats['elapsed'] = round(time.perf_counter() - started, 3)
+    print(
+        f"✓ 증분 동기화 완료: 신규 {stats['inserted']}, 변경 {stats['updated']}, "
+        f"삭제 {stats['deleted']}, 유지 {stats['unchanged']} ({stats['elapsed']:.2f}초)"
+    )
+    return stats
+
+
+class ZipEntryStream:
+    """ZIP 청크에서 첫 번째 파일을 읽는 만큼만 풀어 주는 파일 객체
+
+    zipfile과 달리 압축을 푼 XML 전체를 메모리에 두지 않고 iterparse에 그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._raw = b''
+        self._inflater = None
+        self._stored_remaining = None
+        self._output = b''
+        self._eof = False
+
+    def _next_chunk(self) -> bytes:
+        return next(self._chunks, b'')
+
+    def _read_header(self):
+        while len(self._raw) < ZIP_LOCAL_HEADER.size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._raw += chunk
+
+        if len(self._raw) < ZIP_LOCAL_HEADER.size or not self._raw.startswith(ZIP_LOCAL_SIGNATURE):
+            preview = self._raw[:200].decode('utf-8', errors='replace')
+            raise ValueError(f"ZIP 형식이 아닌 응답입니다: {preview}")
+
+        (_, _, flags, method, _, _, _, compressed_size, _,
+         name_length, extra_length) = ZIP_LOCAL_HEADER.unpack_from(self._raw)
+        header_length = ZIP_LOCAL_HEADER.size + name_length + extra_length
+
+        while len(self._raw) < header_length:
+            chunk = self._next_chunk()
+            if not chunk:
+                raise ValueError("ZIP 헤더가 잘렸습니다.")
+            self._raw += chunk
+        self._raw = self._raw[header_length:]
+
+        if method == 8:
+            self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        elif method == 0 and not flags & 0x08:
+            self._stored_remaining = compressed_size
+        else:
+            raise ValueError(f"지원하지 않는 ZIP 압축 방식입니다: {method}")
+
+    def _fill(self, size: int):
+        if self._inflater is None and self._stored_remaining is None:
+            self._read_header()
+
+        while not self._eof and (size < 0 or len(self._output) < size):
+            data = self._raw or self._next_chunk()
+            self._raw = b''
+            if not data:
+                self._eof = True
+                break
+
+            if self._inflater is not None:
+                self._output += self._inflater.decompress(data)
+                if self._inflater.eof:
+                    self._eof = True
+            else:
+                self._output += data[:self._stored_remaining]
+                self._stored_remaining -= min(len(data), self._stored_remaining)
+                if self._stored_remaining == 0:
+                    self._eof = True
+
+    def read(self, size: int = -1) -> bytes:
+        self._fill(size)
+        if size < 0:
+            data, self._output = self._output, b''
+        else:
+            data, self._output = self._output[:size], self._output[size:]
+        return data
+
+
+def load_meta(conn, prefix: str) -> dict:
+    rows = conn.execute(
+        'SELECT key, value FROM sync_meta WHERE key LIKE ?', (f'{prefix}.%',)
+    ).fetchall()
+    return {key[len(prefix) + 1:]: value for key, value in rows}
+
+
+def save_meta(conn, prefix: str, values: dict):
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)',
+            [(f'{prefix}.{key}', value) for key, value in values.items()]
+        )
+
+
+def refresh_corp_codes(conn, api_key: str, url: str = CORP_CODE_URL,
+                       force: bool = False, timeout: float = 60) -> dict:
+    """DART에서 회사코드 ZIP을 받아 DB에 반영
+
+    ETag/Last-Modified가 같으면 본문을 받지 않고, 받은 ZIP의 해시가 이전과 같으면 파싱 없이
+    변경 없음으로 기록합니다. 다운로드는 DB 쓰기 전에 끝내므로 느린 응답이 쓰기 잠금을 잡지 않습니다.
+    DB가 비어 있으면 전체 적재, 아니면 증분 동기화를 수행합니다.
+
+    Args:
+        conn: dart.db 연결
+        api_key: DART API 키
+        url: 회사코드 다운로드 URL (테스트 시 로컬 서버 주소)
+        force: True면 조건부 요청 없이 항상 다운로드
+
+    Returns:
+        status(not_modified/unchanged/updated)와 적재 통계
+    """
+    create_schema(conn)
+    meta = {} if force else load_meta(conn, 'corpcode')
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    transport = httpx.HTTPTransport(retries=DOWNLOAD_RETRIES, http2=True)
+    with httpx.Client(transport=transport, timeout=timeout, follow_redirects=True) as client, \
+            client.stream('GET', url, params={'crtfc_key': api_key}, headers=headers) as response:
+        if response.status_code == 304:
+            print("✓ 회사코드 변경 없음 (304 Not Modified)")
+            return {'status': 'not_modified'}
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        if etag and etag == meta.get('etag'):
+            print("✓ 회사코드 변경 없음 (ETag 동일)")
+            return {'status': 'not_modified'}
+
+        # 압축된 ZIP(수 MB)만 메모리에 받아 두고 해시 계산
+        chunks = []
+        sha256 = hashlib.sha256()
+        for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+            chunks.append(chunk)
+            sha256.update(chunk)
+        last_modified = response.headers.get('Last-Modified', '')
+
+    digest = sha256.hexdigest()
+    size = sum(len(chunk) for chunk in chunks)
+    print(f"✓ 회사코드 다운로드: {size / 1024:.0f}KB (sha256 {digest[:12]})")
+
+    meta_values = {
+        'etag': etag or '',
+        'last_modified': last_modified,
+        'sha256': digest,
+        'size': str(size),
+        'synced_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+    if digest == meta.get('sha256'):
+        print("✓ 회사코드 변경 없음 (내용 해시 동일)")
+        save_meta(conn, 'corpcode', meta_values)
+        return {'status': 'unchanged', 'size': size}
+
+    stream = ZipEntryStream(chunks)
+    if conn.execute('SELECT 1 FROM companies LIMIT 1').fetchone():
+        stats = sync_corp_codes(conn, stream)
+    else:
+        stats = {'inserted': ingest_corp_codes(conn, stream)}
+    stats['status'] = 'updated'
+    stats['size'] = size
+
+    save_meta(conn, 'corpcode', meta_values)
+    return stats
@@ -1,93 +1,61 @@
-import requests
-import zipfile
-import xml.etree.ElementTree as ET
-import os
-from io import BytesIO
+import sqlite3
+import sys
+import httpx
 from config import DART_API_KEY
+from corp_code_ingest import CORP_CODE_URL, refresh_corp_codes
 
 
-def download_corp_code():
-    """DART API에서 회사코드 다운로드 및 처리"""
-    
-    # API URL
-    url = "https://opendart.fss.or.kr/api/corpCode.xml"
-    
-    # 요청 파라미터
-    params = {
-        'crtfc_key': DART_API_KEY
-    }
-    
+def download_corp_code(db_path="dart.db", url=CORP_CODE_URL, force=False):
+    """DART API에서 회사코드 다운로드 및 처리
+
+    ZIP을 메모리로 받은 뒤 풀면서 DB에 적재합니다 (corpCode.zip, CORPCODE.xml 파일을 만들지 않음).
+    이전 다운로드와 ETag/내용이 같으면 다시 적재하지 않습니다.
+
+    Args:
+        db_path: 적재할 SQLite DB 경로
+        url: 회사코드 다운로드 URL
+        force: True면 변경 여부와 관계없이 다시 다운로드
+    """
+
     print("회사코드 다운로드 중...")
-    
+
+    conn = sqlite3.connect(db_path)
     try:
-        # API 호출
-        response = requests.get(url, params=params)
-        
-        # 응답 확인
-        if response.status_code == 200:
-            # ZIP 파일 저장
-            zip_path = "corpCode.zip"
-            with open(zip_path, 'wb') as f:
-                f.write(response.content)
-            print(f"✓ ZIP 파일 다운로드 완료: {zip_path}")
-            
-            # ZIP 파일 압축 해제
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(".")
-            print("✓ ZIP 파일 압축 해제 완료")
-            
-            # XML 파일 파싱
-            xml_path = "CORPCODE.xml"
-            if os.path.exists(xml_path):
-                tree = ET.parse(xml_path)
-                root = tree.getroot()
-                
-                # 회사 정보 추출
-                companies = []
-                for company in root.findall('list'):
-                    corp_code = company.findtext('corp_code', '')
-                    corp_name = company.findtext('corp_name', '')
-                    stock_code = company.findtext('stock_code', '')
-                    modify_date = company.findtext('modify_date', '')
-                    
-                    companies.append({
-                        'corp_code': corp_code,
-                        'corp_name': corp_name,
-                        'stock_code': stock_code,
-                        'modify_date': modify_date
-                    })
-                
-                print(f"✓ 총 {len(companies)}개 회사 정보 로드 완료")
-                
-                # 상장회사만 필터링 (종목코드가 있는 회사)
-                listed_companies = [c for c in companies if c['stock_code']]
-                print(f"✓ 상장회사: {len(listed_companies)}개")
-                
-                return companies
-            else:
-                print("✗ XML 파일을 찾을 수 없습니다.")
-                return None
-                
-        else:
-            print(f"✗ API 호출 실패: {response.status_code}")
-            print(f"응답 내용: {response.text}")
-            return None
-            
-    except Exception as e:
+        stats = refresh_corp_codes(conn, DART_API_KEY, url=url, force=force)
+        return stats
+
+    except (httpx.HTTPError, ValueError) as e:
         print(f"✗ 오류 발생: {str(e)}")
         return None
 
+    finally:
+        conn.close()
+
+
+def print_listed_samples(db_path="dart.db", count=5):
+    """상장회사 몇 개 샘플 출력"""
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT corp_code, corp_name, stock_code, modify_date
+        FROM companies
+        WHERE TRIM(stock_code) != "" AND deleted_at IS NULL
+        LIMIT ?
+    ''', (count,)).fetchall()
+    conn.close()
+
+    print(f"\n=== 상장회사 샘플 (처음 {count}개) ===")
+    for corp_code, corp_name, stock_code, modify_date in rows:
+        print(f"회사명: {corp_name}")
+        print(f"  고유번호: {corp_code}")
+        print(f"  종목코드: {stock_code}")
+        print(f"  최종변경일: {modify_date}")
+        print()
+
 
 if __name__ == "__main__":
-    companies = download_corp_code()
-    
-    if companies:
-        # 상장회사 몇 개 샘플 출력
-        print("\n=== 상장회사 샘플 (처음 5개) ===")
-        for company in companies[:5]:
-            if company['stock_code']:
-                print(f"회사명: {company['corp_name']}")
-                print(f"  고유번호: {company['corp_code']}")
-                print(f"  종목코드: {company['stock_code']}")
-                print(f"  최종변경일: {company['modify_date']}")
-                print()
+    # --force: ETag/해시가 같아도 다시 다운로드
+    stats = download_corp_code(force='--force' in sys.argv[1:])
+
+    if stats:
+        print_listed_samples()
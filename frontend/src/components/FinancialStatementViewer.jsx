@@ -6,6 +6,42 @@ import {
 } from 'recharts'
 import './FinancialStatementViewer.css'
 
+// SSE 스트리밍 응답(event: chunk/done/error)을 읽어 누적 텍스트가 바뀔 때마다 onText 호출
+const postEventStream = async (url, body, onText) => {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  })
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}))
+    throw new Error(error.detail || `HTTP ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let text = ''
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const events = buffer.split('\n\n')
+    buffer = events.pop()
+    for (const raw of events) {
+      const event = raw.match(/^event: (.*)$/m)?.[1]
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}')
+      if (event === 'chunk') {
+        text += data.text
+        onText(text)
+      } else if (event === 'error') {
+        throw new Error(data.message)
+      }
+    }
+  }
+  return text
+}
+
 function FinancialStatementViewer({ company }) {
   const [year, setYear] = useState('2023')
   const [reportCode, setReportCode] = useState('11011')
@@ -542,8 +578,9 @@ function FinancialStatementViewer({ company }) {
     try {
       const response = await axios.post('/api/explain-financial-statement', {
         company_name: company.corp_name,
+        corp_code: company.corp_code,
         year: year,
-        financial_data: { list: data }
+        reprt_code: reportCode
       })
 
       if (response.data.explanation) {
@@ -576,7 +613,8 @@ function FinancialStatementViewer({ company }) {
       const stockResponse = await axios.get('/api/stock-price', {
         params: {
           stock_code: company.stock_code,
-          period: '1y'
+          period: '1y',
+          indicators: 'all'
         }
       })
 
@@ -586,18 +624,23 @@ function FinancialStatementViewer({ company }) {
         // 재무제표 데이터가 있으면 투자 분석도 함께 요청
         if (data) {
           setInvestmentLoading(true)
-          const analysisResponse = await axios.post('/api/investment-analysis', {
-            company_name: company.corp_name,
-            stock_code: company.stock_code,
-            year: year,
-            financial_data: { list: data },
-            stock_data: stockResponse.data
-          })
-
-          if (analysisResponse.data.analysis) {
-            setInvestmentAnalysis(analysisResponse.data.analysis)
+          try {
+            // 생성되는 대로 화면에 표시 (SSE)
+            await postEventStream('/api/investment-analysis/stream', {
+              // 재무제표/주가는 서버 캐시에서 조회하므로 식별자만 전송
+              company_name: company.corp_name,
+              corp_code: company.corp_code,
+              stock_code: company.stock_code,
+              year: year,
+              reprt_code: reportCode,
+              period: '1y'
+            }, setInvestmentAnalysis)
+          } catch (err) {
+            console.error('투자 분석 생성 오류:', err)
+            setInvestmentAnalysis(`투자 분석 생성 중 오류가 발생했습니다.\n\n오류 내용: ${err.message}`)
+          } finally {
+            setInvestmentLoading(false)
           }
-          setInvestmentLoading(false)
         }
       }
     } catch (err) {
@@ -1,7 +1,9 @@
 import sqlite3
-import xml.etree.ElementTree as ET
 import os
 import sys
+from corp_code_ingest import (
+    configure_connection, create_schema, ingest_corp_codes, sync_corp_codes
+)
 
 # Windows 콘솔 인코딩 설정
 if sys.platform == 'win32':
@@ -15,73 +17,45 @@ def create_database():
     conn = sqlite3.connect('dart.db')
     cursor = conn.cursor()
     
-    # 테이블 생성
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS companies (
-            corp_code TEXT PRIMARY KEY,
-            corp_name TEXT NOT NULL,
-            stock_code TEXT,
-            modify_date TEXT,
-            corp_name_lower TEXT
-        )
-    ''')
-    
-    # 인덱스 생성 (검색 성능 향상)
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_corp_name 
-        ON companies(corp_name_lower)
-    ''')
-    
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_stock_code 
-        ON companies(stock_code)
-    ''')
-    
-    conn.commit()
+    # 테이블 및 인덱스 생성 (검색 성능 향상)
+    configure_connection(conn)
+    create_schema(conn)
     print("✓ 데이터베이스 테이블 생성 완료")
     
     return conn, cursor
 
 
-def import_corpcode_xml(cursor, conn):
-    """CORPCODE.xml 파일을 데이터베이스로 임포트"""
+def import_corpcode_xml(cursor, conn, incremental=False):
+    """CORPCODE.xml 파일을 데이터베이스로 임포트 (스트리밍 파싱 + 배치 INSERT)
+    
+    Args:
+        incremental: True면 modify_date가 바뀐 회사만 반영 (기존 DB 유지)
+    """
     
     xml_path = "CORPCODE.xml"
     
     if not os.path.exists(xml_path):
-        print("✗ CORPCODE.xml 파일이 없습니다. download_corp_code.py를 먼저 실행하세요.")
-        return False
-    
-    print("XML 파싱 중...")
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    
-    # 기존 데이터 삭제
-    cursor.execute('DELETE FROM companies')
-    
-    # 데이터 삽입
-    count = 0
-    for company in root.findall('list'):
-        corp_code = company.findtext('corp_code', '')
-        corp_name = company.findtext('corp_name', '')
-        stock_code = company.findtext('stock_code', '')
-        modify_date = company.findtext('modify_date', '')
-        
-        cursor.execute('''
-            INSERT INTO companies (corp_code, corp_name, stock_code, modify_date, corp_name_lower)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (corp_code, corp_name, stock_code, modify_date, corp_name.lower()))
-        
-        count += 1
-    
-    conn.commit()
-    print(f"✓ {count}개 회사 정보 DB에 저장 완료")
+        # download_corp_code.py는 XML 파일 없이 DB에 바로 적재함
+        cursor.execute('SELECT COUNT(*) FROM companies')
+        if not cursor.fetchone()[0]:
+            print("✗ 회사 정보가 없습니다. download_corp_code.py를 먼저 실행하세요.")
+            return False
+        print("✓ download_corp_code.py로 적재된 회사 정보를 사용합니다.")
+    elif incremental:
+        print("XML 증분 동기화 중...")
+        sync_corp_codes(conn, xml_path)
+    else:
+        print("XML 적재 중...")
+        ingest_corp_codes(conn, xml_path)
     
     # 통계 출력
-    cursor.execute('SELECT COUNT(*) FROM companies WHERE stock_code != ""')
+    cursor.execute('SELECT COUNT(*) FROM companies WHERE TRIM(stock_code) != "" AND deleted_at IS NULL')
     listed_count = cursor.fetchone()[0]
     print(f"✓ 상장회사: {listed_count}개")
     
+    cursor.execute('SELECT COUNT(*) FROM companies_fts')
+    print(f"✓ 검색 인덱스 생성 완료: {cursor.fetchone()[0]}개")
+    
     return True
 
 
@@ -94,7 +68,7 @@ def test_search(cursor):
     cursor.execute('''
         SELECT corp_code, corp_name, stock_code 
         FROM companies 
-        WHERE corp_name_lower LIKE ? AND stock_code != ""
+        WHERE corp_name_lower LIKE ? AND TRIM(stock_code) != "" AND deleted_at IS NULL
         LIMIT 5
     ''', ('%삼성%',))
     
@@ -105,13 +79,16 @@ def test_search(cursor):
 
 
 if __name__ == "__main__":
+    # --incremental: 전체 재적재 대신 변경분만 반영
+    incremental = '--incremental' in sys.argv[1:]
+    
     print("데이터베이스 초기화 시작...\n")
     
     # 데이터베이스 생성
     conn, cursor = create_database()
     
     # XML 데이터 임포트
-    if import_corpcode_xml(cursor, conn):
+    if import_corpcode_xml(cursor, conn, incremental=incremental):
         # 검색 테스트
         test_search(cursor)
     
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# backend 모듈은 서로를 최상위 모듈로 import하므로 서버 실행 시와 같은 경로 구성
+# (benchmarks는 DART/yfinance/Gemini 대역 stubs 모듈용)
+for path in (os.path.join(ROOT, 'backend'), ROOT, os.path.join(ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope='session')
+def main_module(tmp_path_factory):
+    """임시 dart.db를 쓰는 backend.main (모듈 전역 설정을 환경 변수로 읽으므로 import 전에 지정)"""
+    os.environ['DART_DB_PATH'] = str(tmp_path_factory.mktemp('db') / 'dart.db')
+    os.environ['WARM_UP_IMPORTS'] = 'false'
+    import main
+    return main
+
+
+@pytest.fixture
+def anyio_backend():
+    """서버와 같은 asyncio 이벤트 루프에서만 실행"""
+    return 'asyncio'
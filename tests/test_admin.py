@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+
+def test_admin_api_denied_without_token(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, 'ADMIN_TOKEN', None)
+
+    # 같은 머신의 프록시를 거친 요청도 로컬 주소로 보이므로 허용하지 않음
+    with TestClient(main_module.app, client=('127.0.0.1', 50000)) as client:
+        assert client.get('/metrics').status_code == 403
+        assert client.get('/api/admin/slow-requests').status_code == 403
+
+
+def test_admin_api_accepts_token_headers(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, 'ADMIN_TOKEN', 'secret')
+
+    with TestClient(main_module.app) as client:
+        assert client.get('/metrics').status_code == 403
+        assert client.get('/metrics', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+        assert client.get('/metrics', headers={'X-Admin-Token': 'secret'}).status_code == 200
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
@@ -0,0 +1,95 @@
+import io
+import sqlite3
+
+import pytest
+
+from company_registry import CompanyIndex, CompanyRegistry, is_choseong_query, to_choseong
+from corp_code_ingest import ingest_corp_codes
+
+NAMES = ['삼성전자', '삼성전자우', '삼성SDI', '삼성', '신세계', '대성전자', 'LG전자', 'SK하이닉스']
+
+
+@pytest.fixture
+def index():
+    return CompanyIndex([
+        (f'{i:08d}', name, f'{i:06d}', '20240101') for i, name in enumerate(NAMES)
+    ])
+
+
+def names(results):
+    return [row['corp_name'] for row in results]
+
+
+def test_to_choseong():
+    assert to_choseong('삼성SDI') == 'ㅅㅅsdi'
+    assert to_choseong('까치') == 'ㄲㅊ'
+    assert is_choseong_query('ㅅㅅㅈㅈ')
+    assert not is_choseong_query('ㅅㅅ전자')
+    assert not is_choseong_query('')
+
+
+def test_exact_then_prefix_then_shorter(index):
+    assert names(index.search('삼성')) == ['삼성', '삼성전자', '삼성SDI', '삼성전자우']
+
+
+def test_substring_after_prefix(index):
+    assert names(index.search('전자')) == ['LG전자', '대성전자', '삼성전자', '삼성전자우']
+    assert names(index.search('삼성전')) == ['삼성전자', '삼성전자우']
+
+
+def test_choseong_prefix_ranking(index):
+    assert names(index.search('ㅅㅅ')) == ['삼성', '신세계', '삼성전자', '삼성SDI', '삼성전자우']
+    assert names(index.search('ㅅㅅㅈㅈ')) == ['삼성전자', '삼성전자우']
+
+
+def test_choseong_substring(index):
+    assert names(index.search('ㅈㅈ')) == ['LG전자', '대성전자', '삼성전자', '삼성전자우']
+
+
+def test_case_insensitive_and_limit(index):
+    assert names(index.search('  sk ')) == ['SK하이닉스']
+    assert names(index.search('ㅅㅅ', limit=2)) == ['삼성', '신세계']
+    assert index.search('') == []
+
+
+def test_prefix_hits_fill_limit_without_substring_scan(index):
+    # 접두어 후보만으로 limit을 채우면 부분 일치('대성전자' 등)는 보지 않음
+    assert names(index.search('삼성', limit=3)) == ['삼성', '삼성전자', '삼성SDI']
+
+
+def test_get(index):
+    assert index.get('00000004')['corp_name'] == '신세계'
+    assert index.get('99999999') is None
+
+
+def corp_code_xml(rows):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<result>'
+        + ''.join(
+            f'<list><corp_code>{code}</corp_code><corp_name>{name}</corp_name>'
+            f'<stock_code>{stock}</stock_code><modify_date>20240101</modify_date></list>'
+            for code, name, stock in rows
+        )
+        + '</result>'
+    ).encode('utf-8')
+
+
+def test_registry_lists_only_listed_and_reloads_on_change(tmp_path):
+    db_path = str(tmp_path / 'dart.db')
+    conn = sqlite3.connect(db_path)
+    ingest_corp_codes(conn, io.BytesIO(corp_code_xml([
+        ('00126380', '삼성전자', '005930'),
+        ('00164779', 'SK하이닉스', '000660'),
+        ('00999999', '비상장회사', ' '),
+    ])))
+
+    registry = CompanyRegistry(db_path)
+    assert registry.reload()
+    assert len(registry) == 2
+    assert names(registry.search('ㅅㅅ')) == ['삼성전자']
+
+    ingest_corp_codes(conn, io.BytesIO(corp_code_xml([('00126380', '삼성전자', '005930')])))
+    conn.close()
+    registry._last_check = float('-inf')
+    assert registry.get('00164779') is None
+    assert len(registry) == 1
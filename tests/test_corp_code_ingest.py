@@ -0,0 +1,111 @@
+import io
+import sqlite3
+import zipfile
+
+import pytest
+
+from corp_code_ingest import ZipEntryStream, ingest_corp_codes, iter_corp_codes, sync_corp_codes
+
+def corp_xml(companies) -> bytes:
+    """(corp_code 번호, 회사명, modify_date) 목록으로 만든 CORPCODE.xml"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<result>'
+        + ''.join(
+            f'<list><corp_code>{i:08d}</corp_code><corp_name>{name}</corp_name>'
+            f'<stock_code>{i:06d}</stock_code><modify_date>{modify_date}</modify_date></list>'
+            for i, name, modify_date in companies
+        )
+        + '</result>'
+    ).encode('utf-8')
+
+
+XML = corp_xml((i, f'회사{i}', '20240101') for i in range(2000))
+
+
+class Unseekable(io.RawIOBase):
+    """zipfile이 데이터 디스크립터(flag 0x08)를 쓰도록 하는 순차 쓰기 전용 파일"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def make_zip(compression, descriptor=False) -> bytes:
+    target = Unseekable() if descriptor else io.BytesIO()
+    with zipfile.ZipFile(target, 'w', compression) as archive:
+        archive.writestr('CORPCODE.xml', XML)
+    return bytes(target.buffer) if descriptor else target.getvalue()
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096, 1 << 20])
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_reads_first_entry(compression, chunk_size):
+    stream = ZipEntryStream(chunked(make_zip(compression), chunk_size))
+    assert stream.read() == XML
+
+
+def test_deflated_entry_with_data_descriptor():
+    data = make_zip(zipfile.ZIP_DEFLATED, descriptor=True)
+    assert zipfile.ZipFile(io.BytesIO(data)).infolist()[0].flag_bits & 0x08
+
+    stream = ZipEntryStream(chunked(data, 1000))
+    rows = list(iter_corp_codes(stream))
+    assert len(rows) == 2000
+    assert rows[-1] == ('00001999', '회사1999', '001999', '20240101')
+
+
+def test_stored_entry_with_data_descriptor_is_rejected():
+    # 압축하지 않은 항목은 크기를 헤더에서 알 수 없으면 끝을 판단할 수 없음
+    data = make_zip(zipfile.ZIP_STORED, descriptor=True)
+    assert zipfile.ZipFile(io.BytesIO(data)).infolist()[0].flag_bits & 0x08
+
+    stream = ZipEntryStream(chunked(data, 1000))
+    with pytest.raises(ValueError):
+        stream.read(10)
+
+
+def test_small_reads_match_whole_entry():
+    stream = ZipEntryStream(chunked(make_zip(zipfile.ZIP_DEFLATED), 333))
+    parts = []
+    while True:
+        part = stream.read(100)
+        if not part:
+            break
+        assert len(part) <= 100
+        parts.append(part)
+    assert b''.join(parts) == XML
+
+
+def test_error_response_is_not_zip():
+    body = b'{"status":"020","message":"\xec\x82\xac\xec\x9a\xa9\xed\x95\x9c\xeb\x8f\x84 \xec\xb4\x88\xea\xb3\xbc"}'
+    stream = ZipEntryStream([body])
+    with pytest.raises(ValueError, match='ZIP'):
+        stream.read()
+
+
+def test_ingest_then_sync_applies_changes(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'dart.db'))
+    assert ingest_corp_codes(conn, io.BytesIO(XML), batch_size=300) == 2000
+
+    # 0번 회사명 변경, 1000번부터 삭제, 5000번 신규
+    companies = [(0, '새이름', '20240201')] + [(i, f'회사{i}', '20240101') for i in range(1, 1000)]
+    stats = sync_corp_codes(conn, io.BytesIO(corp_xml(companies + [(5000, '신규', '20240201')])))
+
+    assert (stats['inserted'], stats['updated'], stats['deleted'], stats['unchanged']) == (1, 1, 1000, 999)
+    assert conn.execute('SELECT COUNT(*) FROM companies WHERE deleted_at IS NULL').fetchone()[0] == 1001
+    assert conn.execute("SELECT corp_name FROM companies WHERE corp_code = '00000000'").fetchone()[0] == '새이름'
+    assert conn.execute("SELECT COUNT(*) FROM companies_fts WHERE corp_code = '00001500'").fetchone()[0] == 0
+
+    # 같은 목록이면 쓰기 없이 끝남
+    assert sync_corp_codes(conn, io.BytesIO(corp_xml(companies + [(5000, '신규', '20240201')])))['unchanged'] == 1001
+    conn.close()
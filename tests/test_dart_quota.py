@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+
+import httpx
+import pytest
+
+import upstream
+from dart_quota import INTERACTIVE, PREFETCH, DartQuotaExceeded, DartScheduler, kst_today
+from upstream import UpstreamClient
+
+
+def stored_usage(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute('SELECT used FROM dart_quota WHERE day = ?', (kst_today(),)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+@pytest.mark.anyio
+async def test_usage_is_flushed_in_background(tmp_path):
+    db_path = str(tmp_path / 'dart.db')
+    scheduler = DartScheduler(db_path, rate=1000, burst=100)
+
+    for _ in range(10):
+        await scheduler.acquire(INTERACTIVE)
+    await scheduler._flush_task
+
+    assert scheduler.used == 10
+    assert stored_usage(db_path) == 10
+
+    # 다른 프로세스의 사용량은 다음 저장 때 합쳐짐
+    other = DartScheduler(db_path)
+    other.load()
+    other._unsaved, other._used = 5, 15
+    other.persist()
+    await scheduler.flush()
+    assert scheduler.used == 15
+
+
+@pytest.mark.anyio
+async def test_reserve_blocks_prefetch_only(tmp_path):
+    scheduler = DartScheduler(str(tmp_path / 'dart.db'), rate=1000, burst=100,
+                              daily_limit=5, reserve=2)
+    for _ in range(3):
+        await scheduler.acquire(PREFETCH)
+
+    with pytest.raises(DartQuotaExceeded):
+        await scheduler.acquire(PREFETCH)
+    await scheduler.acquire(INTERACTIVE)
+    await scheduler.acquire(INTERACTIVE)
+    with pytest.raises(DartQuotaExceeded):
+        await scheduler.acquire(INTERACTIVE)
+    assert scheduler.rejected == 2
+
+
+@pytest.mark.anyio
+async def test_mark_exhausted_persists_full_budget(tmp_path):
+    db_path = str(tmp_path / 'dart.db')
+    scheduler = DartScheduler(db_path, daily_limit=100)
+    await scheduler.acquire(INTERACTIVE)
+    scheduler.mark_exhausted()
+    await scheduler._flush_task
+
+    assert scheduler.remaining == 0
+    assert stored_usage(db_path) == 100
+
+
+@pytest.mark.anyio
+async def test_retries_are_charged_to_the_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(upstream, 'RETRY_BACKOFF', 0)
+    statuses = iter([503, 502, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses), json={'status': '000'})
+
+    client = UpstreamClient(max_retries=2)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    scheduler = DartScheduler(str(tmp_path / 'dart.db'), rate=1000, burst=100)
+
+    await scheduler.acquire(INTERACTIVE)
+    response = await client.get(
+        'https://opendart.example/api/x.json',
+        before_retry=lambda: scheduler.acquire(INTERACTIVE)
+    )
+    await client.aclose()
+
+    assert response.status_code == 200
+    assert scheduler.used == 3
+
+
+@pytest.mark.anyio
+async def test_acquire_does_not_block_loop_on_locked_db(tmp_path):
+    db_path = str(tmp_path / 'dart.db')
+    scheduler = DartScheduler(db_path, rate=1000, burst=100)
+    await scheduler.acquire(INTERACTIVE)
+
+    # 다른 연결이 쓰기 잠금을 잡고 있어도 저장은 백그라운드에서 기다림
+    lock = sqlite3.connect(db_path, isolation_level=None)
+    lock.execute('BEGIN IMMEDIATE')
+    try:
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        for _ in range(10):
+            await scheduler.acquire(INTERACTIVE)
+        await asyncio.sleep(0.2)
+        task.cancel()
+        assert ticks >= 10
+    finally:
+        lock.execute('COMMIT')
+        lock.close()
+    await scheduler._flush_task
+    assert stored_usage(db_path) == 11
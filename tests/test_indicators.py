@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (
+    INDICATOR_NAMES, IndicatorCache, compute_indicators, parse_indicators, select_indicators,
+)
+
+
+NAN = float('nan')
+
+# 상승 +2, 하락 -1이 번갈아 나오는 종가 (RSI 손계산용)
+ZIGZAG = [100, 102, 104, 103, 105, 104, 106, 105, 107, 106, 108, 107, 109, 108, 110]
+
+
+def test_moving_average_and_drawdown():
+    result = compute_indicators([10, 11, 12, 11, 13, 14])
+    series, summary = result['series'], result['summary']
+
+    assert series['ma5'] == [None, None, None, None, 11.4, 12.2]
+    assert series['ma20'] == [None] * 6
+    # 고점 [10, 11, 12, 12, 13, 14] 대비 하락률
+    assert series['drawdown'] == [0.0, 0.0, 0.0, round((11 / 12 - 1) * 100, 2), 0.0, 0.0]
+    assert summary['ma5'] == 12.2
+    assert summary['ma20'] is None
+    assert summary['drawdown'] == 0.0
+    assert summary['max_drawdown'] == -8.33
+    assert summary['returns']['1w'] == 40.0
+    assert summary['returns']['1m'] is None
+
+
+def test_rsi_uses_simple_average_of_gains_and_losses():
+    result = compute_indicators(ZIGZAG)
+    rsi = result['series']['rsi14']
+
+    assert rsi[:13] == [None] * 13
+    # 첫 14개 봉: 상승 7번(+14), 하락 6번(-6)
+    assert rsi[13] == 70.0
+    # 다음 봉: 상승 8번(+16), 하락 6번(-6)
+    assert rsi[14] == round(100 * 16 / 22, 2)
+    assert result['summary']['rsi14'] == rsi[14]
+
+
+def test_leading_nan_only_blanks_windows_before_first_close():
+    plain = compute_indicators(ZIGZAG)
+    padded = compute_indicators([NAN, NAN] + ZIGZAG)
+
+    for name, values in plain['series'].items():
+        assert padded['series'][name] == [None, None] + values, name
+    assert padded['series']['ma5'][6] == round(sum(ZIGZAG[:5]) / 5, 2)
+    assert padded['series']['rsi14'][15] == 70.0
+    assert padded['summary'] == plain['summary']
+
+
+def test_interior_nan_is_filled_with_previous_close():
+    result = compute_indicators([10, NAN, 12, NAN, 9])
+
+    assert result['series']['ma5'] == [None, None, None, None, round((10 + 10 + 12 + 12 + 9) / 5, 2)]
+    assert result['summary']['max_drawdown'] == -25.0
+
+
+def test_all_nan_or_empty_closes():
+    for closes in ([], [NAN, NAN, NAN]):
+        result = compute_indicators(closes)
+        assert all(value == [None] * len(closes) for value in result['series'].values())
+        assert result['summary']['ma5'] is None
+        assert result['summary']['max_drawdown'] is None
+        assert result['summary']['period_volatility'] is None
+
+
+def test_volatility_matches_pandas_rolling_std():
+    rng = np.random.default_rng(0)
+    closes = (10000 * np.exp(np.cumsum(rng.normal(0, 0.02, 60)))).tolist()
+    result = compute_indicators(closes)
+
+    log_returns = np.log(pd.Series(closes)).diff()
+    expected = log_returns.rolling(20).std(ddof=0) * math.sqrt(252) * 100
+    actual = result['series']['volatility']
+    for index in range(21, 60):
+        assert actual[index] == pytest.approx(expected[index], abs=0.01)
+
+
+def test_parse_and_select_indicators():
+    assert parse_indicators('all') == INDICATOR_NAMES
+    assert parse_indicators(' RSI14, ma5,rsi14 ') == ('rsi14', 'ma5')
+    assert parse_indicators(None) == ()
+    with pytest.raises(ValueError):
+        parse_indicators('ma7')
+
+    selected = select_indicators(compute_indicators(ZIGZAG), ('ma5', 'drawdown'))
+    assert set(selected['series']) == {'ma5', 'drawdown'}
+    assert set(selected['summary']) == {'ma5', 'drawdown', 'max_drawdown'}
+
+
+def test_cache_recomputes_when_last_bar_changes():
+    cache = IndicatorCache()
+    stock_data = {'dates': ['2024-01-02', '2024-01-03'], 'prices': [100.0, 110.0], 'volumes': [5, 7]}
+
+    first = cache.get('005930', '1y', stock_data)
+    assert cache.get('005930', '1y', dict(stock_data)) is first
+
+    # 장중 갱신: 날짜와 봉 개수는 같고 마지막 종가만 바뀜
+    updated = dict(stock_data, prices=[100.0, 90.0])
+    second = cache.get('005930', '1y', updated)
+    assert second is not first
+    assert second['summary']['drawdown'] == -10.0
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from llm_queue import LLMQueue, QueueFullError
+
+
+async def wait_queued(queue, count):
+    while queue.queued < count:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_clients_take_turns():
+    queue = LLMQueue(max_concurrency=1, max_queue=10, max_per_client=5)
+    release = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await release.wait()
+
+    def job(name):
+        async def run():
+            order.append(name)
+        return run
+
+    tasks = [asyncio.create_task(queue.run('busy', 'blocker', blocker))]
+    await asyncio.sleep(0)
+    # a가 먼저 여러 개를 넣어도 b, c와 번갈아 실행
+    for client_id, name in [('a', 'a1'), ('a', 'a2'), ('a', 'a3'), ('b', 'b1'), ('c', 'c1'), ('b', 'b2')]:
+        tasks.append(asyncio.create_task(queue.run(client_id, name, job(name))))
+        await wait_queued(queue, len(tasks) - 1)
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ['a1', 'b1', 'c1', 'a2', 'b2', 'a3']
+    assert queue.stats()['completed'] == 7
+    assert queue.running == 0
+
+
+@pytest.mark.anyio
+async def test_concurrency_limit():
+    queue = LLMQueue(max_concurrency=2, max_queue=10, max_per_client=10)
+    active = peak = 0
+
+    async def job():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    await asyncio.gather(*(queue.run(f'client{i % 3}', i, job) for i in range(8)))
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_rejects_when_queue_or_client_is_full():
+    queue = LLMQueue(max_concurrency=1, max_queue=3, max_per_client=2)
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+
+    tasks = [asyncio.create_task(queue.run('busy', 'running', job))]
+    await asyncio.sleep(0)
+    for i in range(2):
+        tasks.append(asyncio.create_task(queue.run('a', f'a{i}', job)))
+        await wait_queued(queue, i + 1)
+
+    # 클라이언트별 한도
+    with pytest.raises(QueueFullError):
+        await queue.run('a', 'a2', job)
+
+    tasks.append(asyncio.create_task(queue.run('b', 'b0', job)))
+    await wait_queued(queue, 3)
+
+    # 전체 대기열 한도
+    with pytest.raises(QueueFullError):
+        queue.ensure_capacity('c')
+    assert queue.stats()['rejected'] == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    queue.ensure_capacity('c')
+
+
+@pytest.mark.anyio
+async def test_same_key_runs_once():
+    queue = LLMQueue(max_concurrency=1)
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'text'
+
+    # 대기열 한도와 관계없이 같은 키는 기존 작업의 결과를 받음
+    results = await asyncio.gather(*(queue.run(f'client{i}', 'prompt', job) for i in range(5)))
+    assert results == ['text'] * 5
+    assert calls == 1
+    assert queue.stats()['deduplicated'] == 4
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_leaves_queue():
+    queue = LLMQueue(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+
+    running = asyncio.create_task(queue.run('a', 'running', job))
+    await asyncio.sleep(0)
+
+    async def stream():
+        async with queue.slot('b'):
+            pass
+
+    waiting = asyncio.create_task(stream())
+    await wait_queued(queue, 1)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert queue.queued == 0
+
+    release.set()
+    await running
+    assert queue.running == 0
+
+
+def test_full_queue_returns_429(main_module, monkeypatch):
+    # 실행 슬롯도 대기 자리도 없는 대기열
+    monkeypatch.setattr(main_module, 'llm_queue', LLMQueue(max_concurrency=0, max_queue=0))
+    monkeypatch.setattr(main_module, 'GEMINI_API_KEY', 'test')
+    body = {
+        'company_name': '테스트',
+        'year': '2023',
+        'financial_data': {'list': [
+            {'fs_div': 'CFS', 'account_nm': '자산총계', 'thstrm_amount': '100', 'frmtrm_amount': '90'}
+        ]},
+    }
+
+    with TestClient(main_module.app) as client:
+        for path in ('/api/explain-financial-statement', '/api/explain-financial-statement/stream'):
+            response = client.post(path, json=body)
+            assert response.status_code == 429
+            assert response.headers['Retry-After']
@@ -0,0 +1,89 @@
+import math
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from price_store import PriceStore
+
+
+def history_with_nan_bar():
+    """중간 봉은 거래정지(종가 NaN), 마지막 봉은 장중 미확정(시가/거래량 NaN)"""
+    index = pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04'])
+    return pd.DataFrame({
+        'Open': [100.0, float('nan'), float('nan')],
+        'High': [110.0, float('nan'), 125.0],
+        'Low': [90.0, float('nan'), 115.0],
+        'Close': [105.0, float('nan'), 120.0],
+        'Volume': [1000.0, float('nan'), float('nan')],
+    }, index=index)
+
+
+def test_save_skips_nan_close_and_fills_volume(tmp_path):
+    store = PriceStore(str(tmp_path / 'dart.db'))
+    store.save('005930', '005930.KS', history_with_nan_bar(), None)
+
+    data = store.load('005930', None)
+    assert data['dates'] == ['2024-01-02', '2024-01-04']
+    assert data['prices'] == [105.0, 120.0]
+    assert data['volumes'] == [1000, 0]
+    assert data['open'] == [100.0, None]
+
+
+def test_load_ignores_rows_without_close(tmp_path):
+    db_path = str(tmp_path / 'dart.db')
+    store = PriceStore(db_path)
+    store.save('005930', '005930.KS', history_with_nan_bar(), None)
+
+    # 이전 버전이 저장한 종가 없는 행
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('''
+            INSERT INTO stock_prices (stock_code, date, open, high, low, close, volume)
+            VALUES ('005930', '2024-01-05', NULL, NULL, NULL, NULL, 0)
+        ''')
+    conn.close()
+
+    assert store.load('005930', None)['dates'] == ['2024-01-02', '2024-01-04']
+
+
+class NaNTicker:
+    def history(self, **kwargs):
+        return history_with_nan_bar()
+
+
+class NaNYFinance:
+    load_time = None
+
+    def Ticker(self, symbol):
+        return NaNTicker()
+
+
+def test_stock_price_statistics_with_nan_bar(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, 'yf', NaNYFinance())
+
+    with TestClient(main_module.app) as client:
+        response = client.get('/api/stock-price', params={'stock_code': '000660', 'period': 'max'})
+
+    assert response.status_code == 200
+    statistics = response.json()['statistics']
+    assert statistics['current_price'] == 120.0
+    assert statistics['change'] == 15.0
+    assert statistics['high_52week'] == 125.0
+    assert statistics['low_52week'] == 90.0
+    assert statistics['avg_volume'] == 500
+    assert not any(isinstance(v, float) and math.isnan(v) for v in statistics.values())
+
+
+@pytest.mark.parametrize('encoding', [None, 'compact'])
+def test_stock_price_encodings_with_nan_bar(main_module, monkeypatch, encoding):
+    monkeypatch.setattr(main_module, 'yf', NaNYFinance())
+    params = {'stock_code': '035720', 'period': 'max', 'indicators': 'all'}
+    if encoding:
+        params['encoding'] = encoding
+
+    with TestClient(main_module.app) as client:
+        response = client.get('/api/stock-price', params=params)
+
+    assert response.status_code == 200
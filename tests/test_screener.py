@@ -0,0 +1,30 @@
+import httpx
+import pytest
+
+from financials import FinancialStore
+from screener import collect_financials
+from stubs import create_dart_app
+from upstream import UpstreamClient
+
+
+@pytest.mark.anyio
+async def test_collect_financials_ingests_batches(tmp_path, monkeypatch):
+    monkeypatch.setenv('STUB_DART_LATENCY_MS', '0')
+    monkeypatch.setenv('STUB_COMPANIES', '10')
+
+    client = UpstreamClient()
+    client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_dart_app()))
+    store = FinancialStore(str(tmp_path / 'dart.db'))
+    companies = [(f'{i:08d}', f'{i:06d}') for i in range(150)]
+
+    try:
+        stats = await collect_financials(
+            client, 'http://dart.test/api/fnlttMultiAcnt.json', 'key', companies, '2023', '11011', store
+        )
+    finally:
+        await client.aclose()
+
+    assert stats['requests'] == 2
+    assert stats['errors'] == 0
+    assert stats['companies'] == 150
+    assert store.get('00000149', '2023', '11011') is not None
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight('test')
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'value'
+
+    results = await asyncio.gather(*(flight.do('key', fetch) for _ in range(5)))
+
+    assert results == ['value'] * 5
+    assert calls == 1
+    assert flight.stats() == {'calls': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+@pytest.mark.anyio
+async def test_different_keys_and_later_calls_run_again():
+    flight = SingleFlight('test')
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    assert await asyncio.gather(flight.do('a', lambda: fetch('a')), flight.do('b', lambda: fetch('b'))) == ['a', 'b']
+    # 끝난 작업의 결과는 재사용하지 않음
+    assert await flight.do('a', lambda: fetch('a')) == 'a'
+    assert calls == ['a', 'b', 'a']
+
+
+@pytest.mark.anyio
+async def test_exception_is_shared_and_not_cached():
+    flight = SingleFlight('test')
+    attempts = 0
+
+    async def failing():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise ValueError('upstream failed')
+
+    results = await asyncio.gather(flight.do('key', failing), flight.do('key', failing), return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert attempts == 1
+
+    with pytest.raises(ValueError):
+        await flight.do('key', failing)
+    assert attempts == 2
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_shared_task():
+    flight = SingleFlight('test')
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        await release.wait()
+        return 'value'
+
+    first = asyncio.create_task(flight.do('key', fetch))
+    await started.wait()
+    second = asyncio.create_task(flight.do('key', fetch))
+    await asyncio.sleep(0)
+
+    # 처음 요청한 클라이언트가 연결을 끊음
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    release.set()
+    assert await second == 'value'
+    assert flight.stats()['calls'] == 1
+
+
+@pytest.mark.anyio
+async def test_all_callers_cancelled_still_finishes_task():
+    flight = SingleFlight('test')
+    finished = asyncio.Event()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        finished.set()
+        raise ValueError('nobody is waiting')
+
+    caller = asyncio.create_task(flight.do('key', fetch))
+    await asyncio.sleep(0)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    await asyncio.wait_for(finished.wait(), 1)
+    await asyncio.sleep(0)
+    assert flight.stats()['in_flight'] == 0